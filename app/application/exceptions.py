@@ -24,3 +24,9 @@ class AuthenticationError(AppError):
     """Error de autenticación (401)."""
     def __init__(self, message="Invalid credentials"):
         super().__init__(message, code="auth_error")
+
+class RateLimitError(AppError):
+    """Demasiados intentos (429)."""
+    def __init__(self, message="Too many requests", retry_after: float = 0):
+        super().__init__(message, code="rate_limited")
+        self.retry_after = retry_after
@@ -0,0 +1,50 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Iterable, Sequence
+from uuid import UUID
+from app.domain.models.geofence_model import Geofence, GeofenceEvent
+
+class IGeofenceRepository:
+    async def list(self, limit: int = 100, offset: int = 0) -> list[Geofence]:
+        raise NotImplementedError
+
+    async def list_all(self) -> list[Geofence]:
+        """Todas las cercas, para construir el índice espacial."""
+        raise NotImplementedError
+
+    async def get(self, geofence_id: UUID) -> Geofence | None:
+        raise NotImplementedError
+
+    async def create(self, geofence: Geofence) -> Geofence:
+        raise NotImplementedError
+
+    async def update(self, geofence: Geofence) -> Geofence:
+        raise NotImplementedError
+
+    async def delete(self, geofence: Geofence) -> None:
+        """Elimina la cerca y el estado de los vehículos dentro de ella (los eventos quedan)."""
+        raise NotImplementedError
+
+    async def lock_cursors(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, int]:
+        """
+        Último timestamp evaluado de cada vehículo (-1 si ninguno). Bloquea sus
+        filas hasta que ``apply_transitions`` confirma, así dos lotes del mismo
+        vehículo se evalúan uno después del otro.
+        """
+        raise NotImplementedError
+
+    async def load_states(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, set[UUID]]:
+        """Cercas dentro de las que está cada vehículo (solo los que están en alguna)."""
+        raise NotImplementedError
+
+    async def apply_transitions(self, entered: Sequence[tuple[UUID, UUID, datetime | None]],
+                                exited: Sequence[tuple[UUID, UUID]], events: Sequence[dict],
+                                cursors: dict[UUID, int]) -> None:
+        """
+        Guarda en una transacción los cambios de estado (vehículo, cerca), los
+        eventos y el nuevo último timestamp de cada vehículo, y libera los bloqueos.
+        """
+        raise NotImplementedError
+
+    async def list_events(self, geofence_id: UUID, limit: int = 100) -> list[GeofenceEvent]:
+        raise NotImplementedError
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+from app.domain.models.job_model import Job
+
+class IJobRepository:
+    async def create(self, job: Job) -> Job:
+        raise NotImplementedError
+
+    async def get(self, job_id: UUID) -> Job | None:
+        raise NotImplementedError
+
+    async def list_for_owner(self, owner_id: UUID, limit: int = 50) -> list[Job]:
+        raise NotImplementedError
+
+    async def claim_next(self) -> Job | None:
+        """Pasa el trabajo en cola más antiguo a ``running`` y lo devuelve (None si no hay)."""
+        raise NotImplementedError
+
+    async def update_progress(self, job_id: UUID, started_at: datetime, current: int, total: int | None) -> bool:
+        """
+        Guarda el avance de la ejecución que empezó en ``started_at``; devuelve
+        True si se pidió cancelar el trabajo o si esa ejecución ya no es la vigente.
+        """
+        raise NotImplementedError
+
+    async def finish(self, job_id: UUID, started_at: datetime, status: str,
+                     result: dict | None = None, error: str | None = None) -> bool:
+        """Cierra la ejecución que empezó en ``started_at``; False si ya no seguía en curso."""
+        raise NotImplementedError
+
+    async def request_cancel(self, job_id: UUID) -> Job | None:
+        """Cancela un trabajo en cola o marca uno en curso para que se detenga."""
+        raise NotImplementedError
+
+    async def heartbeat(self, job_ids: Sequence[UUID]) -> None:
+        raise NotImplementedError
+
+    async def requeue(self, job_ids: Sequence[UUID]) -> None:
+        raise NotImplementedError
+
+    async def requeue_stale(self, older_than: datetime) -> int:
+        """Reencola los trabajos ``running`` sin heartbeat desde ``older_than``."""
+        raise NotImplementedError
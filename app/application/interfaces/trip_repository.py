@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import Iterable, Sequence
+from uuid import UUID
+from app.domain.models.trip_model import Stop, Trip, TripCheckpoint
+
+class ITripRepository:
+    async def load_checkpoints(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, dict]:
+        """
+        Estado del detector de cada vehículo que ya tiene checkpoint. Bloquea
+        los checkpoints de ``vehicle_ids`` hasta que ``save`` confirma, así dos
+        lotes del mismo vehículo se procesan uno después del otro.
+        """
+        raise NotImplementedError
+
+    async def save(self, trips: Sequence[dict], stops: Sequence[dict], checkpoints: dict[UUID, dict]) -> None:
+        """Guarda en una transacción los viajes y paradas cerrados y los checkpoints nuevos, y libera los bloqueos."""
+        raise NotImplementedError
+
+    async def get_checkpoint(self, vehicle_id: UUID) -> TripCheckpoint | None:
+        raise NotImplementedError
+
+    async def list_trips(self, vehicle_id: UUID, limit: int = 50) -> list[Trip]:
+        raise NotImplementedError
+
+    async def list_stops(self, vehicle_id: UUID, limit: int = 50) -> list[Stop]:
+        raise NotImplementedError
@@ -1,4 +1,7 @@
+from datetime import datetime
+from uuid import UUID
 from app.domain.models.user_model import User
+from app.domain.models.refresh_token_model import RefreshToken
 
 class IUserRepository:
     async def get_by_username(self, username: str) -> User | None:
@@ -12,3 +15,20 @@ class IUserRepository:
 
     async def create(self, user: User) -> User:
         raise NotImplementedError
+
+    async def increment_token_version(self, user_id: str) -> int | None:
+        raise NotImplementedError
+
+    async def add_refresh_token(self, jti: str, user_id: UUID, family_id: str, expires_at: datetime) -> None:
+        """Registra un refresh token emitido (y purga los vencidos del usuario)."""
+        raise NotImplementedError
+
+    async def consume_refresh_token(self, jti: str) -> bool:
+        """Marca el token como usado; False si no existe, ya se usó o fue revocado."""
+        raise NotImplementedError
+
+    async def get_refresh_token(self, jti: str) -> RefreshToken | None:
+        raise NotImplementedError
+
+    async def revoke_refresh_family(self, family_id: str) -> None:
+        raise NotImplementedError
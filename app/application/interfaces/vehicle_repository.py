@@ -1,4 +1,8 @@
+from __future__ import annotations
+from typing import Sequence
+from uuid import UUID
 from app.domain.models.vehicle_model import Vehicle
+from app.domain.models.vehicle_record import VehicleChange, VehicleRecord
 
 class IVehicleRepository:
     async def list(self, limit: int = 10, offset: int = 0) -> list[Vehicle]:
@@ -7,6 +11,42 @@ class IVehicleRepository:
     async def get_by_id(self, vehicle_id: str) -> Vehicle | None:
         raise NotImplementedError
 
+    async def list_records(self, limit: int = 10, offset: int = 0) -> list[VehicleRecord]:
+        raise NotImplementedError
+
+    async def get_record(self, vehicle_id: str) -> VehicleRecord | None:
+        raise NotImplementedError
+
+    async def get_many(self, vehicle_ids: Sequence[UUID]) -> list[VehicleRecord]:
+        """Registros de los ids existentes, en cualquier orden."""
+        raise NotImplementedError
+
+    async def bulk_update(self, vehicle_ids: Sequence[UUID] | None, filters: dict | None, values: dict) -> list[UUID]:
+        """Actualiza por ids o por filtro de igualdad; devuelve los ids afectados."""
+        raise NotImplementedError
+
+    async def bulk_delete(self, vehicle_ids: Sequence[UUID] | None, filters: dict | None) -> list[UUID]:
+        raise NotImplementedError
+
+    async def bulk_insert(self, rows: Sequence[dict]) -> int:
+        """Inserta filas nuevas (campos de VehicleCreate) en una transacción; devuelve cuántas."""
+        raise NotImplementedError
+
+    async def changes_since(self, change_seq: int, after_id: UUID | None, limit: int) -> list[VehicleChange]:
+        """
+        Hasta ``limit`` cambios (altas/ediciones y borrados) posteriores a
+        ``(change_seq, after_id)``, ordenados por ``(change_seq, id)``.
+        """
+        raise NotImplementedError
+
+    async def aggregate_counts(self) -> dict[str, dict[str, int]]:
+        """Conteos por brand, arrival_location y created_day (YYYY-MM-DD, UTC) de la tabla resumen."""
+        raise NotImplementedError
+
+    async def rebuild_aggregate_counts(self) -> int:
+        """Recalcula la tabla resumen con GROUP BY; devuelve cuántos grupos estaban desfasados."""
+        raise NotImplementedError
+
     async def create(self, vehicle: Vehicle) -> Vehicle:
         raise NotImplementedError
 
@@ -0,0 +1,120 @@
+"""
+Evaluación de posiciones contra las geocercas.
+
+``GeofenceIndex`` reparte las cercas en una grilla de celdas de
+``cell_size`` grados (cada cerca en las celdas que cubre su bounding box):
+para un punto solo se prueban las cercas de su celda cuyo bbox lo contiene.
+Los puntos de un lote se agrupan por cerca candidata y cada cerca se evalúa
+sobre su grupo de una vez (``points_in_ring`` recorre cada arista sobre
+todos los puntos), así que el costo es proporcional a puntos x vértices de
+las cercas cercanas y no a puntos x cercas.
+
+``transitions`` compara el resultado con el estado previo de cada vehículo
+y devuelve solo las entradas y salidas.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Iterable, NamedTuple
+from uuid import UUID
+from app.domain.models.geofence_model import GEOFENCE_ENTER, GEOFENCE_EXIT
+
+# Una cerca que cubre más celdas que esto se prueba siempre (solo por bbox)
+MAX_CELLS_PER_FENCE = 4096
+
+
+class Fence(NamedTuple):
+    id: UUID
+    xs: tuple[float, ...]
+    ys: tuple[float, ...]
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+    @classmethod
+    def from_coordinates(cls, fence_id: UUID, coordinates: Iterable) -> "Fence":
+        xs, ys = zip(*((float(lon), float(lat)) for lon, lat in coordinates))
+        return cls(fence_id, xs, ys, min(xs), min(ys), max(xs), max(ys))
+
+
+def points_in_ring(xs: tuple[float, ...], ys: tuple[float, ...], px: list[float], py: list[float]) -> list[bool]:
+    """Ray casting de un lote de puntos contra un anillo, arista por arista."""
+    inside = [False] * len(px)
+    for k in range(len(xs)):
+        x1, y1, x2, y2 = xs[k - 1], ys[k - 1], xs[k], ys[k]
+        if y1 == y2:
+            continue
+        slope = (x2 - x1) / (y2 - y1)
+        lo, hi = (y1, y2) if y1 < y2 else (y2, y1)
+        for j, y in enumerate(py):
+            if lo <= y < hi and px[j] < x1 + (y - y1) * slope:
+                inside[j] = not inside[j]
+    return inside
+
+
+class GeofenceIndex:
+    def __init__(self, fences: Iterable[Fence], cell_size: float = 0.05):
+        self.cell_size = cell_size
+        self.fences = list(fences)
+        self.ids = frozenset(f.id for f in self.fences)
+        self.cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+        self.large: list[int] = []
+        for i, fence in enumerate(self.fences):
+            (x0, y0), (x1, y1) = self._cell(fence.min_x, fence.min_y), self._cell(fence.max_x, fence.max_y)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_CELLS_PER_FENCE:
+                self.large.append(i)
+                continue
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    self.cells[(cx, cy)].append(i)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def locate(self, lons: list[float], lats: list[float]) -> list[set[UUID]]:
+        """Ids de las cercas que contienen cada punto (mismo orden que la entrada)."""
+        candidates: dict[int, list[int]] = defaultdict(list)
+        for p, (x, y) in enumerate(zip(lons, lats)):
+            for i in chain(self.cells.get(self._cell(x, y), ()), self.large):
+                fence = self.fences[i]
+                if fence.min_x <= x <= fence.max_x and fence.min_y <= y <= fence.max_y:
+                    candidates[i].append(p)
+        result: list[set[UUID]] = [set() for _ in lons]
+        for i, points in candidates.items():
+            fence = self.fences[i]
+            hits = points_in_ring(fence.xs, fence.ys, [lons[p] for p in points], [lats[p] for p in points])
+            for p, hit in zip(points, hits):
+                if hit:
+                    result[p].add(fence.id)
+        return result
+
+
+def transitions(index: GeofenceIndex, positions: list[dict], states: dict[UUID, set[UUID]]) -> list[dict]:
+    """
+    Eventos de entrada/salida de ``positions`` (ordenadas por timestamp)
+    partiendo de ``states`` (vehículo -> cercas), que se actualiza en el lugar.
+    Las cercas que el índice no conoce (creadas en otro worker) no se tocan.
+    """
+    inside = index.locate([p["lon"] for p in positions], [p["lat"] for p in positions])
+    events = []
+    for position, fences in zip(positions, inside):
+        vehicle_id = position["vehicle_id"]
+        before = states.get(vehicle_id, set())
+        known = before & index.ids
+        if fences == known:
+            continue
+        occurred_at = datetime.fromtimestamp(position["timestamp"], timezone.utc)
+        for event, changed in ((GEOFENCE_EXIT, known - fences), (GEOFENCE_ENTER, fences - known)):
+            for geofence_id in sorted(changed):
+                events.append({
+                    "geofence_id": geofence_id,
+                    "vehicle_id": vehicle_id,
+                    "event": event,
+                    "lat": position["lat"],
+                    "lon": position["lon"],
+                    "occurred_at": occurred_at,
+                })
+        states[vehicle_id] = fences | (before - index.ids)
+    return events
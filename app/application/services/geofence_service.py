@@ -0,0 +1,115 @@
+import asyncio
+import time
+from uuid import UUID
+from app.application.exceptions import NotFoundError
+from app.application.interfaces.geofence_repository import IGeofenceRepository
+from app.application.services.geofence_engine import Fence, GeofenceIndex, transitions
+from app.domain.models.geofence_model import Geofence, GEOFENCE_ENTER
+from app.domain.schemas.geofence_schema import GeofenceCreate
+
+
+class GeofenceIndexCache:
+    """
+    Índice espacial por proceso. Se reconstruye cuando este proceso modifica
+    una cerca y, para ver los cambios de otros workers, cada ``ttl`` segundos.
+    """
+
+    def __init__(self, ttl: float = 5.0, cell_size: float = 0.05, clock=time.monotonic):
+        self.ttl = ttl
+        self.cell_size = cell_size
+        self.clock = clock
+        self._index: GeofenceIndex | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._index is not None and self.clock() - self._loaded_at < self.ttl
+
+    async def get(self, repo: IGeofenceRepository) -> GeofenceIndex:
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():
+                    fences = await repo.list_all()
+                    self._index = GeofenceIndex(
+                        (Fence.from_coordinates(f.id, f.coordinates) for f in fences), self.cell_size
+                    )
+                    self._loaded_at = self.clock()
+        return self._index
+
+    def invalidate(self):
+        self._index = None
+
+
+class GeofenceService:
+
+    def __init__(self, geofence_repo: IGeofenceRepository, index_cache: GeofenceIndexCache):
+        self.geofence_repo = geofence_repo
+        self.index_cache = index_cache
+
+    async def list_geofences(self, limit: int = 100, offset: int = 0) -> list[Geofence]:
+        return await self.geofence_repo.list(limit=limit, offset=offset)
+
+    async def get_geofence(self, geofence_id: str) -> Geofence:
+        try:
+            uuid_id = UUID(geofence_id)
+        except ValueError:
+            raise NotFoundError("Geofence not found")
+        geofence = await self.geofence_repo.get(uuid_id)
+        if geofence is None:
+            raise NotFoundError("Geofence not found")
+        return geofence
+
+    async def create_geofence(self, geofence_in: GeofenceCreate) -> Geofence:
+        created = await self.geofence_repo.create(Geofence(**self._fields(geofence_in)))
+        self.index_cache.invalidate()
+        return created
+
+    async def update_geofence(self, geofence_id: str, geofence_in: GeofenceCreate) -> Geofence:
+        existing = await self.get_geofence(geofence_id)
+        for k, val in self._fields(geofence_in).items():
+            setattr(existing, k, val)
+        updated = await self.geofence_repo.update(existing)
+        self.index_cache.invalidate()
+        return updated
+
+    async def delete_geofence(self, geofence_id: str) -> None:
+        await self.geofence_repo.delete(await self.get_geofence(geofence_id))
+        self.index_cache.invalidate()
+
+    async def list_events(self, geofence_id: str, limit: int = 100):
+        geofence = await self.get_geofence(geofence_id)
+        return await self.geofence_repo.list_events(geofence.id, limit)
+
+    @staticmethod
+    def _fields(geofence_in: GeofenceCreate) -> dict:
+        fields = geofence_in.model_dump()
+        fields["coordinates"] = [list(point) for point in fields["coordinates"]]
+        return fields
+
+    async def evaluate(self, positions: list[dict]) -> list[dict]:
+        """
+        Eventos de entrada/salida de un lote de posiciones (ordenadas por
+        timestamp). Los lotes de un mismo vehículo se serializan y las
+        posiciones no posteriores a la última evaluada se ignoran, así un lote
+        repetido o atrasado no genera entradas y salidas falsas.
+        """
+        index = await self.index_cache.get(self.geofence_repo)
+        if not index.fences:
+            return []
+        last = await self.geofence_repo.lock_cursors({p["vehicle_id"] for p in positions})
+        positions = [p for p in positions if p["timestamp"] > last.get(p["vehicle_id"], -1)]
+        cursors = {p["vehicle_id"]: p["timestamp"] for p in positions}
+        initial = await self.geofence_repo.load_states(cursors) if cursors else {}
+        states = {vehicle_id: set(fences) for vehicle_id, fences in initial.items()}
+        events = transitions(index, positions, states)
+        entered_at = {
+            (e["vehicle_id"], e["geofence_id"]): e["occurred_at"] for e in events if e["event"] == GEOFENCE_ENTER
+        }
+        entered, exited = [], []
+        for vehicle_id in states.keys() | initial.keys():
+            before, after = initial.get(vehicle_id, set()), states.get(vehicle_id, set())
+            entered.extend((vehicle_id, f, entered_at.get((vehicle_id, f))) for f in after - before)
+            exited.extend((vehicle_id, f) for f in before - after)
+        # Se guarda aunque no haya eventos: avanza los cursores y libera sus bloqueos
+        await self.geofence_repo.apply_transitions(entered, exited, events, cursors)
+        return events
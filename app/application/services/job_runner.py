@@ -0,0 +1,161 @@
+"""
+Ejecución de trabajos largos fuera del ciclo de las requests.
+
+Los trabajos viven en la tabla ``jobs``: una ruta los encola y responde 202;
+``JobRunner`` (arrancado desde el ``lifespan``) los toma con ``concurrency``
+workers por proceso, así que la carga pesada queda acotada aunque lleguen
+muchos pedidos a la vez.
+
+ - Cada handler recibe un ``JobContext``: sus parámetros, sesiones de DB
+   propias y ``progress(current, total)`` para informar el avance.
+ - La cancelación es cooperativa: ``POST /jobs/{id}/cancel`` marca el trabajo
+   y el siguiente ``progress`` lanza ``JobCancelled`` (entre chunks, nunca en
+   medio de una transacción).
+ - Un heartbeat periódico renueva los trabajos en curso; los que quedaron en
+   ``running`` sin heartbeat (proceso caído) se reencolan. Al apagar, los
+   trabajos en curso también vuelven a la cola, así que los handlers deben
+   poder reanudarse (repetir un chunk ya aplicado no debe romper nada).
+ - ``started_at`` identifica cada ejecución: si un trabajo se reencoló o se
+   canceló mientras corría, el worker original deja de informar avance y
+   descarta su resultado en lugar de pisar el de la ejecución vigente.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+from app.domain.models.job_model import Job, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED
+
+logger = logging.getLogger("app.jobs")
+
+
+class JobCancelled(Exception):
+    """Se pidió cancelar el trabajo; el handler debe dejar de procesar."""
+
+
+class JobContext:
+    def __init__(self, job: Job, sessionmaker, repo_factory):
+        self.job_id: UUID = job.id
+        self.started_at: datetime = job.started_at
+        self.kind: str = job.kind
+        self.params: dict = job.params
+        self.owner_id: UUID | None = job.owner_id
+        self.cancelled = False
+        self._sessionmaker = sessionmaker
+        self._repo_factory = repo_factory
+
+    def session(self):
+        """Sesión nueva de la base; cada chunk de trabajo usa la suya."""
+        return self._sessionmaker()
+
+    async def progress(self, current: int, total: int | None = None):
+        async with self._sessionmaker() as session:
+            if await self._repo_factory(session).update_progress(self.job_id, self.started_at, current, total):
+                self.cancelled = True
+        if self.cancelled:
+            raise JobCancelled()
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict | None]]
+
+
+class JobRunner:
+    def __init__(self, sessionmaker, repo_factory, handlers: dict[str, JobHandler] | None = None,
+                 concurrency: int = 2, poll_interval: float = 2.0, heartbeat_interval: float = 10.0):
+        self.sessionmaker = sessionmaker
+        self.repo_factory = repo_factory
+        self.handlers: dict[str, JobHandler] = dict(handlers or {})
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._running: dict[UUID, JobContext] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    def notify(self):
+        """Despierta a los workers de este proceso tras encolar (sin esperar al polling)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._wakeup = None
+
+    async def run_next(self) -> Job | None:
+        """Toma y ejecuta el próximo trabajo en cola; devuelve None si no había."""
+        async with self.sessionmaker() as session:
+            job = await self.repo_factory(session).claim_next()
+        if job is not None:
+            await self._execute(job)
+        return job
+
+    async def _worker(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self.run_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker failed to claim a job")
+                job = None
+            if job is None:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    async def _execute(self, job: Job):
+        context = JobContext(job, self.sessionmaker, self.repo_factory)
+        handler = self.handlers.get(job.kind)
+        self._running[job.id] = context
+        status, result, error = JOB_SUCCEEDED, None, None
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind {job.kind!r}")
+            result = await handler(context)
+        except JobCancelled:
+            status = JOB_CANCELLED
+        except asyncio.CancelledError:
+            # El runner se apaga: el trabajo vuelve a la cola para otro proceso
+            async with self.sessionmaker() as session:
+                await self.repo_factory(session).requeue([job.id])
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            status, error = JOB_FAILED, f"{type(exc).__name__}: {exc}"
+        finally:
+            self._running.pop(job.id, None)
+        async with self.sessionmaker() as session:
+            recorded = await self.repo_factory(session).finish(job.id, context.started_at, status, result, error)
+        if not recorded:
+            logger.warning("Job %s (%s) is no longer running here; dropping its %s outcome", job.id, job.kind, status)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with self.sessionmaker() as session:
+                    repo = self.repo_factory(session)
+                    await repo.heartbeat(list(self._running))
+                    stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.heartbeat_interval * 6)
+                    requeued = await repo.requeue_stale(stale_before)
+                if requeued:
+                    logger.warning("Requeued %d job(s) without heartbeat", requeued)
+                    self.notify()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job heartbeat failed")
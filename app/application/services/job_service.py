@@ -0,0 +1,38 @@
+from uuid import UUID
+from app.application.interfaces.job_repository import IJobRepository
+from app.application.exceptions import ConflictError, NotFoundError
+from app.domain.models.job_model import Job, JOB_FINISHED_STATES
+
+class JobService:
+
+    def __init__(self, job_repo: IJobRepository):
+        self.job_repo = job_repo
+
+    async def enqueue(self, kind: str, params: dict, owner_id: UUID | None = None) -> Job:
+        return await self.job_repo.create(Job(kind=kind, params=params, owner_id=owner_id))
+
+    async def list_jobs(self, owner_id: UUID, limit: int = 50) -> list[Job]:
+        return await self.job_repo.list_for_owner(owner_id, limit)
+
+    async def get_job(self, job_id: str, owner_id: UUID) -> Job:
+        """Trabajo del usuario; los de otros usuarios se reportan como inexistentes."""
+        try:
+            uuid_id = UUID(job_id)
+        except ValueError:
+            raise NotFoundError("Job not found")
+        job = await self.job_repo.get(uuid_id)
+        if job is None or job.owner_id != owner_id:
+            raise NotFoundError("Job not found")
+        return job
+
+    async def get_result(self, job_id: str, owner_id: UUID) -> Job:
+        job = await self.get_job(job_id, owner_id)
+        if job.status not in JOB_FINISHED_STATES:
+            raise ConflictError("Job has not finished yet")
+        return job
+
+    async def cancel_job(self, job_id: str, owner_id: UUID) -> Job:
+        job = await self.get_job(job_id, owner_id)
+        if job.status in JOB_FINISHED_STATES:
+            raise ConflictError("Job has already finished")
+        return await self.job_repo.request_cancel(job.id)
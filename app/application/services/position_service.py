@@ -0,0 +1,22 @@
+from app.application.services.geofence_service import GeofenceService
+from app.application.services.trip_service import TripService
+
+
+class PositionService:
+    """
+    Punto de entrada de las posiciones reportadas por los dispositivos.
+    Cada lote se ordena por timestamp y pasa por la evaluación de geocercas
+    y por la detección de viajes y paradas.
+    """
+
+    def __init__(self, geofences: GeofenceService, trips: TripService | None = None):
+        self.geofences = geofences
+        self.trips = trips
+
+    async def ingest(self, positions: list[dict]) -> list[dict]:
+        """Procesa el lote y devuelve los eventos de geocercas que generó."""
+        ordered = sorted(positions, key=lambda p: p["timestamp"])
+        events = await self.geofences.evaluate(ordered)
+        if self.trips is not None:
+            await self.trips.process(ordered)
+        return events
@@ -0,0 +1,113 @@
+"""
+Detección incremental de viajes y paradas.
+
+``TripDetector.feed`` es una máquina de estados por vehículo que consume las
+posiciones a medida que llegan (no vuelve a leer puntos viejos):
+
+ - ``stopped``: el vehículo está quieto desde ``start``. La primera posición
+   con velocidad >= ``stop_speed_kmh`` cierra la parada y abre un viaje en el
+   último punto quieto.
+ - ``moving``: viaje abierto desde ``start`` acumulando distancia. Si la
+   velocidad baja del umbral empieza una parada candidata (``slow``); si sigue
+   así ``dwell_seconds``, el viaje se cierra en el punto donde frenó.
+ - Un hueco de más de ``max_gap_seconds`` sin posiciones durante un viaje lo
+   cierra en el último punto (dispositivo apagado o sin señal). Si la primera
+   posición después de un hueco ya está en movimiento, la parada se cierra al
+   empezar el hueco y el viaje nuevo arranca en esa posición, sin sumar el
+   salto ni el tiempo sin datos.
+
+El estado es un dict serializable a JSON: se guarda como checkpoint tras cada
+lote y ``feed`` continúa desde él después de un reinicio. Las posiciones con
+timestamp no posterior al último procesado se ignoran, así que reenviar un
+lote no duplica viajes.
+"""
+import math
+from datetime import datetime, timezone
+from typing import Iterable
+
+MOVING = "moving"
+STOPPED = "stopped"
+
+_EARTH_RADIUS_M = 6_371_000
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _at(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc)
+
+
+class TripDetector:
+    def __init__(self, stop_speed_kmh: float = 3.0, dwell_seconds: int = 180,
+                 min_trip_meters: float = 100.0, max_gap_seconds: int = 900):
+        self.stop_speed_kmh = stop_speed_kmh
+        self.dwell_seconds = dwell_seconds
+        self.min_trip_meters = min_trip_meters
+        self.max_gap_seconds = max_gap_seconds
+
+    @staticmethod
+    def _start(mode: str, point: list, speed: float = 0.0) -> dict:
+        # point = [timestamp, lat, lon]
+        return {"mode": mode, "start": point, "last": point, "distance": 0.0, "max_speed": speed, "slow": None}
+
+    def _close_trip(self, state: dict, end: list, distance: float, trips: list):
+        if distance >= self.min_trip_meters:
+            (t0, lat0, lon0), (t1, lat1, lon1) = state["start"], end
+            trips.append({
+                "started_at": _at(t0), "ended_at": _at(t1), "duration_seconds": t1 - t0,
+                "distance_m": round(distance, 1), "start_lat": lat0, "start_lon": lon0,
+                "end_lat": lat1, "end_lon": lon1, "max_speed": state["max_speed"],
+            })
+
+    def _close_stop(self, state: dict, end_ts: int, stops: list):
+        t0, lat, lon = state["start"]
+        if end_ts - t0 >= self.dwell_seconds:
+            stops.append({
+                "started_at": _at(t0), "ended_at": _at(end_ts), "duration_seconds": end_ts - t0,
+                "lat": lat, "lon": lon,
+            })
+
+    def feed(self, state: dict | None, positions: Iterable[dict]) -> tuple[dict | None, list[dict], list[dict]]:
+        """Aplica las posiciones (ordenadas por timestamp); devuelve (estado, viajes, paradas) cerrados."""
+        trips: list[dict] = []
+        stops: list[dict] = []
+        for position in positions:
+            point = [int(position["timestamp"]), position["lat"], position["lon"]]
+            speed = position.get("speed", 0.0)
+            moving = speed >= self.stop_speed_kmh
+            if state is None:
+                state = self._start(MOVING if moving else STOPPED, point, speed)
+                continue
+            last = state["last"]
+            if point[0] <= last[0]:
+                continue
+            gap = point[0] - last[0] > self.max_gap_seconds
+            if state["mode"] == MOVING and gap:
+                self._close_trip(state, last, state["distance"], trips)
+                state = self._start(STOPPED, last)
+            if state["mode"] == STOPPED:
+                if not moving:
+                    state["last"] = point
+                    continue
+                self._close_stop(state, last[0], stops)
+                if gap:
+                    state = self._start(MOVING, point, speed)
+                    continue
+                state = self._start(MOVING, last)
+            state["distance"] += haversine_m(last[1], last[2], point[1], point[2])
+            state["max_speed"] = max(state["max_speed"], speed)
+            state["last"] = point
+            if moving:
+                state["slow"] = None
+            elif state["slow"] is None:
+                state["slow"] = [*point, state["distance"]]
+            elif point[0] - state["slow"][0] >= self.dwell_seconds:
+                slow = state["slow"]
+                self._close_trip(state, slow[:3], slow[3], trips)
+                state = {**self._start(STOPPED, slow[:3]), "last": point}
+        return state, trips, stops
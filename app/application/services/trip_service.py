@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from itertools import groupby
+from uuid import UUID
+from app.application.exceptions import NotFoundError
+from app.application.interfaces.trip_repository import ITripRepository
+from app.application.services.trip_detector import MOVING, TripDetector
+
+
+class TripService:
+
+    def __init__(self, trip_repo: ITripRepository, detector: TripDetector):
+        self.trip_repo = trip_repo
+        self.detector = detector
+
+    async def process(self, positions: list[dict]) -> None:
+        """
+        Avanza el detector de cada vehículo del lote (posiciones ordenadas por
+        timestamp) desde su checkpoint y guarda lo cerrado junto con el nuevo estado.
+        """
+        by_vehicle = groupby(sorted(positions, key=lambda p: p["vehicle_id"]), key=lambda p: p["vehicle_id"])
+        by_vehicle = {vehicle_id: list(points) for vehicle_id, points in by_vehicle}
+        checkpoints = await self.trip_repo.load_checkpoints(by_vehicle)
+        trips, stops, states = [], [], {}
+        for vehicle_id, points in by_vehicle.items():
+            before = checkpoints.get(vehicle_id)
+            last = before["last"][0] if before else None
+            state, closed_trips, closed_stops = self.detector.feed(before, points)
+            if state is None or state["last"][0] == last:
+                # Todo el lote ya estaba procesado: no hay nada que guardar
+                continue
+            states[vehicle_id] = state
+            trips.extend({"vehicle_id": vehicle_id, **trip} for trip in closed_trips)
+            stops.extend({"vehicle_id": vehicle_id, **stop} for stop in closed_stops)
+        # Se guarda aunque no haya cambios: save libera los checkpoints bloqueados
+        await self.trip_repo.save(trips, stops, states)
+
+    async def get_trips(self, vehicle_id: str, limit: int = 50) -> dict:
+        """Viajes y paradas materializados (más recientes primero) y el tramo en curso."""
+        try:
+            uuid_id = UUID(vehicle_id)
+        except ValueError:
+            raise NotFoundError("Vehicle not found")
+        checkpoint = await self.trip_repo.get_checkpoint(uuid_id)
+        current = None
+        if checkpoint is not None:
+            state = checkpoint.state
+            current = {
+                "mode": state["mode"],
+                "since": datetime.fromtimestamp(state["start"][0], timezone.utc),
+                "distance_m": round(state["distance"], 1) if state["mode"] == MOVING else 0.0,
+            }
+        return {
+            "vehicle_id": uuid_id,
+            "trips": await self.trip_repo.list_trips(uuid_id, limit),
+            "stops": await self.trip_repo.list_stops(uuid_id, limit),
+            "current": current,
+        }
@@ -1,7 +1,11 @@
 from app.application.interfaces.user_repository import IUserRepository
 from app.domain.schemas.user_schema import UserCreate
 from app.domain.models.user_model import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.config import settings
+from app.core.security import (
+    hash_password, verify_password, create_access_token, create_refresh_token, decode_token,
+    token_versions, InvalidTokenError, REFRESH_TOKEN_TYPE,
+)
 from app.application.exceptions import ConflictError, AuthenticationError, NotFoundError
 from sqlalchemy.exc import IntegrityError
 
@@ -43,9 +47,9 @@ class UserService:
             else:
                 raise ConflictError("User registration failed due to constraint violation")
 
-    async def authenticate_user(self, username: str, password: str) -> str:
+    async def authenticate_user(self, username: str, password: str) -> dict:
         """
-        Autentica por username/password. Devuelve JWT string.
+        Autentica por username/password. Devuelve access + refresh token.
         Lanza AuthenticationError si falla.
         """
         print(f"Attempting to authenticate user: {username}")  # Debug log
@@ -62,9 +66,70 @@ class UserService:
         if not password_valid:
             raise AuthenticationError("Invalid credentials")
             
-        token = create_access_token(subject=str(user.id))
+        tokens = await self.issue_tokens(user)
         print(f"Token created successfully for user: {username}")  # Debug log
-        return token
+        return tokens
+
+    async def issue_tokens(self, user: User, family: str | None = None) -> dict:
+        """
+        Access token autocontenido (id, username, versión) + refresh token
+        registrado en la base. ``family`` continúa una familia de rotación;
+        sin ella (login) empieza una nueva.
+        """
+        version = user.token_version or 0
+        access_token = create_access_token(
+            subject=str(user.id),
+            claims={"username": user.username, "ver": version},
+        )
+        refresh_token, claims = create_refresh_token(str(user.id), version, family)
+        await self.user_repo.add_refresh_token(claims["jti"], user.id, claims["fam"], claims["exp"])
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "expires_in": settings.JWT_EXPIRATION_MINUTES * 60,
+        }
+
+    async def refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Emite un par nuevo a partir de un refresh token vigente (rotación).
+        Cada refresh token se canjea una sola vez: presentar uno ya usado
+        (robado o reenviado) revoca toda su familia, incluido el que lo reemplazó.
+        Único punto del flujo de tokens que consulta la base.
+        """
+        try:
+            payload = decode_token(refresh_token, expected_type=REFRESH_TOKEN_TYPE)
+        except InvalidTokenError:
+            raise AuthenticationError("Invalid refresh token")
+
+        user = await self.user_repo.get_by_id(str(payload.get("sub")))
+        if not user:
+            raise AuthenticationError("Invalid refresh token")
+        version = user.token_version or 0
+        token_versions.note(str(user.id), version)
+        if payload.get("ver") != version:
+            raise AuthenticationError("Refresh token revoked")
+
+        jti, family = payload.get("jti"), payload.get("fam")
+        if not jti or not family:
+            # Emitido antes de registrar los refresh tokens: requiere un login nuevo
+            raise AuthenticationError("Refresh token revoked")
+        if not await self.user_repo.consume_refresh_token(jti):
+            stored = await self.user_repo.get_refresh_token(jti)
+            if stored is not None and stored.used_at is not None:
+                await self.user_repo.revoke_refresh_family(stored.family_id)
+                raise AuthenticationError("Refresh token reuse detected")
+            raise AuthenticationError("Refresh token revoked")
+        return await self.issue_tokens(user, family)
+
+    async def revoke_tokens(self, user_id: str) -> None:
+        """
+        Invalida todos los tokens emitidos hasta ahora para el usuario.
+        """
+        version = await self.user_repo.increment_token_version(user_id)
+        if version is None:
+            raise NotFoundError("User not found")
+        token_versions.note(user_id, version)
 
     async def get_user(self, user_id: str) -> User:
         """
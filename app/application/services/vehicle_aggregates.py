@@ -0,0 +1,56 @@
+"""
+Conteos de vehículos por marca, lugar de llegada y día de creación.
+
+Los conteos viven en la tabla ``vehicle_counts`` y el repositorio los ajusta
+en la misma transacción que cada escritura de vehículos (altas, ediciones,
+borrados, operaciones masivas e importación), así que todos los workers leen
+los mismos números y leerlos cuesta O(grupos) y no O(filas).
+
+``reconcile`` reconstruye la tabla con ``GROUP BY`` sobre la tabla base. Corre
+al arrancar (la llena con los vehículos existentes) y periódicamente (ver
+``run_reconciliation``) para corregir escrituras hechas fuera de la API.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger("app.aggregates")
+
+
+class VehicleAggregates:
+    def __init__(self):
+        self.reconciled_at: datetime | None = None
+        self._lock = asyncio.Lock()
+
+    async def reconcile(self, vehicle_repo) -> None:
+        """Reemplaza los conteos guardados por los conteos reales de la tabla."""
+        async with self._lock:
+            corrected = await vehicle_repo.rebuild_aggregate_counts()
+            if corrected and self.reconciled_at is not None:
+                logger.info("Vehicle aggregates drifted in %d group(s); reconciled", corrected)
+            self.reconciled_at = datetime.now(timezone.utc)
+
+    def snapshot(self, counts: dict[str, dict[str, int]]) -> dict:
+        return {
+            "total": sum(counts.get("brand", {}).values()),
+            "by_brand": dict(counts.get("brand", {})),
+            "by_arrival_location": dict(counts.get("arrival_location", {})),
+            "by_created_day": dict(sorted(counts.get("created_day", {}).items())),
+            "reconciled_at": self.reconciled_at,
+        }
+
+
+vehicle_aggregates = VehicleAggregates()
+
+
+async def run_reconciliation(aggregates: VehicleAggregates, sessionmaker, repo_factory, interval: float):
+    """Tarea de fondo: reconcilia al arrancar y luego cada ``interval`` segundos."""
+    while True:
+        try:
+            async with sessionmaker() as session:
+                await aggregates.reconcile(repo_factory(session))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Vehicle aggregates reconciliation failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,127 @@
+"""
+Importación de vehículos desde CSV sin cargar el archivo completo.
+
+Los bytes llegan por chunks y pasan por un decoder UTF-8 incremental y por
+``CsvRecordSplitter``, que solo entrega registros completos (un salto de línea
+dentro de un campo entre comillas no corta el registro). Cada lote de
+``IMPORT_BATCH_SIZE`` filas se valida con las reglas de ``VehicleCreate`` y se
+inserta en su propia transacción, así que la memoria queda acotada por el
+tamaño del lote y no por el del archivo.
+"""
+import codecs
+import csv
+from typing import AsyncIterator
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
+from app.application.exceptions import ValidationError
+from app.domain.schemas.vehicle_schema import VehicleCreate
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+# Un registro más largo que esto (p. ej. una comilla sin cerrar) aborta la importación
+MAX_RECORD_CHARS = 65536
+
+REQUIRED_COLUMNS = tuple(VehicleCreate.model_fields)
+
+_ROWS = TypeAdapter(list[VehicleCreate])
+
+
+class CsvRecordSplitter:
+    """Corta texto en registros CSV completos a medida que llega."""
+
+    def __init__(self, max_record_chars: int = MAX_RECORD_CHARS):
+        self.max_record_chars = max_record_chars
+        self._parts: list[str] = []
+        self._size = 0
+        self._quotes = 0
+
+    def _append(self, piece: str):
+        self._parts.append(piece)
+        self._size += len(piece)
+        self._quotes += piece.count('"')
+        if self._size > self.max_record_chars:
+            raise ValidationError(f"CSV record longer than {self.max_record_chars} characters")
+
+    def _take(self) -> str:
+        record = "".join(self._parts)
+        self._parts, self._size, self._quotes = [], 0, 0
+        return record
+
+    def feed(self, text: str) -> list[str]:
+        records = []
+        start = 0
+        while (newline := text.find("\n", start)) != -1:
+            self._append(text[start:newline + 1])
+            # Con comillas balanceadas el salto de línea no está dentro de un campo
+            if self._quotes % 2 == 0:
+                records.append(self._take())
+            start = newline + 1
+        if start < len(text):
+            self._append(text[start:])
+        return records
+
+    def close(self) -> list[str]:
+        return [self._take()] if self._parts else []
+
+
+async def read_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, list[str]]]:
+    """(número de línea, celdas) de cada registro del CSV, en orden."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    splitter = CsvRecordSplitter()
+    line = 1
+
+    def parse(records: list[str]):
+        nonlocal line
+        for record, row in zip(records, csv.reader(records)):
+            yield line, row
+            line += record.count("\n")
+
+    try:
+        async for chunk in chunks:
+            for item in parse(splitter.feed(decoder.decode(chunk))):
+                yield item
+        for item in parse(splitter.feed(decoder.decode(b"", final=True)) + splitter.close()):
+            yield item
+    except UnicodeDecodeError:
+        raise ValidationError(f"CSV is not valid UTF-8 (near line {line})")
+
+
+def parse_header(row: list[str]) -> list[str]:
+    header = [cell.strip().lower() for cell in row]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValidationError(f"CSV header is missing columns: {', '.join(missing)}")
+    return header
+
+
+def validate_batch(rows: list[tuple[int, dict]]) -> tuple[list[VehicleCreate], list[tuple[int, str]]]:
+    """Valida el lote de una vez; solo si hay errores se vuelve a validar el resto."""
+    try:
+        return _ROWS.validate_python([row for _, row in rows]), []
+    except PydanticValidationError as exc:
+        errors: dict[int, str] = {}
+        for error in exc.errors():
+            index, *location = error["loc"]
+            errors.setdefault(index, f"{'.'.join(map(str, location))}: {error['msg']}" if location else error["msg"])
+        valid = _ROWS.validate_python([row for i, (_, row) in enumerate(rows) if i not in errors])
+        return valid, [(rows[i][0], message) for i, message in sorted(errors.items())]
+
+
+class ImportSummary:
+    def __init__(self, max_errors: int = IMPORT_MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.rejected = 0
+        self.errors: list[dict] = []
+
+    def reject(self, line: int, message: str):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
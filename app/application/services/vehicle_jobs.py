@@ -0,0 +1,48 @@
+"""
+Handlers de trabajos en segundo plano para operaciones masivas de vehículos.
+
+Con ``ids`` se procesa por chunks de ``JOB_CHUNK_SIZE``, cada uno en su propia
+transacción: entre chunks se informa el avance y se atiende la cancelación.
+Un trabajo cancelado o reencolado deja aplicados los chunks ya confirmados;
+repetirlos es inofensivo (mismo UPDATE, o DELETE de filas que ya no existen).
+Con ``filter`` se ejecuta una sola sentencia por conjunto.
+"""
+from app.application.services.job_runner import JobContext, JobHandler
+from app.application.services.vehicle_service import VehicleService
+from app.domain.schemas.vehicle_schema import VehicleChanges, VehicleFilter
+
+VEHICLE_BULK_UPDATE = "vehicle_bulk_update"
+VEHICLE_BULK_DELETE = "vehicle_bulk_delete"
+
+JOB_CHUNK_SIZE = 1000
+
+
+def vehicle_job_handlers(repo_factory, aggregates=None, reads=None) -> dict[str, JobHandler]:
+
+    async def run_chunks(ctx: JobContext, operation) -> dict:
+        ids = ctx.params.get("ids")
+        if ids is None:
+            chunks, total = [None], 1
+        else:
+            chunks, total = [ids[i:i + JOB_CHUNK_SIZE] for i in range(0, len(ids), JOB_CHUNK_SIZE)], len(ids)
+        affected: list[str] = []
+        done = 0
+        await ctx.progress(done, total)
+        for chunk in chunks:
+            async with ctx.session() as session:
+                service = VehicleService(repo_factory(session), aggregates, reads)
+                affected.extend(await operation(service, chunk))
+            done += 1 if chunk is None else len(chunk)
+            await ctx.progress(done, total)
+        return {"affected": len(affected), "ids": affected}
+
+    async def bulk_update(ctx: JobContext) -> dict:
+        filters = VehicleFilter(**ctx.params["filter"]) if ctx.params.get("filter") else None
+        changes = VehicleChanges(**ctx.params["changes"])
+        return await run_chunks(ctx, lambda service, ids: service.bulk_update_vehicles(ids, filters, changes))
+
+    async def bulk_delete(ctx: JobContext) -> dict:
+        filters = VehicleFilter(**ctx.params["filter"]) if ctx.params.get("filter") else None
+        return await run_chunks(ctx, lambda service, ids: service.bulk_delete_vehicles(ids, filters))
+
+    return {VEHICLE_BULK_UPDATE: bulk_update, VEHICLE_BULK_DELETE: bulk_delete}
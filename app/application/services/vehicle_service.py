@@ -1,15 +1,78 @@
+from uuid import UUID
 from app.application.interfaces.vehicle_repository import IVehicleRepository
-from app.domain.schemas.vehicle_schema import VehicleCreate
+from app.domain.schemas.vehicle_schema import VehicleCreate, VehicleChanges, VehicleFilter
 from app.domain.models.vehicle_model import Vehicle
+from app.domain.models.vehicle_record import VehicleChange, VehicleRecord
 from app.application.exceptions import NotFoundError
+from app.application.services.vehicle_aggregates import VehicleAggregates
+from app.core.single_flight import SingleFlight
+from app.application.exceptions import ValidationError
+from app.application.services.vehicle_import import (
+    IMPORT_BATCH_SIZE, ImportSummary, parse_header, read_csv_rows, validate_batch,
+)
+
+def _parse_ids(vehicle_ids: list[str]) -> dict[str, UUID | None]:
+    """Ids sin repetir, en orden, con su UUID (None si no es válido)."""
+    parsed: dict[str, UUID | None] = {}
+    for raw in vehicle_ids:
+        if raw not in parsed:
+            try:
+                parsed[raw] = UUID(raw)
+            except ValueError:
+                parsed[raw] = None
+    return parsed
+
+def _parse_cursor(since: str | None) -> tuple[int, UUID | None]:
+    """``since`` es un número de secuencia o el cursor ``seq:id`` de la página anterior."""
+    if since is None:
+        # Desde el principio, incluidas las filas anteriores al feed (change_seq = 0)
+        return -1, None
+    seq, _, after_id = since.partition(":")
+    try:
+        return int(seq), UUID(after_id) if after_id else None
+    except ValueError:
+        raise ValidationError("Invalid 'since' cursor")
 
 class VehicleService:
    
-    def __init__(self, vehicle_repo: IVehicleRepository):
+    def __init__(self, vehicle_repo: IVehicleRepository, aggregates: VehicleAggregates | None = None,
+                 reads: SingleFlight | None = None):
         self.vehicle_repo = vehicle_repo
+        self.aggregates = aggregates
+        # Lecturas idénticas concurrentes comparten una consulta (resultados inmutables)
+        self.reads = reads
+
+    async def _read(self, key: tuple, fetch):
+        if self.reads is None:
+            return await fetch()
+        result, _ = await self.reads.do(key, fetch)
+        return result
 
-    async def list_vehicles(self, limit: int = 10, offset: int = 0) -> list[Vehicle]:
-        return await self.vehicle_repo.list(limit=limit, offset=offset)
+    def _written(self):
+        # Las lecturas que empezaron antes de la escritura no se comparten con las siguientes
+        if self.reads is not None:
+            self.reads.forget_all()
+
+    async def list_vehicles(self, limit: int = 10, offset: int = 0) -> list[VehicleRecord]:
+        return await self._read(("list", limit, offset), lambda: self.vehicle_repo.list_records(limit=limit, offset=offset))
+
+    async def get_changes(self, since: str | None, limit: int) -> tuple[list[VehicleChange], str, bool]:
+        """
+        Página del feed de cambios posterior a ``since``.
+        Devuelve (cambios, cursor para la próxima llamada, si hay más).
+        """
+        change_seq, after_id = _parse_cursor(since)
+        changes = await self._read(
+            ("changes", change_seq, after_id, limit),
+            lambda: self.vehicle_repo.changes_since(change_seq, after_id, limit + 1),
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if changes:
+            next_since = f"{changes[-1].change_seq}:{changes[-1].id}"
+        else:
+            next_since = since if since is not None else "0"
+        return changes, next_since, has_more
 
     async def create_vehicle(self, vehicle_in: VehicleCreate) -> Vehicle:
         """
@@ -18,14 +81,32 @@ class VehicleService:
         """
         vehicle = Vehicle(**vehicle_in.model_dump())
         created = await self.vehicle_repo.create(vehicle)
+        self._written()
         return created
 
-    async def get_vehicle(self, vehicle_id: str) -> Vehicle:
-        v = await self.vehicle_repo.get_by_id(vehicle_id)
+    async def get_vehicle(self, vehicle_id: str) -> VehicleRecord:
+        v = await self._read(("get", vehicle_id), lambda: self.vehicle_repo.get_record(vehicle_id))
         if not v:
             raise NotFoundError("Vehicle not found")
         return v
 
+    async def get_vehicles(self, vehicle_ids: list[str]) -> tuple[list[VehicleRecord], list[str]]:
+        """
+        Obtiene varios vehículos en una sola pasada.
+        Devuelve (registros en el orden pedido, ids inexistentes o inválidos);
+        los ids repetidos se consultan y devuelven una sola vez.
+        """
+        parsed = _parse_ids(vehicle_ids)
+        found = {str(r.id): r for r in await self.vehicle_repo.get_many([u for u in parsed.values() if u is not None])}
+        records, missing = [], []
+        for raw, uuid_id in parsed.items():
+            record = found.get(str(uuid_id)) if uuid_id is not None else None
+            if record is None:
+                missing.append(raw)
+            else:
+                records.append(record)
+        return records, missing
+
     async def update_vehicle(self, vehicle_id: str, vehicle_in: VehicleCreate) -> Vehicle:
         """
         Modelo simple de actualización:
@@ -39,6 +120,7 @@ class VehicleService:
         for k, val in vehicle_in.model_dump().items():
             setattr(existing, k, val)
         updated = await self.vehicle_repo.update(existing)
+        self._written()
         return updated
 
     async def delete_vehicle(self, vehicle_id: str) -> None:
@@ -46,3 +128,85 @@ class VehicleService:
         if not existing:
             raise NotFoundError("Vehicle not found")
         await self.vehicle_repo.delete(vehicle_id)
+        self._written()
+
+    async def bulk_update_vehicles(
+        self, vehicle_ids: list[str] | None, filters: VehicleFilter | None, changes: VehicleChanges
+    ) -> list[str]:
+        """
+        Aplica ``changes`` a los vehículos seleccionados por ids o por filtro
+        con sentencias UPDATE por conjunto y un solo commit. Devuelve los ids afectados.
+        """
+        ids = self._valid_ids(vehicle_ids)
+        if ids == []:
+            return []
+        updated = await self.vehicle_repo.bulk_update(
+            ids, filters.model_dump(exclude_none=True) if filters else None, changes.model_dump(exclude_none=True)
+        )
+        self._written()
+        return [str(i) for i in updated]
+
+    async def bulk_delete_vehicles(self, vehicle_ids: list[str] | None, filters: VehicleFilter | None) -> list[str]:
+        ids = self._valid_ids(vehicle_ids)
+        if ids == []:
+            return []
+        deleted = await self.vehicle_repo.bulk_delete(ids, filters.model_dump(exclude_none=True) if filters else None)
+        self._written()
+        return [str(i) for i in deleted]
+
+    async def import_vehicles_csv(self, chunks, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+        """
+        Importa un CSV (con encabezado brand, arrival_location, applicant) leído
+        por chunks. Las filas inválidas se reportan con su número de línea y no
+        detienen la importación; cada lote válido se confirma por separado.
+        """
+        summary = ImportSummary()
+        header: list[str] | None = None
+        batch: list[tuple[int, dict]] = []
+
+        async def flush():
+            valid, rejected = validate_batch(batch)
+            for line, message in rejected:
+                summary.reject(line, message)
+            summary.inserted += await self.vehicle_repo.bulk_insert([v.model_dump() for v in valid])
+            batch.clear()
+
+        try:
+            async for line, row in read_csv_rows(chunks):
+                if header is None:
+                    header = parse_header(row)
+                elif not any(cell.strip() for cell in row):
+                    continue
+                elif len(row) != len(header):
+                    summary.reject(line, f"Expected {len(header)} columns, got {len(row)}")
+                else:
+                    batch.append((line, dict(zip(header, row))))
+                    if len(batch) >= batch_size:
+                        await flush()
+            if batch:
+                await flush()
+        except ValidationError as e:
+            if summary.inserted:
+                e.message = f"{e.message} ({summary.inserted} rows were imported before the error)"
+            raise
+        finally:
+            if summary.inserted:
+                self._written()
+        if header is None:
+            raise ValidationError("CSV file is empty")
+        return summary.as_dict()
+
+    @staticmethod
+    def _valid_ids(vehicle_ids: list[str] | None) -> list[UUID] | None:
+        # Los ids inválidos no pueden existir: simplemente no aparecen entre los afectados
+        if vehicle_ids is None:
+            return None
+        return [u for u in _parse_ids(vehicle_ids).values() if u is not None]
+
+    async def get_aggregates(self) -> dict:
+        """
+        Conteos por marca, lugar de llegada y día de creación (O(grupos)).
+        """
+        if self.aggregates is None:
+            self.aggregates = VehicleAggregates()
+        return self.aggregates.snapshot(await self.vehicle_repo.aggregate_counts())
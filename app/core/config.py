@@ -11,11 +11,14 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str = Field(..., description="Database connection URL")
+    READ_DATABASE_URL: Optional[str] = Field(default=None, description="Read replica URL for read-only routes (falls back to DATABASE_URL)")
+    READ_YOUR_WRITES_SECONDS: float = Field(default=5.0, ge=0, description="After a write, the client reads from the primary for this long")
     
     # JWT Configuration
     JWT_SECRET: str = Field(..., min_length=32, description="JWT secret key")
     JWT_ALGORITHM: str = Field(default="HS256", description="JWT algorithm")
-    JWT_EXPIRATION_MINUTES: int = Field(default=60, ge=1, le=10080, description="JWT expiration in minutes")
+    JWT_EXPIRATION_MINUTES: int = Field(default=15, ge=1, le=10080, description="Access token expiration in minutes")
+    JWT_REFRESH_EXPIRATION_MINUTES: int = Field(default=10080, ge=1, le=43200, description="Refresh token expiration in minutes")
     
     # API Configuration
     API_V1_STR: str = "/api/v1"
@@ -27,6 +30,82 @@ class Settings(BaseSettings):
     # Server Configuration
     HOST: str = Field(default="0.0.0.0", description="Server host")
     PORT: int = Field(default=8000, ge=1, le=65535, description="Server port")
+    WEB_CONCURRENCY: int = Field(default=0, ge=0, description="Worker processes for app.server (0 sizes from available CPUs and memory when rate limiting and idempotency use shared backends, else 1)")
+    WEB_MAX_WORKERS: int = Field(default=8, ge=1, description="Upper bound for the auto-sized worker count")
+    WORKER_MEMORY_MB: int = Field(default=256, ge=32, description="Expected memory per worker, caps the auto-sized count")
+    SERVER_KEEPALIVE_SECONDS: int = Field(default=65, ge=1, description="Idle keep-alive timeout (keep it above the proxy's idle timeout)")
+    SERVER_BACKLOG: int = Field(default=2048, ge=1, description="Pending connections queued by the listening socket")
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = Field(default=30, ge=0, description="Time given to in-flight requests after SIGTERM")
+    FORWARDED_ALLOW_IPS: str = Field(default="127.0.0.1", description="Proxies trusted for X-Forwarded-For/-Proto (comma separated, '*' behind Render's proxy)")
+    
+    # Compression Configuration
+    COMPRESSION_ENABLED: bool = Field(default=True, description="Compress responses (zstd/br/gzip)")
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, ge=0, description="Bodies below this size are sent uncompressed")
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = Field(default=65536, ge=0, description="Chunks at least this large are compressed in the thread pool")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, ge=1, le=9)
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11)
+    COMPRESSION_ZSTD_LEVEL: int = Field(default=3, ge=1, le=22)
+    
+    # Metrics Configuration
+    METRICS_ENABLED: bool = Field(default=True, description="Collect request and DB metrics for /metrics")
+    
+    # Query Tracking Configuration (slow-query log + detector de N+1)
+    QUERY_TRACKING_MODE: str = Field(default="warn", pattern="^(off|warn|raise)$", description="What to do when a request exceeds its query budget")
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=200.0, ge=0, description="Log statements slower than this (0 disables)")
+    QUERY_COUNT_LIMIT: int = Field(default=20, ge=0, description="Max queries per request (0 disables)")
+    QUERY_REPEAT_LIMIT: int = Field(default=1, ge=0, description="Max executions of the same statement shape per request (0 disables)")
+    
+    # Profiling Configuration (opt-in, ver app/presentation/middleware/profiling.py)
+    PROFILING_ENABLED: bool = Field(default=False, description="Install the per-request profiling middleware")
+    PROFILING_TOKEN: Optional[str] = Field(default=None, min_length=16, description="Value of the X-Profile header that triggers a profile")
+    PROFILING_SAMPLE_EVERY: int = Field(default=0, ge=0, description="Profile 1 in N requests (0 disables sampling)")
+    PROFILING_INTERVAL_MS: float = Field(default=5.0, gt=0, description="Stack sampling interval in milliseconds")
+    PROFILING_DIR: str = Field(default="profiles", description="Directory where collapsed stacks are stored")
+    PROFILING_MAX_FILES: int = Field(default=200, ge=1, description="Number of profiles kept on disk")
+    
+    # Rate Limiting Configuration (intentos de login)
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Throttle login attempts before any DB or bcrypt work")
+    RATE_LIMIT_STORAGE_URL: Optional[str] = Field(default=None, description="Shared backend for multiple workers (redis://...); in-process when unset")
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = Field(default=10, ge=0, description="Login attempts per username per window (0 disables)")
+    LOGIN_RATE_LIMIT_PER_IP: int = Field(default=100, ge=0, description="Login attempts per client IP per window (0 disables)")
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = Field(default=60.0, gt=0, description="Sliding window length")
+    
+    # Idempotency Configuration (header Idempotency-Key en POST/PUT/PATCH)
+    IDEMPOTENCY_ENABLED: bool = Field(default=True, description="Replay stored responses for repeated Idempotency-Key values")
+    IDEMPOTENCY_BACKEND: str = Field(default="memory", pattern="^(memory|database)$", description="Where stored responses live")
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=86400, ge=1, description="How long a key and its response are kept")
+    IDEMPOTENCY_MAX_ENTRIES: int = Field(default=10000, ge=1, description="Bound for the in-memory store")
+    IDEMPOTENCY_MAX_REQUEST_BYTES: int = Field(default=1_048_576, ge=1, description="Largest request body buffered for an Idempotency-Key (larger ones get 413)")
+    
+    # Response Cache Configuration (GET /vehicles/ anónimo)
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True, description="Serve anonymous vehicle list requests from a short-lived in-process cache")
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(default=2.0, gt=0, description="Age under which a cached response is served as is")
+    RESPONSE_CACHE_STALE_SECONDS: float = Field(default=10.0, ge=0, description="Extra age during which stale content is served while one request recomputes it")
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=256, ge=1, description="Distinct query strings kept per process")
+    
+    # Background Jobs Configuration
+    JOBS_ENABLED: bool = Field(default=True, description="Run queued background jobs in this process")
+    JOB_WORKERS: int = Field(default=2, ge=1, le=64, description="Jobs executed concurrently per process")
+    JOB_POLL_SECONDS: float = Field(default=2.0, gt=0, description="How often idle workers look for queued jobs")
+    JOB_HEARTBEAT_SECONDS: float = Field(default=10.0, gt=0, description="Running jobs are renewed at this interval; silent for 6x this, they are requeued")
+    
+    # Aggregates Configuration
+    AGGREGATES_RECONCILE_SECONDS: float = Field(default=300.0, ge=0, description="Interval of the GROUP BY rebuild of the vehicle_counts summary table (0 disables the background job, including the initial fill at startup)")
+    
+    # Geofencing Configuration
+    GEOFENCE_GRID_CELL_DEGREES: float = Field(default=0.05, gt=0, description="Cell size of the spatial grid used to pick candidate geofences")
+    GEOFENCE_REFRESH_SECONDS: float = Field(default=5.0, gt=0, description="Max age of the per-process geofence index (picks up changes made by other workers)")
+    
+    # Trip Detection Configuration
+    TRIP_STOP_SPEED_KMH: float = Field(default=3.0, ge=0, description="Speed below which a vehicle counts as stationary")
+    TRIP_STOP_DWELL_SECONDS: int = Field(default=180, ge=1, description="Time stationary before a trip is closed and a stop begins")
+    TRIP_MIN_DISTANCE_METERS: float = Field(default=100.0, ge=0, description="Shorter trips are discarded as GPS noise")
+    TRIP_MAX_GAP_SECONDS: int = Field(default=900, ge=1, description="A trip without positions for longer than this is closed at its last point")
+    
+    # WebSocket Configuration
+    WS_KEYFRAME_INTERVAL: int = Field(default=20, ge=1, le=1000, description="Binary frames per vehicle between keyframes")
+    WS_BROADCAST_ENABLED: bool = Field(default=True, description="Fan out ingested positions and geofence events to /ws clients; only reaches clients of the same worker, so it keeps app.server at one auto-sized worker")
+    WS_SEND_QUEUE_SIZE: int = Field(default=64, ge=1, description="Messages queued per WebSocket client before it is disconnected as too slow")
     
     # Environment
     ENVIRONMENT: str = Field(default="development", pattern="^(development|staging|production)$")
@@ -38,8 +117,10 @@ class Settings(BaseSettings):
         "validate_assignment": True
     }
 
-    @field_validator("DATABASE_URL")
+    @field_validator("DATABASE_URL", "READ_DATABASE_URL")
     def validate_database_url(cls, v):
+        if v is None:
+            return v
         # Aceptar múltiples formatos de URLs de PostgreSQL
         valid_prefixes = (
             "postgresql://", 
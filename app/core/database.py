@@ -1,23 +1,135 @@
+import hashlib
+import time
+from functools import lru_cache
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.core.metrics import DB_READ_ROUTING, instrument_engine
+from app.core.query_tracking import install_query_tracking
 
 # Convertir URL de PostgreSQL para usar asyncpg
-def get_database_url():
-    url = settings.DATABASE_URL
+def get_database_url(url: str | None = None):
+    url = url or settings.DATABASE_URL
     if url.startswith("postgresql://"):
         # Cambiar a postgresql+asyncpg:// para usar asyncpg driver
         url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif url.startswith("sqlite://"):
+        url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
     return url
 
-DATABASE_URL = get_database_url()
+def build_engine(url: str):
+    engine = create_async_engine(url, echo=False, future=True)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine.sync_engine)
+    if settings.QUERY_TRACKING_MODE != "off":
+        install_query_tracking(engine.sync_engine, slow_threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS)
+    return engine
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+# Los engines se construyen en el primer uso: importar la app no carga el
+# driver (asyncpg) ni abre el pool, lo que acorta el arranque de cada worker.
+@lru_cache(maxsize=None)
+def get_engine():
+    return build_engine(get_database_url())
+
+@lru_cache(maxsize=None)
+def get_sessionmaker():
+    return async_sessionmaker(get_engine(), expire_on_commit=False, class_=AsyncSession)
+
+# Réplica de lectura opcional; sin ella las lecturas van al primario
+@lru_cache(maxsize=None)
+def get_read_sessionmaker():
+    if not settings.READ_DATABASE_URL:
+        return None
+    read_engine = build_engine(get_database_url(settings.READ_DATABASE_URL))
+    return async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+def new_session() -> AsyncSession:
+    return get_sessionmaker()()
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "AsyncSessionLocal": get_sessionmaker,
+    "AsyncReadSessionLocal": get_read_sessionmaker,
+    "DATABASE_URL": get_database_url,
+}
+
+def __getattr__(name: str):
+    # Compatibilidad con ``from app.core.database import engine`` sin construirlo al importar
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
 
 # Dependency
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with new_session() as session:
+        yield session
+
+
+STICKY_COOKIE = "rw_primary_until"
+
+def client_key(headers, client_host: str | None) -> str:
+    """Identifica al cliente para read-your-writes: su credencial o, si no tiene, su IP."""
+    authorization = headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return client_host or ""
+
+class ReadYourWrites:
+    """
+    Clientes que escribieron hace menos de ``window`` segundos: sus lecturas van
+    al primario para no ver datos atrasados de la réplica. Se registra en este
+    proceso y en una cookie (para que también lo respeten los demás workers).
+    """
+
+    def __init__(self, window: float, max_entries: int = 100_000):
+        self.window = window
+        self.max_entries = max_entries
+        self._until: dict[str, float] = {}
+
+    def record(self, key: str) -> float:
+        until = time.time() + self.window
+        self._until.pop(key, None)
+        if len(self._until) >= self.max_entries:
+            del self._until[next(iter(self._until))]
+        self._until[key] = until
+        return until
+
+    def is_sticky(self, key: str, cookie: str | None = None) -> bool:
+        now = time.time()
+        if cookie:
+            try:
+                if float(cookie) > now:
+                    return True
+            except ValueError:
+                pass
+        until = self._until.get(key)
+        if until is None:
+            return False
+        if until <= now:
+            del self._until[key]
+            return False
+        return True
+
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_db)):
+    """
+    Sesión para rutas de solo lectura: réplica si está configurada y el cliente
+    no escribió recientemente; en otro caso el primario (la sesión de ``get_db``,
+    que no abre conexión si no se usa).
+    """
+    read_sessionmaker = get_read_sessionmaker()
+    if read_sessionmaker is None:
+        yield primary
+        return
+    key = client_key(request.headers, request.client.host if request.client else None)
+    if read_your_writes.is_sticky(key, request.cookies.get(STICKY_COOKIE)):
+        DB_READ_ROUTING.labels("primary_sticky").inc()
+        yield primary
+        return
+    DB_READ_ROUTING.labels("replica").inc()
+    async with read_sessionmaker() as session:
         yield session
@@ -0,0 +1,99 @@
+"""
+Almacenes de respuestas para ``Idempotency-Key``.
+
+ - ``InMemoryIdempotencyStore``: dict ordenado por expiración, acotado en
+   tamaño; por proceso.
+ - ``DatabaseIdempotencyStore``: tabla ``idempotency_keys`` para compartir las
+   respuestas entre workers y reinicios. Las filas vencidas se purgan cada
+   ``purge_every`` escrituras.
+
+El middleware (app/presentation/middleware/idempotency.py) decide qué se
+guarda; aquí solo se persiste y se expira.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Protocol
+from sqlalchemy import delete
+from app.domain.models.idempotency_model import IdempotencyRecord
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    headers: list
+    body: bytes
+
+
+class IdempotencyStore(Protocol):
+    async def get(self, key: str) -> StoredResponse | None:
+        ...
+
+    async def set(self, key: str, response: StoredResponse, ttl: float) -> None:
+        ...
+
+
+class InMemoryIdempotencyStore:
+    def __init__(self, max_entries: int = 10_000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> StoredResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return response
+
+    async def set(self, key: str, response: StoredResponse, ttl: float) -> None:
+        now = self._clock()
+        # Con un TTL fijo el orden de inserción es el de expiración: se purga por el frente
+        while self._entries:
+            oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) < self.max_entries:
+                break
+            del self._entries[oldest_key]
+        self._entries.pop(key, None)
+        self._entries[key] = (now + ttl, response)
+
+
+class DatabaseIdempotencyStore:
+    def __init__(self, sessionmaker, purge_every: int = 100):
+        self.sessionmaker = sessionmaker
+        self.purge_every = purge_every
+        self._writes = 0
+
+    async def get(self, key: str) -> StoredResponse | None:
+        async with self.sessionmaker() as session:
+            record = await session.get(IdempotencyRecord, key)
+            if record is None or _aware(record.expires_at) <= datetime.now(timezone.utc):
+                return None
+            return StoredResponse(record.fingerprint, record.status_code, record.headers, record.body)
+
+    async def set(self, key: str, response: StoredResponse, ttl: float) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.sessionmaker() as session:
+            await session.merge(IdempotencyRecord(
+                key=key,
+                fingerprint=response.fingerprint,
+                status_code=response.status_code,
+                headers=response.headers,
+                body=response.body,
+                expires_at=now + timedelta(seconds=ttl),
+            ))
+            self._writes += 1
+            if self.purge_every and self._writes % self.purge_every == 0:
+                await session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= now))
+            await session.commit()
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite devuelve datetimes naive aunque la columna sea timezone=True
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,159 @@
+"""
+Seguimiento de consultas SQL por request.
+
+ - Log de consultas lentas (por encima de ``SLOW_QUERY_THRESHOLD_MS``) con los
+   parámetros redactados: solo se registra el tipo de cada valor.
+ - Detector de N+1: cada request (o bloque ``track_queries()``) cuenta sus
+   consultas y la "forma" de cada sentencia; si supera ``QUERY_COUNT_LIMIT`` o
+   repite una misma forma más de ``QUERY_REPEAT_LIMIT`` veces, avisa (``warn``)
+   o falla (``raise``, pensado para la suite de pruebas).
+
+El tracker activo vive en un ContextVar, así que las consultas emitidas desde
+el greenlet de SQLAlchemy se atribuyen a la request que las originó.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+logger = logging.getLogger("app.queries")
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Una request superó el presupuesto de consultas (modo ``raise``)."""
+
+
+def statement_shape(statement: str) -> str:
+    """Normaliza una sentencia: espacios colapsados y listas IN de cualquier tamaño iguales."""
+    return _IN_LIST.sub("(?, ...)", _WHITESPACE.sub(" ", statement.strip()))
+
+
+def redact_parameters(parameters) -> str:
+    if parameters is None:
+        return "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"[{len(parameters)} rows]"
+        return "[" + ", ".join(f"<{type(v).__name__}>" for v in parameters) + "]"
+    return f"<{type(parameters).__name__}>"
+
+
+class QueryTracker:
+    __slots__ = ("label", "count", "shapes", "total_time", "allow_repeats", "paused")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.shapes: Counter[str] = Counter()
+        self.total_time = 0.0
+        self.allow_repeats = False
+        self.paused = False
+
+    def record(self, statement: str, elapsed: float):
+        if self.paused:
+            return
+        self.count += 1
+        self.total_time += elapsed
+        if not self.allow_repeats:
+            self.shapes[statement_shape(statement)] += 1
+
+    def violations(self, count_limit: int, repeat_limit: int) -> list[str]:
+        problems = []
+        if count_limit and self.count > count_limit:
+            problems.append(f"{self.count} queries (limit {count_limit})")
+        if repeat_limit:
+            for shape, times in self.shapes.items():
+                if times > repeat_limit:
+                    problems.append(f"{times}x same statement: {shape[:200]}")
+        return problems
+
+
+_current: ContextVar[QueryTracker | None] = ContextVar("query_tracker", default=None)
+
+
+def current_tracker() -> QueryTracker | None:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(label: str = ""):
+    """Activa un tracker para el bloque (una request, un test, un job)."""
+    tracker = QueryTracker(label)
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Repeticiones legítimas (p. ej. consultas por chunks): cuentan para el total, no como N+1."""
+    tracker = _current.get()
+    previous = tracker.allow_repeats if tracker else False
+    if tracker:
+        tracker.allow_repeats = True
+    try:
+        yield
+    finally:
+        if tracker:
+            tracker.allow_repeats = previous
+
+
+@contextmanager
+def untracked_queries():
+    """Cargas masivas (importaciones): sus lotes no cuentan para el presupuesto de la request."""
+    tracker = _current.get()
+    previous = tracker.paused if tracker else False
+    if tracker:
+        tracker.paused = True
+    try:
+        yield
+    finally:
+        if tracker:
+            tracker.paused = previous
+
+
+def check_budget(tracker: QueryTracker, count_limit: int, repeat_limit: int, mode: str = "warn") -> None:
+    problems = tracker.violations(count_limit, repeat_limit)
+    if not problems:
+        return
+    message = f"Query budget exceeded in {tracker.label or 'block'}: " + "; ".join(problems)
+    if mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def install_query_tracking(sync_engine, slow_threshold_ms: float = 200.0) -> None:
+    if getattr(sync_engine, "_query_tracking_installed", False):
+        return
+    slow_threshold = slow_threshold_ms / 1000
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_tracking_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("query_tracking_start")
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        tracker = _current.get()
+        if tracker is not None:
+            tracker.record(statement, elapsed)
+        if slow_threshold and elapsed >= slow_threshold:
+            logger.warning(
+                "Slow query (%.1f ms): %s params=%s",
+                elapsed * 1000, _WHITESPACE.sub(" ", statement.strip())[:500], redact_parameters(parameters),
+            )
+
+    event.listen(sync_engine, "before_cursor_execute", before)
+    event.listen(sync_engine, "after_cursor_execute", after)
+    sync_engine._query_tracking_installed = True
@@ -0,0 +1,131 @@
+"""
+Rate limiting con ventanas deslizantes aproximadas ("sliding window counter").
+
+Cada clave guarda solo dos contadores: el de la ventana fija actual y el de la
+anterior. El conteo estimado es::
+
+    previo * (1 - fracción transcurrida de la ventana actual) + actual
+
+lo que da una ventana deslizante con O(1) por chequeo y memoria constante por
+clave (sin listas de timestamps).
+
+Backends:
+ - ``InMemoryRateLimitBackend``: dicts repartidos en shards por hash de la
+   clave; cada shard purga sus entradas vencidas cuando crece y, si aun así
+   supera su cupo, expulsa las más antiguas. Solo sirve para un proceso.
+ - ``RedisRateLimitBackend``: mismo algoritmo sobre ``INCR``/``EXPIRE`` para
+   compartir los contadores entre workers (``redis`` es opcional).
+"""
+import math
+import time
+from typing import Protocol
+
+
+def _estimate(previous: int, current: int, elapsed: float, window: float) -> float:
+    return previous * max(0.0, 1.0 - elapsed / window) + current
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        """Registra un intento; devuelve (permitido, segundos hasta reintentar)."""
+        ...
+
+
+class _Bucket:
+    __slots__ = ("window_index", "current", "previous")
+
+    def __init__(self, window_index: int):
+        self.window_index = window_index
+        self.current = 0
+        self.previous = 0
+
+
+class InMemoryRateLimitBackend:
+    def __init__(self, shards: int = 16, max_keys: int = 100_000, clock=time.monotonic):
+        self._shards: list[dict[str, _Bucket]] = [{} for _ in range(max(1, shards))]
+        self._max_per_shard = max(1, max_keys // len(self._shards))
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def _purge(self, shard: dict[str, _Bucket], window_index: int):
+        # Dos ventanas atrás el contador ya no aporta nada a la estimación
+        for key in [k for k, b in shard.items() if b.window_index < window_index - 1]:
+            del shard[key]
+        while len(shard) >= self._max_per_shard:
+            del shard[next(iter(shard))]
+
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        now = self._clock()
+        window_index = int(now // window)
+        elapsed = now - window_index * window
+        shard = self._shards[hash(key) % len(self._shards)]
+
+        bucket = shard.get(key)
+        if bucket is None:
+            if len(shard) >= self._max_per_shard:
+                self._purge(shard, window_index)
+            bucket = shard[key] = _Bucket(window_index)
+        elif bucket.window_index != window_index:
+            bucket.previous = bucket.current if bucket.window_index == window_index - 1 else 0
+            bucket.current = 0
+            bucket.window_index = window_index
+
+        bucket.current += 1
+        if _estimate(bucket.previous, bucket.current, elapsed, window) <= limit:
+            return True, 0.0
+        return False, window - elapsed
+
+
+class RedisRateLimitBackend:
+    def __init__(self, url: str, prefix: str = "ratelimit", clock=time.time):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:  # pragma: no cover - dependencia opcional
+            raise RuntimeError("redis is required for RATE_LIMIT_STORAGE_URL=redis://...")
+        self._redis = aioredis.from_url(url)
+        self._prefix = prefix
+        self._clock = clock
+
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        now = self._clock()
+        window_index = int(now // window)
+        elapsed = now - window_index * window
+        current_key = f"{self._prefix}:{key}:{window_index}"
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(window * 2))
+            pipe.get(f"{self._prefix}:{key}:{window_index - 1}")
+            current, _, previous = await pipe.execute()
+        if _estimate(int(previous or 0), int(current), elapsed, window) <= limit:
+            return True, 0.0
+        return False, window - elapsed
+
+
+def create_rate_limit_backend(storage_url: str | None) -> RateLimitBackend:
+    if storage_url and storage_url.startswith(("redis://", "rediss://")):
+        return RedisRateLimitBackend(storage_url)
+    return InMemoryRateLimitBackend()
+
+
+class LoginRateLimiter:
+    """Límites de intentos de login por username y por IP de cliente."""
+
+    def __init__(self, backend: RateLimitBackend, per_username: int, per_ip: int, window: float):
+        self.backend = backend
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.window = window
+
+    async def check(self, username: str, client_ip: str | None) -> tuple[str, float] | None:
+        """Devuelve (ámbito, retry_after) del primer límite excedido, o None si se permite."""
+        if self.per_ip and client_ip:
+            allowed, retry_after = await self.backend.hit(f"login:ip:{client_ip}", self.per_ip, self.window)
+            if not allowed:
+                return "ip", retry_after
+        if self.per_username:
+            allowed, retry_after = await self.backend.hit(f"login:user:{username.strip().lower()}", self.per_username, self.window)
+            if not allowed:
+                return "username", retry_after
+        return None
@@ -0,0 +1,81 @@
+"""
+Caché de respuestas ya serializadas (bytes) con TTL corto.
+
+Cada entrada tiene tres edades:
+ - fresca (``age < ttl``): se sirve tal cual (``HIT``);
+ - vencida pero dentro de ``stale_ttl``: la primera request que la ve la
+   recalcula y el resto recibe la copia vieja mientras tanto (``STALE``);
+ - sin entrada o más vieja que ``ttl + stale_ttl``: una sola request por clave
+   recalcula (``MISS``) y las concurrentes esperan ese resultado
+   (``COALESCED``).
+
+El recálculo se coalesce con ``SingleFlight`` y corre dentro de la request que
+lo dispara (usa su sesión de DB). Caché por proceso, acotada a
+``max_entries`` (LRU).
+"""
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Collection, NamedTuple
+from urllib.parse import parse_qsl, urlencode
+from app.core.single_flight import SingleFlight
+
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+COALESCED = "COALESCED"
+
+
+class _Entry(NamedTuple):
+    body: bytes
+    stored_at: float
+
+
+def normalized_key(path: str, query_string: str, used: Collection[str] = ()) -> str:
+    """
+    Ruta + los query params que lee el handler (``used``), ordenados:
+    ``?b=2&a=1`` y ``?a=1&b=2`` comparten entrada. El resto se descarta, así
+    un ``?x=<random>`` no crea entradas nuevas ni esquiva el coalescing.
+    """
+    params = sorted((k, v) for k, v in parse_qsl(query_string, keep_blank_values=True) if k in used)
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+class ResponseCache:
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, max_entries: int = 256, clock=time.monotonic,
+                 name: str = "response_cache"):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._flight = SingleFlight(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> tuple[bytes, str]:
+        """Devuelve (cuerpo, estado) con estado HIT, STALE, MISS o COALESCED."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age < self.ttl:
+                return entry.body, HIT
+            if self._flight.in_flight(key) and age < self.ttl + self.stale_ttl:
+                return entry.body, STALE
+
+        async def compute_and_store() -> bytes:
+            body = await compute()
+            self._store(key, body)
+            return body
+
+        body, shared = await self._flight.do(key, compute_and_store)
+        return body, COALESCED if shared else MISS
+
+    def _store(self, key: str, body: bytes):
+        self._entries[key] = _Entry(body, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -1,21 +1,102 @@
-from passlib.context import CryptContext
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from jose import jwt
+from functools import lru_cache
 from app.core.config import settings
+from app.core.metrics import PASSWORD_VERIFY
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt y jose se importan en el primer uso (no en el arranque del worker)
+@lru_cache(maxsize=None)
+def get_password_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=None)
+def _jose():
+    from jose import jwt, JWTError
+    return jwt, JWTError
+
+class InvalidTokenError(ValueError):
+    """Token JWT inválido, vencido o de otro tipo."""
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
+
+_password_verify = PASSWORD_VERIFY.labels()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    started = time.perf_counter()
+    try:
+        return get_password_context().verify(plain_password, hashed_password)
+    finally:
+        _password_verify.observe(time.perf_counter() - started)
 
-def create_access_token(subject: str, expires_minutes: int | None = None) -> str:
+def create_access_token(subject: str, expires_minutes: int | None = None, claims: dict | None = None) -> str:
+    """
+    Access token de vida corta. ``claims`` (username, ver, ...) permite autorizar
+    las requests a partir del token sin buscar al usuario en la base.
+    """
     expire = datetime.now(timezone.utc) + timedelta(minutes=(expires_minutes or settings.JWT_EXPIRATION_MINUTES))
-    to_encode = {"sub": str(subject), "exp": expire}
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    to_encode = {**(claims or {}), "sub": str(subject), "exp": expire, "typ": ACCESS_TOKEN_TYPE}
+    encoded_jwt = _jose()[0].encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
-def decode_token(token: str) -> dict:
-    return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+def create_refresh_token(subject: str, token_version: int, family: str | None = None,
+                         expires_minutes: int | None = None) -> tuple[str, dict]:
+    """
+    Refresh token de un solo uso. Devuelve (token, claims); ``jti`` y ``fam``
+    identifican el token y la familia de rotación para registrarlos en la base.
+    """
+    expire = datetime.now(timezone.utc) + timedelta(minutes=(expires_minutes or settings.JWT_REFRESH_EXPIRATION_MINUTES))
+    to_encode = {
+        "sub": str(subject),
+        "ver": token_version,
+        "exp": expire,
+        "typ": REFRESH_TOKEN_TYPE,
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
+    }
+    # jose reemplaza "exp" por un entero en el dict que recibe: se le pasa una copia
+    return _jose()[0].encode(dict(to_encode), settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM), to_encode
+
+def decode_token(token: str, expected_type: str | None = None) -> dict:
+    jwt, jwt_error = _jose()
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except jwt_error as e:
+        raise InvalidTokenError(str(e)) from e
+    # Los tokens emitidos antes de existir "typ" solo pueden ser access tokens
+    if expected_type and payload.get("typ", ACCESS_TOKEN_TYPE) != expected_type:
+        raise InvalidTokenError(f"Expected a {expected_type} token")
+    return payload
+
+
+class TokenVersionCache:
+    """
+    Última ``token_version`` conocida por este proceso para cada usuario.
+
+    Se alimenta al revocar y al refrescar (los únicos momentos en que se lee la
+    versión de la base); un access token con una versión menor se rechaza sin
+    consultar la DB. En otros workers la revocación tarda como mucho la vida
+    del access token (``JWT_EXPIRATION_MINUTES``).
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._versions: dict[str, int] = {}
+
+    def note(self, user_id: str, version: int):
+        if version <= self._versions.get(user_id, 0):
+            return
+        if user_id not in self._versions and len(self._versions) >= self.max_entries:
+            del self._versions[next(iter(self._versions))]
+        self._versions[user_id] = version
+
+    def is_revoked(self, user_id: str, version: int) -> bool:
+        return version < self._versions.get(user_id, 0)
+
+
+token_versions = TokenVersionCache()
@@ -0,0 +1,72 @@
+"""
+Coalescencia de llamadas concurrentes idénticas ("single flight").
+
+``await flight.do(key, fn)``: si ya hay una llamada en curso con ``key``, se
+espera su resultado en lugar de ejecutar ``fn`` otra vez. La primera llamada
+("líder") ejecuta ``fn`` en su propio contexto (por ejemplo con su sesión de
+DB), así que no quedan tareas vivas más allá de la request que la inició.
+
+ - Si ``fn`` falla, todas las llamadas que esperaban reciben la misma excepción.
+ - Si el líder se cancela, las que esperaban no se cancelan: una de ellas
+   pasa a ser líder y reintenta.
+ - Cancelar a una llamada que espera no afecta al líder ni a las demás.
+
+``forget(key)`` desacopla la llamada en curso: las siguientes con esa clave
+ejecutan ``fn`` de nuevo (útil tras una escritura, para no devolver una lectura
+que empezó antes de ella).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from app.core.metrics import COALESCED_CALLS
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._metric = COALESCED_CALLS.labels(name)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def forget(self, key: Hashable):
+        self._calls.pop(key, None)
+
+    def forget_all(self):
+        self._calls.clear()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Devuelve (resultado, compartido); ``compartido`` es True si se reutilizó otra llamada."""
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                return await self._lead(key, fn), False
+            try:
+                result = await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+            self.coalesced += 1
+            self._metric.inc()
+            return result, True
+
+    async def _lead(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as exc:
+            future.set_exception(_LeaderCancelled() if isinstance(exc, asyncio.CancelledError) else exc)
+            # Marca la excepción como leída aunque nadie estuviera esperando
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
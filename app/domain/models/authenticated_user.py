@@ -0,0 +1,11 @@
+from typing import NamedTuple
+from uuid import UUID
+
+class AuthenticatedUser(NamedTuple):
+    """
+    Usuario autenticado reconstruido a partir de los claims del access token.
+    Lo devuelve ``get_current_user`` sin consultar la base de datos.
+    """
+    id: UUID
+    username: str
+    token_version: int
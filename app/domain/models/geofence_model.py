@@ -0,0 +1,50 @@
+import uuid
+from sqlalchemy import Column, String, DateTime, Float, JSON, BigInteger, Uuid, Index, func
+from app.core.database import Base
+
+GEOFENCE_ENTER = "enter"
+GEOFENCE_EXIT = "exit"
+
+class Geofence(Base):
+    __tablename__ = "geofences"
+    # created_at/updated_at se devuelven con RETURNING al hacer flush (sin refresh extra)
+    __mapper_args__ = {"eager_defaults": True}
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(120), nullable=False)
+    kind = Column(String(30), nullable=False)
+    # Anillo exterior [[lon, lat], ...] sin repetir el primer vértice al final
+    coordinates = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class GeofenceState(Base):
+    """Cercas dentro de las que está cada vehículo según su última posición."""
+    __tablename__ = "geofence_states"
+    vehicle_id = Column(Uuid(as_uuid=True), primary_key=True)
+    geofence_id = Column(Uuid(as_uuid=True), primary_key=True, index=True)
+    entered_at = Column(DateTime(timezone=True), nullable=True)
+
+class GeofenceCursor(Base):
+    """
+    Último timestamp evaluado contra las cercas por vehículo. Su fila es además
+    el lock que hace que dos lotes del mismo vehículo se evalúen uno tras otro.
+    """
+    __tablename__ = "geofence_cursors"
+    vehicle_id = Column(Uuid(as_uuid=True), primary_key=True)
+    last_timestamp = Column(BigInteger, nullable=False)
+
+class GeofenceEvent(Base):
+    """Transición de un vehículo (entrada o salida) respecto de una cerca."""
+    __tablename__ = "geofence_events"
+    __table_args__ = (
+        Index("ix_geofence_events_geofence_occurred", "geofence_id", "occurred_at"),
+        Index("ix_geofence_events_vehicle_occurred", "vehicle_id", "occurred_at"),
+    )
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    geofence_id = Column(Uuid(as_uuid=True), nullable=False)
+    vehicle_id = Column(Uuid(as_uuid=True), nullable=False)
+    event = Column(String(10), nullable=False)
+    lat = Column(Float, nullable=False)
+    lon = Column(Float, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
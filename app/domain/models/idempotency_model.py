@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, JSON
+from app.core.database import Base
+
+class IdempotencyRecord(Base):
+    """Respuesta guardada para un Idempotency-Key (backend ``database``)."""
+    __tablename__ = "idempotency_keys"
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    headers = Column(JSON, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
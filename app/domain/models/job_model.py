@@ -0,0 +1,30 @@
+import uuid
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, Text, Uuid, Index, func
+from app.core.database import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+class Job(Base):
+    """Trabajo en segundo plano (ver app/application/services/job_runner.py)."""
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False)
+    owner_id = Column(Uuid(as_uuid=True), nullable=True, index=True)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Lo renueva periódicamente el proceso que lo ejecuta; si deja de hacerlo, se reencola
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, Uuid, func
+from app.core.database import Base
+
+class RefreshToken(Base):
+    """
+    Refresh token emitido (por su ``jti``). Cada uno se canjea una sola vez;
+    ``family_id`` agrupa los tokens rotados desde un mismo login.
+    """
+    __tablename__ = "refresh_tokens"
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,38 @@
+import uuid
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, JSON, Uuid, Index, func
+from app.core.database import Base
+
+class Trip(Base):
+    """Viaje cerrado por el detector (ver app/application/services/trip_detector.py)."""
+    __tablename__ = "trips"
+    __table_args__ = (Index("ix_trips_vehicle_started", "vehicle_id", "started_at"),)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    vehicle_id = Column(Uuid(as_uuid=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    ended_at = Column(DateTime(timezone=True), nullable=False)
+    duration_seconds = Column(Integer, nullable=False)
+    distance_m = Column(Float, nullable=False)
+    start_lat = Column(Float, nullable=False)
+    start_lon = Column(Float, nullable=False)
+    end_lat = Column(Float, nullable=False)
+    end_lon = Column(Float, nullable=False)
+    max_speed = Column(Float, nullable=False)
+
+class Stop(Base):
+    __tablename__ = "stops"
+    __table_args__ = (Index("ix_stops_vehicle_started", "vehicle_id", "started_at"),)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    vehicle_id = Column(Uuid(as_uuid=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    ended_at = Column(DateTime(timezone=True), nullable=False)
+    duration_seconds = Column(Integer, nullable=False)
+    lat = Column(Float, nullable=False)
+    lon = Column(Float, nullable=False)
+
+class TripCheckpoint(Base):
+    """Estado del detector por vehículo tras la última posición procesada."""
+    __tablename__ = "trip_checkpoints"
+    vehicle_id = Column(Uuid(as_uuid=True), primary_key=True)
+    state = Column(JSON, nullable=False)
+    last_timestamp = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,13 +1,69 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, DateTime, BigInteger, Uuid, Index, DDL, event, func
 from app.core.database import Base
 
+VEHICLE_CHANGES = "vehicles"
+
+AGGREGATE_DIMENSIONS = ("brand", "arrival_location", "created_day")
+
 class Vehicle(Base):
     __tablename__ = "vehicles"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Paginación del feed de cambios por (change_seq, id)
+    __table_args__ = (Index("ix_vehicles_change_seq_id", "change_seq", "id"),)
+    # created_at/updated_at se devuelven con RETURNING al hacer flush (sin refresh extra)
+    __mapper_args__ = {"eager_defaults": True}
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     brand = Column(String(120), nullable=False)
     arrival_location = Column(String(120), nullable=False)
     applicant = Column(String(120), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Posición del último cambio en el feed (ver ChangeSequence)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+class VehicleTombstone(Base):
+    """Rastro de un vehículo eliminado, para que el feed de cambios informe el borrado."""
+    __tablename__ = "vehicle_tombstones"
+    __table_args__ = (Index("ix_vehicle_tombstones_change_seq_id", "change_seq", "id"),)
+    id = Column(Uuid(as_uuid=True), primary_key=True)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ChangeSequence(Base):
+    """
+    Contador de cambios por feed. Se incrementa con un UPDATE en la misma
+    transacción que la escritura: el lock de la fila hace que los números se
+    confirmen en orden, así un cliente nunca salta un cambio que se confirma tarde.
+    """
+    __tablename__ = "change_sequences"
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+event.listen(ChangeSequence.__table__, "after_create",
+             DDL(f"INSERT INTO change_sequences (name, value) VALUES ('{VEHICLE_CHANGES}', 0)"))
+
+
+class VehicleCount(Base):
+    """
+    Conteo de vehículos por grupo (brand, arrival_location o created_day).
+    Cada escritura de vehículos lo ajusta en su misma transacción.
+    """
+    __tablename__ = "vehicle_counts"
+    dimension = Column(String(32), primary_key=True)
+    key = Column(String(120), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+def created_day(created_at) -> str:
+    """Día de creación en UTC (YYYY-MM-DD)."""
+    if created_at is None:
+        return "unknown"
+    if isinstance(created_at, datetime) and created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date().isoformat() if isinstance(created_at, datetime) else str(created_at)[:10]
+
+
+def aggregate_keys(brand: str, arrival_location: str, created_at) -> tuple[str, str, str]:
+    """Grupo de cada dimensión de ``AGGREGATE_DIMENSIONS`` al que pertenece un vehículo."""
+    return brand, arrival_location, created_day(created_at)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+class VehicleRecord(NamedTuple):
+    """
+    Proyección de solo lectura de un vehículo (tupla, sin estado ORM).
+    La devuelven las rutas de lectura; las escrituras siguen usando ``Vehicle``.
+    """
+    id: UUID
+    brand: str
+    arrival_location: str
+    applicant: str
+    created_at: datetime | None
+    updated_at: datetime | None
+
+class VehicleChange(NamedTuple):
+    """Entrada del feed de cambios: ``vehicle`` con el estado actual, o None si se eliminó."""
+    change_seq: int
+    id: UUID
+    vehicle: VehicleRecord | None
+    deleted_at: datetime | None
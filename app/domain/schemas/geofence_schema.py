@@ -0,0 +1,49 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+GEOFENCE_MAX_VERTICES = 1000
+
+class GeofenceCreate(BaseModel):
+    name: str = Field(..., max_length=120)
+    kind: Literal["depot", "restricted", "zone"] = "zone"
+    # Anillo exterior como en GeoJSON: [[lon, lat], ...]
+    coordinates: list[tuple[float, float]] = Field(..., min_length=3, max_length=GEOFENCE_MAX_VERTICES + 1)
+
+    @field_validator('name')
+    @classmethod
+    def validate_name(cls, v):
+        if not v or len(v.strip()) == 0:
+            raise ValueError('Name cannot be empty')
+        return v.strip()
+
+    @field_validator('coordinates')
+    @classmethod
+    def validate_coordinates(cls, v):
+        for lon, lat in v:
+            if not -180 <= lon <= 180 or not -90 <= lat <= 90:
+                raise ValueError('Coordinates must be [lon, lat] within valid ranges')
+        if len(v) > 1 and v[0] == v[-1]:
+            # Anillo cerrado (GeoJSON): se guarda sin el vértice repetido
+            v = v[:-1]
+        if len(set(v)) < 3:
+            raise ValueError('A geofence needs at least 3 distinct vertices')
+        return v
+
+class GeofenceResponse(GeofenceCreate):
+    id: UUID
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class GeofenceEventResponse(BaseModel):
+    geofence_id: UUID
+    vehicle_id: UUID
+    event: str
+    lat: float
+    lon: float
+    occurred_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
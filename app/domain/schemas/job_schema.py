@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from uuid import UUID
+
+class JobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    progress_current: int
+    progress_total: int | None
+    cancel_requested: bool
+    error: str | None
+    created_at: datetime | None
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class JobResultResponse(BaseModel):
+    id: UUID
+    status: str
+    result: dict | None
+    error: str | None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from app.domain.schemas.geofence_schema import GeofenceEventResponse
+
+POSITIONS_MAX_BATCH = 5000
+
+class PositionIn(BaseModel):
+    vehicle_id: UUID
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+    speed: float = Field(default=0, ge=0, description="km/h")
+    heading: float = 0
+    # El frame binario de /ws lleva el timestamp como uint32
+    timestamp: int = Field(..., ge=0, lt=2**32, description="Unix epoch seconds")
+
+class PositionBatch(BaseModel):
+    positions: list[PositionIn] = Field(..., min_length=1, max_length=POSITIONS_MAX_BATCH)
+
+class PositionIngestResult(BaseModel):
+    accepted: int
+    events: list[GeofenceEventResponse]
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+class TripResponse(BaseModel):
+    started_at: datetime
+    ended_at: datetime
+    duration_seconds: int
+    distance_m: float
+    start_lat: float
+    start_lon: float
+    end_lat: float
+    end_lon: float
+    max_speed: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StopResponse(BaseModel):
+    started_at: datetime
+    ended_at: datetime
+    duration_seconds: int
+    lat: float
+    lon: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TripCurrentState(BaseModel):
+    """Tramo abierto según la última posición procesada."""
+    mode: Literal["moving", "stopped"]
+    since: datetime
+    distance_m: float
+
+class VehicleTripsResponse(BaseModel):
+    vehicle_id: UUID
+    trips: list[TripResponse]
+    stops: list[StopResponse]
+    current: TripCurrentState | None
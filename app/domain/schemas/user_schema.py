@@ -40,4 +40,9 @@ class UserResponse(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str | None = None
     token_type: str = "bearer"
+    expires_in: int | None = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
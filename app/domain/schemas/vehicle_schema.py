@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, field_serializer, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator, model_validator
 from datetime import datetime
 from uuid import UUID
 
@@ -39,3 +39,85 @@ class VehicleResponse(VehicleCreate):
     def serialize_id(self, value: UUID) -> str:
         """Convertir UUID a string para JSON"""
         return str(value)
+
+BATCH_GET_MAX_IDS = 1000
+
+class VehicleBatchGetRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS)
+
+class VehicleBatchGetResponse(BaseModel):
+    vehicles: list[VehicleResponse]
+    missing: list[str]
+
+BULK_MAX_IDS = 10000
+
+class VehicleFilter(BaseModel):
+    """Predicados de igualdad para operaciones masivas (al menos uno)."""
+    brand: str | None = None
+    arrival_location: str | None = None
+    applicant: str | None = None
+
+    @field_validator('brand', 'arrival_location', 'applicant')
+    @classmethod
+    def validate_not_blank(cls, v):
+        if v is not None and len(v.strip()) == 0:
+            raise ValueError('Value cannot be empty')
+        return v.strip() if v is not None else v
+
+    @model_validator(mode='after')
+    def validate_not_empty(self):
+        if not self.model_dump(exclude_none=True):
+            raise ValueError('Filter must set at least one field')
+        return self
+
+class VehicleChanges(VehicleFilter):
+    """Campos a asignar en una actualización masiva (al menos uno)."""
+
+class VehicleBulkSelection(BaseModel):
+    ids: list[str] | None = Field(default=None, min_length=1, max_length=BULK_MAX_IDS)
+    filter: VehicleFilter | None = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError('Provide exactly one of "ids" or "filter"')
+        return self
+
+class VehicleBulkUpdateRequest(VehicleBulkSelection):
+    changes: VehicleChanges
+
+class VehicleBulkResult(BaseModel):
+    affected: int
+    ids: list[str]
+
+class VehicleImportError(BaseModel):
+    line: int
+    error: str
+
+class VehicleImportResult(BaseModel):
+    inserted: int
+    rejected: int
+    errors: list[VehicleImportError]
+    errors_truncated: bool
+
+class VehicleAggregatesResponse(BaseModel):
+    total: int
+    by_brand: dict[str, int]
+    by_arrival_location: dict[str, int]
+    by_created_day: dict[str, int]
+    reconciled_at: datetime | None
+
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 1000
+
+class VehicleChangeEntry(BaseModel):
+    change_seq: int
+    id: str
+    deleted: bool
+    vehicle: VehicleResponse | None
+    deleted_at: datetime | None
+
+class VehicleChangesResponse(BaseModel):
+    changes: list[VehicleChangeEntry]
+    next_since: str
+    has_more: bool
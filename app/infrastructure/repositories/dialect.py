@@ -0,0 +1,20 @@
+"""INSERT con ``ON CONFLICT`` para los dialectos que lo soportan (PostgreSQL y SQLite)."""
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def upsert_insert(db: AsyncSession, model):
+    """``insert`` del dialecto de la sesión (con ``on_conflict_*``), o None si no hay."""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(model)
+
+
+def insert_ignoring_duplicates(db: AsyncSession, model):
+    statement = upsert_insert(db, model)
+    return statement.on_conflict_do_nothing() if statement is not None else insert(model)
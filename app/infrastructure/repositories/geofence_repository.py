@@ -0,0 +1,117 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Iterable, Sequence
+from uuid import UUID
+from sqlalchemy import select, insert, delete, bindparam, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.query_tracking import allow_repeated_queries
+from app.infrastructure.repositories.dialect import insert_ignoring_duplicates
+from app.domain.models.geofence_model import Geofence, GeofenceCursor, GeofenceEvent, GeofenceState
+from app.application.interfaces.geofence_repository import IGeofenceRepository
+
+# Ids/pares por consulta IN (bajo el límite de parámetros de SQLite y asyncpg)
+IN_CHUNK_SIZE = 500
+
+class GeofenceRepositorySQLAlchemy(IGeofenceRepository):
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list(self, limit: int = 100, offset: int = 0) -> list[Geofence]:
+        result = await self.db.execute(select(Geofence).order_by(Geofence.created_at, Geofence.id).offset(offset).limit(limit))
+        return list(result.scalars())
+
+    async def list_all(self) -> list[Geofence]:
+        result = await self.db.execute(select(Geofence))
+        return list(result.scalars())
+
+    async def get(self, geofence_id: UUID) -> Geofence | None:
+        return await self.db.get(Geofence, geofence_id)
+
+    async def create(self, geofence: Geofence) -> Geofence:
+        self.db.add(geofence)
+        await self.db.commit()
+        await self.db.refresh(geofence)
+        return geofence
+
+    async def update(self, geofence: Geofence) -> Geofence:
+        # updated_at llega por RETURNING (eager_defaults); no hace falta refresh
+        self.db.add(geofence)
+        await self.db.commit()
+        return geofence
+
+    async def delete(self, geofence: Geofence) -> None:
+        await self.db.execute(delete(GeofenceState).where(GeofenceState.geofence_id == geofence.id))
+        await self.db.delete(geofence)
+        await self.db.commit()
+
+    async def lock_cursors(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, int]:
+        vehicle_ids = list(vehicle_ids)
+        cursors: dict[UUID, int] = {}
+        if not vehicle_ids:
+            return cursors
+        # Fila para los vehículos nuevos, así FOR UPDATE tiene algo que bloquear
+        # (en SQLite el INSERT toma el lock de escritura de la base)
+        await self.db.execute(
+            insert_ignoring_duplicates(self.db, GeofenceCursor),
+            [{"vehicle_id": vehicle_id, "last_timestamp": -1} for vehicle_id in vehicle_ids],
+        )
+        with allow_repeated_queries():
+            for start in range(0, len(vehicle_ids), IN_CHUNK_SIZE):
+                result = await self.db.execute(
+                    select(GeofenceCursor.vehicle_id, GeofenceCursor.last_timestamp)
+                    .where(GeofenceCursor.vehicle_id.in_(vehicle_ids[start:start + IN_CHUNK_SIZE]))
+                    .with_for_update()
+                )
+                for vehicle_id, last_timestamp in result:
+                    cursors[vehicle_id] = last_timestamp
+        return cursors
+
+    async def load_states(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, set[UUID]]:
+        vehicle_ids = list(vehicle_ids)
+        states: dict[UUID, set[UUID]] = {}
+        with allow_repeated_queries():
+            for start in range(0, len(vehicle_ids), IN_CHUNK_SIZE):
+                result = await self.db.execute(
+                    select(GeofenceState.vehicle_id, GeofenceState.geofence_id)
+                    .where(GeofenceState.vehicle_id.in_(vehicle_ids[start:start + IN_CHUNK_SIZE]))
+                )
+                for vehicle_id, geofence_id in result:
+                    states.setdefault(vehicle_id, set()).add(geofence_id)
+        return states
+
+    async def apply_transitions(self, entered: Sequence[tuple[UUID, UUID, datetime | None]],
+                                exited: Sequence[tuple[UUID, UUID]], events: Sequence[dict],
+                                cursors: dict[UUID, int]) -> None:
+        try:
+            with allow_repeated_queries():
+                for start in range(0, len(exited), IN_CHUNK_SIZE):
+                    await self.db.execute(delete(GeofenceState).where(
+                        tuple_(GeofenceState.vehicle_id, GeofenceState.geofence_id).in_(exited[start:start + IN_CHUNK_SIZE])
+                    ))
+            if entered:
+                # Otro lote del mismo vehículo pudo registrar la entrada en paralelo
+                await self.db.execute(insert_ignoring_duplicates(self.db, GeofenceState), [
+                    {"vehicle_id": vehicle_id, "geofence_id": geofence_id, "entered_at": entered_at}
+                    for vehicle_id, geofence_id, entered_at in entered
+                ])
+            if events:
+                await self.db.execute(insert(GeofenceEvent), list(events))
+            if cursors:
+                table = GeofenceCursor.__table__
+                await self.db.execute(
+                    table.update().where(table.c.vehicle_id == bindparam("cursor_vehicle_id"))
+                    .values(last_timestamp=bindparam("cursor_last_timestamp")),
+                    [{"cursor_vehicle_id": v, "cursor_last_timestamp": ts} for v, ts in cursors.items()],
+                )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def list_events(self, geofence_id: UUID, limit: int = 100) -> list[GeofenceEvent]:
+        result = await self.db.execute(
+            select(GeofenceEvent).where(GeofenceEvent.geofence_id == geofence_id)
+            .order_by(GeofenceEvent.occurred_at.desc()).limit(limit)
+        )
+        return list(result.scalars())
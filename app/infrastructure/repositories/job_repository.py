@@ -0,0 +1,131 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Sequence
+from uuid import UUID
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domain.models.job_model import Job, JOB_QUEUED, JOB_RUNNING, JOB_CANCELLED
+from app.application.interfaces.job_repository import IJobRepository
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class JobRepositorySQLAlchemy(IJobRepository):
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, job: Job) -> Job:
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get(self, job_id: UUID) -> Job | None:
+        return await self.db.get(Job, job_id, populate_existing=True)
+
+    async def list_for_owner(self, owner_id: UUID, limit: int = 50) -> list[Job]:
+        result = await self.db.execute(
+            select(Job).where(Job.owner_id == owner_id).order_by(Job.created_at.desc()).limit(limit)
+        )
+        return list(result.scalars())
+
+    async def claim_next(self) -> Job | None:
+        # El UPDATE condicionado a ``queued`` es atómico: si otro worker (de este u
+        # otro proceso) tomó el trabajo entre el SELECT y el UPDATE, no afecta filas
+        while True:
+            job_id = (await self.db.execute(
+                select(Job.id).where(Job.status == JOB_QUEUED).order_by(Job.created_at).limit(1)
+            )).scalar_one_or_none()
+            if job_id is None:
+                await self.db.commit()
+                return None
+            now = _now()
+            claimed = (await self.db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JOB_QUEUED)
+                .values(status=JOB_RUNNING, started_at=now, heartbeat_at=now)
+                .returning(Job.id),
+                execution_options={"synchronize_session": False},
+            )).scalar_one_or_none()
+            await self.db.commit()
+            if claimed is not None:
+                return await self.get(claimed)
+
+    async def update_progress(self, job_id: UUID, started_at: datetime, current: int, total: int | None) -> bool:
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JOB_RUNNING, Job.started_at == started_at)
+            .values(progress_current=current, progress_total=total, heartbeat_at=_now())
+            .returning(Job.cancel_requested),
+            execution_options={"synchronize_session": False},
+        )
+        cancel_requested = result.scalar_one_or_none()
+        await self.db.commit()
+        # Sin fila: el trabajo se reencoló o terminó por otro lado, este worker debe parar
+        return cancel_requested is None or bool(cancel_requested)
+
+    async def finish(self, job_id: UUID, started_at: datetime, status: str,
+                     result: dict | None = None, error: str | None = None) -> bool:
+        # ``started_at`` identifica la ejecución: si el trabajo se reencoló (y quizá
+        # lo tomó otro worker) o se canceló, el resultado de esta ejecución no se guarda
+        finished = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JOB_RUNNING, Job.started_at == started_at)
+            .values(status=status, result=result, error=error, finished_at=_now())
+            .returning(Job.id),
+            execution_options={"synchronize_session": False},
+        )
+        recorded = finished.scalar_one_or_none() is not None
+        await self.db.commit()
+        return recorded
+
+    async def request_cancel(self, job_id: UUID) -> Job | None:
+        # Una sola sentencia: en cola se cancela ya; en curso se marca para el runner
+        queued = Job.status == JOB_QUEUED
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=case((queued, JOB_CANCELLED), else_=Job.status),
+                finished_at=case((queued, _now()), else_=Job.finished_at),
+                cancel_requested=case((Job.status == JOB_RUNNING, True), else_=Job.cancel_requested),
+            )
+            .returning(Job)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        job = result.scalars().first()
+        await self.db.commit()
+        return job
+
+    async def heartbeat(self, job_ids: Sequence[UUID]) -> None:
+        if not job_ids:
+            return
+        await self.db.execute(
+            update(Job).where(Job.id.in_(job_ids), Job.status == JOB_RUNNING).values(heartbeat_at=_now()),
+            execution_options={"synchronize_session": False},
+        )
+        await self.db.commit()
+
+    async def requeue(self, job_ids: Sequence[UUID]) -> None:
+        if not job_ids:
+            return
+        await self.db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.status == JOB_RUNNING)
+            .values(status=JOB_QUEUED, started_at=None, heartbeat_at=None),
+            execution_options={"synchronize_session": False},
+        )
+        await self.db.commit()
+
+    async def requeue_stale(self, older_than: datetime) -> int:
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.status == JOB_RUNNING, Job.heartbeat_at < older_than)
+            .values(status=JOB_QUEUED, started_at=None, heartbeat_at=None)
+            .returning(Job.id),
+            execution_options={"synchronize_session": False},
+        )
+        requeued = len(result.all())
+        await self.db.commit()
+        return requeued
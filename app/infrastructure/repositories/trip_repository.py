@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Iterable, Sequence
+from uuid import UUID
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.query_tracking import allow_repeated_queries
+from app.infrastructure.repositories.dialect import insert_ignoring_duplicates, upsert_insert
+from app.domain.models.trip_model import Stop, Trip, TripCheckpoint
+from app.application.interfaces.trip_repository import ITripRepository
+
+# Ids por consulta IN (bajo el límite de parámetros de SQLite y asyncpg)
+IN_CHUNK_SIZE = 500
+
+class TripRepositorySQLAlchemy(ITripRepository):
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_checkpoints(self, vehicle_ids: Iterable[UUID]) -> dict[UUID, dict]:
+        vehicle_ids = list(vehicle_ids)
+        checkpoints: dict[UUID, dict] = {}
+        if not vehicle_ids:
+            return checkpoints
+        # Fila vacía para los vehículos sin checkpoint, así FOR UPDATE tiene algo
+        # que bloquear (en SQLite el INSERT toma el lock de escritura de la base)
+        await self.db.execute(
+            insert_ignoring_duplicates(self.db, TripCheckpoint),
+            [{"vehicle_id": vehicle_id, "state": {}, "last_timestamp": -1} for vehicle_id in vehicle_ids],
+        )
+        with allow_repeated_queries():
+            for start in range(0, len(vehicle_ids), IN_CHUNK_SIZE):
+                result = await self.db.execute(
+                    select(TripCheckpoint.vehicle_id, TripCheckpoint.state)
+                    .where(TripCheckpoint.vehicle_id.in_(vehicle_ids[start:start + IN_CHUNK_SIZE]))
+                    .with_for_update()
+                )
+                for vehicle_id, state in result:
+                    if state:
+                        checkpoints[vehicle_id] = state
+        return checkpoints
+
+    async def save(self, trips: Sequence[dict], stops: Sequence[dict], checkpoints: dict[UUID, dict]) -> None:
+        rows = [
+            {"vehicle_id": vehicle_id, "state": state, "last_timestamp": state["last"][0]}
+            for vehicle_id, state in checkpoints.items()
+        ]
+        try:
+            if trips:
+                await self.db.execute(insert(Trip), list(trips))
+            if stops:
+                await self.db.execute(insert(Stop), list(stops))
+            if rows:
+                await self._upsert_checkpoints(rows)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def _upsert_checkpoints(self, rows: list[dict]):
+        statement = upsert_insert(self.db, TripCheckpoint)
+        if statement is None:
+            with allow_repeated_queries():
+                for start in range(0, len(rows), IN_CHUNK_SIZE):
+                    chunk = [row["vehicle_id"] for row in rows[start:start + IN_CHUNK_SIZE]]
+                    await self.db.execute(delete(TripCheckpoint).where(TripCheckpoint.vehicle_id.in_(chunk)))
+            await self.db.execute(insert(TripCheckpoint), rows)
+            return
+        await self.db.execute(statement.on_conflict_do_update(
+            index_elements=[TripCheckpoint.vehicle_id],
+            set_={"state": statement.excluded.state, "last_timestamp": statement.excluded.last_timestamp,
+                  "updated_at": func.now()},
+        ), rows)
+
+    async def get_checkpoint(self, vehicle_id: UUID) -> TripCheckpoint | None:
+        return await self.db.get(TripCheckpoint, vehicle_id)
+
+    async def list_trips(self, vehicle_id: UUID, limit: int = 50) -> list[Trip]:
+        result = await self.db.execute(
+            select(Trip).where(Trip.vehicle_id == vehicle_id).order_by(Trip.started_at.desc()).limit(limit)
+        )
+        return list(result.scalars())
+
+    async def list_stops(self, vehicle_id: UUID, limit: int = 50) -> list[Stop]:
+        result = await self.db.execute(
+            select(Stop).where(Stop.vehicle_id == vehicle_id).order_by(Stop.started_at.desc()).limit(limit)
+        )
+        return list(result.scalars())
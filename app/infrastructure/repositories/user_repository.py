@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
+from datetime import datetime, timezone
 from uuid import UUID
 from app.domain.models.user_model import User
+from app.domain.models.refresh_token_model import RefreshToken
 from app.application.interfaces.user_repository import IUserRepository
 
 class UserRepositorySQLAlchemy(IUserRepository):
@@ -32,3 +34,51 @@ class UserRepositorySQLAlchemy(IUserRepository):
         await self.db.commit()
         await self.db.refresh(user)
         return user
+
+    async def increment_token_version(self, user_id: str) -> int | None:
+        try:
+            uuid_id = UUID(user_id)
+        except ValueError:
+            return None
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == uuid_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+        )
+        version = result.scalar_one_or_none()
+        await self.db.commit()
+        return version
+
+    async def add_refresh_token(self, jti: str, user_id: UUID, family_id: str, expires_at: datetime) -> None:
+        # Los vencidos ya no se pueden canjear: no hace falta recordarlos para detectar reuso
+        await self.db.execute(delete(RefreshToken).where(
+            RefreshToken.user_id == user_id, RefreshToken.expires_at < datetime.now(timezone.utc)
+        ))
+        self.db.add(RefreshToken(jti=jti, user_id=user_id, family_id=family_id, expires_at=expires_at))
+        await self.db.commit()
+
+    async def consume_refresh_token(self, jti: str) -> bool:
+        # UPDATE condicionado: de dos canjes simultáneos del mismo token solo uno afecta la fila
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti, RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+            .values(used_at=datetime.now(timezone.utc))
+            .returning(RefreshToken.jti),
+            execution_options={"synchronize_session": False},
+        )
+        consumed = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        return consumed
+
+    async def get_refresh_token(self, jti: str) -> RefreshToken | None:
+        return await self.db.get(RefreshToken, jti)
+
+    async def revoke_refresh_family(self, family_id: str) -> None:
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc)),
+            execution_options={"synchronize_session": False},
+        )
+        await self.db.commit()
@@ -1,9 +1,37 @@
+from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from uuid import UUID
-from app.domain.models.vehicle_model import Vehicle
+from sqlalchemy import select, insert, update, delete, func, inspect, tuple_
+from collections import Counter
+from heapq import merge
+from itertools import islice
+from typing import Iterable, Sequence
+from uuid import UUID, uuid4
+from app.core.query_tracking import allow_repeated_queries, untracked_queries
+from app.domain.models.vehicle_model import (
+    Vehicle, VehicleCount, VehicleTombstone, ChangeSequence, VEHICLE_CHANGES, AGGREGATE_DIMENSIONS, aggregate_keys,
+)
+from app.domain.models.vehicle_record import VehicleChange, VehicleRecord
+from app.infrastructure.repositories.dialect import upsert_insert
 from app.application.interfaces.vehicle_repository import IVehicleRepository
 
+# Columnas en el orden de VehicleRecord (lecturas por Core, sin identity map)
+_RECORD_COLUMNS = tuple(Vehicle.__table__.c[name] for name in VehicleRecord._fields)
+
+_SEQUENCES = ChangeSequence.__table__
+
+# Ids por consulta IN (bajo el límite de parámetros de SQLite y asyncpg)
+IN_CHUNK_SIZE = 500
+
+# Columnas que definen los grupos de vehicle_counts
+_GROUP_COLUMNS = ("brand", "arrival_location")
+
+
+def _count(deltas: Counter, rows: Iterable[tuple], sign: int) -> None:
+    """Suma ``sign`` a los grupos de cada fila (brand, arrival_location, created_at)."""
+    for row in rows:
+        for dimension, key in zip(AGGREGATE_DIMENSIONS, aggregate_keys(*row)):
+            deltas[(dimension, key)] += sign
+
 class VehicleRepositorySQLAlchemy(IVehicleRepository):
 
     def __init__(self, db: AsyncSession):
@@ -23,26 +51,269 @@ class VehicleRepositorySQLAlchemy(IVehicleRepository):
             # Si el string no es un UUID válido, retornar None
             return None
 
+    async def list_records(self, limit: int = 10, offset: int = 0) -> list[VehicleRecord]:
+        result = await self.db.execute(select(*_RECORD_COLUMNS).offset(offset).limit(limit))
+        return list(map(VehicleRecord._make, result))
+
+    async def get_record(self, vehicle_id: str) -> VehicleRecord | None:
+        try:
+            uuid_id = UUID(vehicle_id)
+        except ValueError:
+            return None
+        result = await self.db.execute(select(*_RECORD_COLUMNS).where(Vehicle.id == uuid_id))
+        row = result.first()
+        return VehicleRecord._make(row) if row else None
+
+    async def get_many(self, vehicle_ids: Sequence[UUID]) -> list[VehicleRecord]:
+        records: list[VehicleRecord] = []
+        with allow_repeated_queries():
+            for start in range(0, len(vehicle_ids), IN_CHUNK_SIZE):
+                chunk = vehicle_ids[start:start + IN_CHUNK_SIZE]
+                result = await self.db.execute(select(*_RECORD_COLUMNS).where(Vehicle.id.in_(chunk)))
+                records.extend(map(VehicleRecord._make, result))
+        return records
+
+    async def bulk_update(self, vehicle_ids: Sequence[UUID] | None, filters: dict | None, values: dict) -> list[UUID]:
+        def statements(change_seq: int):
+            statement = update(Vehicle).values(**values, updated_at=func.now(), change_seq=change_seq)
+            return self._bulk_statements(statement, vehicle_ids, filters)
+        return await self._execute_bulk(statements, regroups=any(name in values for name in _GROUP_COLUMNS))
+
+    async def bulk_delete(self, vehicle_ids: Sequence[UUID] | None, filters: dict | None) -> list[UUID]:
+        return await self._execute_bulk(
+            lambda change_seq: self._bulk_statements(delete(Vehicle), vehicle_ids, filters), tombstones=True
+        )
+
+    def _bulk_statements(self, statement, vehicle_ids: Sequence[UUID] | None, filters: dict | None):
+        """Una sentencia por chunk de ids, o una sola con los predicados del filtro."""
+        if vehicle_ids is None:
+            return [statement.where(*(Vehicle.__table__.c[name] == value for name, value in filters.items()))]
+        return [
+            statement.where(Vehicle.id.in_(vehicle_ids[start:start + IN_CHUNK_SIZE]))
+            for start in range(0, len(vehicle_ids), IN_CHUNK_SIZE)
+        ]
+
+    async def _execute_bulk(self, build, tombstones: bool = False, regroups: bool = False) -> list[UUID]:
+        """
+        Ejecuta las sentencias de ``build(change_seq)`` en una transacción con un
+        único commit; todas las filas afectadas comparten el mismo ``change_seq``.
+        Los borrados (``tombstones``) y los updates que cambian brand o
+        arrival_location (``regroups``) ajustan vehicle_counts en la misma transacción.
+        """
+        affected: list[UUID] = []
+        deltas: Counter = Counter()
+        try:
+            change_seq = await self._next_change_seq()
+            with allow_repeated_queries():
+                for statement in build(change_seq):
+                    if regroups:
+                        # created_at no cambia: solo se mueven los grupos de brand y arrival_location
+                        before = await self.db.execute(
+                            select(Vehicle.brand, Vehicle.arrival_location, func.count())
+                            .where(statement.whereclause).group_by(Vehicle.brand, Vehicle.arrival_location)
+                        )
+                        for brand, arrival_location, n in before:
+                            deltas[("brand", brand)] -= n
+                            deltas[("arrival_location", arrival_location)] -= n
+                    result = await self.db.execute(
+                        statement.returning(Vehicle.id, Vehicle.brand, Vehicle.arrival_location, Vehicle.created_at),
+                        execution_options={"synchronize_session": False},
+                    )
+                    for vehicle_id, brand, arrival_location, created_at in result:
+                        affected.append(vehicle_id)
+                        if tombstones:
+                            _count(deltas, [(brand, arrival_location, created_at)], -1)
+                        elif regroups:
+                            deltas[("brand", brand)] += 1
+                            deltas[("arrival_location", arrival_location)] += 1
+            if tombstones and affected:
+                await self.db.execute(
+                    insert(VehicleTombstone), [{"id": i, "change_seq": change_seq} for i in affected]
+                )
+            await self._apply_counts(deltas)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return affected
+
+    async def _next_change_seq(self) -> int:
+        # Sentencia Core: no dispara el autoflush de la instancia que se está por guardar
+        result = await self.db.execute(
+            update(_SEQUENCES)
+            .where(_SEQUENCES.c.name == VEHICLE_CHANGES)
+            .values(value=_SEQUENCES.c.value + 1)
+            .returning(_SEQUENCES.c.value)
+        )
+        return result.scalar_one()
+
+    async def _apply_counts(self, deltas: Counter) -> None:
+        """
+        Suma ``deltas`` ((dimensión, grupo) -> n) a vehicle_counts en la
+        transacción en curso. Las escrituras ya están serializadas por el lock
+        de ``_next_change_seq``.
+        """
+        rows = [{"dimension": d, "key": k, "count": n} for (d, k), n in sorted(deltas.items()) if n]
+        if not rows:
+            return
+        statement = upsert_insert(self.db, VehicleCount)
+        if statement is None:
+            with allow_repeated_queries():
+                for row in rows:
+                    result = await self.db.execute(
+                        update(VehicleCount)
+                        .where(VehicleCount.dimension == row["dimension"], VehicleCount.key == row["key"])
+                        .values(count=VehicleCount.count + row["count"])
+                    )
+                    if result.rowcount == 0:
+                        await self.db.execute(insert(VehicleCount).values(**row))
+            return
+        await self.db.execute(statement.on_conflict_do_update(
+            index_elements=[VehicleCount.dimension, VehicleCount.key],
+            set_={"count": VehicleCount.count + statement.excluded.count},
+        ), rows)
+
+    async def changes_since(self, change_seq: int, after_id: UUID | None, limit: int) -> list[VehicleChange]:
+        def after(table):
+            if after_id is None:
+                return table.c.change_seq > change_seq
+            return tuple_(table.c.change_seq, table.c.id) > tuple_(change_seq, after_id)
+
+        vehicles, tombstones = Vehicle.__table__, VehicleTombstone.__table__
+        upserts = await self.db.execute(
+            select(vehicles.c.change_seq, *_RECORD_COLUMNS)
+            .where(after(vehicles)).order_by(vehicles.c.change_seq, vehicles.c.id).limit(limit)
+        )
+        deletes = await self.db.execute(
+            select(tombstones.c.change_seq, tombstones.c.id, tombstones.c.deleted_at)
+            .where(after(tombstones)).order_by(tombstones.c.change_seq, tombstones.c.id).limit(limit)
+        )
+        changes = merge(
+            (VehicleChange(row[0], row[1], VehicleRecord._make(row[1:]), None) for row in upserts),
+            (VehicleChange(seq, vehicle_id, None, deleted_at) for seq, vehicle_id, deleted_at in deletes),
+            key=lambda change: (change.change_seq, change.id),
+        )
+        return list(islice(changes, limit))
+
+    async def bulk_insert(self, rows: Sequence[dict]) -> int:
+        if not rows:
+            return 0
+        columns = ("brand", "arrival_location", "applicant")
+        try:
+            with untracked_queries():
+                change_seq = await self._next_change_seq()
+                # Hora de la transacción: la misma que toma el default de created_at
+                created_at = await self.db.scalar(select(func.now()))
+                if self.db.bind.dialect.driver == "asyncpg":
+                    # COPY binario de asyncpg; created_at toma el default del servidor
+                    connection = await (await self.db.connection()).get_raw_connection()
+                    await connection.driver_connection.copy_records_to_table(
+                        Vehicle.__tablename__,
+                        records=[(uuid4(), *(row[c] for c in columns), change_seq) for row in rows],
+                        columns=("id", *columns, "change_seq"),
+                    )
+                else:
+                    await self.db.execute(
+                        insert(Vehicle), [{**{c: row[c] for c in columns}, "change_seq": change_seq} for row in rows]
+                    )
+                deltas: Counter = Counter()
+                _count(deltas, ((row["brand"], row["arrival_location"], created_at) for row in rows), 1)
+                await self._apply_counts(deltas)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return len(rows)
+
+    async def aggregate_counts(self) -> dict[str, dict[str, int]]:
+        counts: dict[str, dict[str, int]] = {dimension: {} for dimension in AGGREGATE_DIMENSIONS}
+        result = await self.db.execute(
+            select(VehicleCount.dimension, VehicleCount.key, VehicleCount.count).where(VehicleCount.count > 0)
+        )
+        for dimension, key, n in result:
+            counts.setdefault(dimension, {})[key] = n
+        return counts
+
+    async def rebuild_aggregate_counts(self) -> int:
+        created_at = Vehicle.created_at
+        if self.db.bind.dialect.name == "postgresql":
+            # Día en UTC, igual que created_day()
+            created_at = func.timezone("UTC", created_at)
+        try:
+            # Toma el lock del contador de cambios: ninguna escritura confirma
+            # entre el GROUP BY y el reemplazo de la tabla
+            await self.db.execute(
+                update(_SEQUENCES).where(_SEQUENCES.c.name == VEHICLE_CHANGES).values(value=_SEQUENCES.c.value)
+            )
+            stored = await self.aggregate_counts()
+            fresh: dict[str, dict[str, int]] = {}
+            for dimension, column in (
+                ("brand", Vehicle.brand),
+                ("arrival_location", Vehicle.arrival_location),
+                ("created_day", func.date(created_at)),
+            ):
+                result = await self.db.execute(select(column, func.count()).group_by(column))
+                fresh[dimension] = {str(key) if key is not None else "unknown": n for key, n in result}
+            corrected = sum(
+                1
+                for dimension in AGGREGATE_DIMENSIONS
+                for key in fresh[dimension].keys() | stored[dimension].keys()
+                if fresh[dimension].get(key) != stored[dimension].get(key)
+            )
+            await self.db.execute(delete(VehicleCount))
+            rows = [
+                {"dimension": dimension, "key": key, "count": n}
+                for dimension, groups in fresh.items() for key, n in groups.items()
+            ]
+            if rows:
+                await self.db.execute(insert(VehicleCount), rows)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return corrected
+
     async def create(self, vehicle: Vehicle) -> Vehicle:
+        vehicle.change_seq = await self._next_change_seq()
         self.db.add(vehicle)
+        # El flush trae created_at (RETURNING), que define el grupo por día
+        await self.db.flush()
+        deltas: Counter = Counter()
+        _count(deltas, [(vehicle.brand, vehicle.arrival_location, vehicle.created_at)], 1)
+        await self._apply_counts(deltas)
         await self.db.commit()
         await self.db.refresh(vehicle)
         return vehicle
 
     async def update(self, vehicle: Vehicle) -> Vehicle:
+        # updated_at llega por RETURNING (eager_defaults); no hace falta refresh
+        deltas: Counter = Counter()
+        state = inspect(vehicle)
+        for name in _GROUP_COLUMNS:
+            history = state.attrs[name].history
+            if history.deleted and history.deleted[0] != getattr(vehicle, name):
+                deltas[(name, history.deleted[0])] -= 1
+                deltas[(name, getattr(vehicle, name))] += 1
+        vehicle.change_seq = await self._next_change_seq()
         self.db.add(vehicle)
+        await self._apply_counts(deltas)
         await self.db.commit()
-        await self.db.refresh(vehicle)
         return vehicle
 
     async def delete(self, vehicle_id: str) -> None:
         try:
             # Convertir string a UUID
             uuid_id = UUID(vehicle_id)
-            result = await self.db.execute(select(Vehicle).where(Vehicle.id == uuid_id))
-            vehicle = result.scalars().first()
+            # session.get reutiliza la instancia si el servicio ya la cargó (sin SELECT doble)
+            vehicle = await self.db.get(Vehicle, uuid_id)
             if vehicle:
+                # El borrado deja una lápida para que el feed de cambios lo informe
+                change_seq = await self._next_change_seq()
+                deltas: Counter = Counter()
+                _count(deltas, [(vehicle.brand, vehicle.arrival_location, vehicle.created_at)], -1)
+                await self._apply_counts(deltas)
                 await self.db.delete(vehicle)
+                self.db.add(VehicleTombstone(id=uuid_id, change_seq=change_seq))
                 await self.db.commit()
         except ValueError:
             # Si el string no es un UUID válido, no hacer nada
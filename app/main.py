@@ -1,24 +1,53 @@
-from contextlib import asynccontextmanager
+import asyncio
+import math
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.presentation.api.v1 import auth_routes, vehicle_routes
-from app.application.exceptions import AppError, NotFoundError, ConflictError, AuthenticationError
+from app.core.database import Base, get_engine, new_session, read_your_writes
+from app.core.idempotency import DatabaseIdempotencyStore, InMemoryIdempotencyStore
+from app.presentation.api.v1 import auth_routes, geofence_routes, job_routes, position_routes, vehicle_routes
+from app.presentation.dependencies import job_runner
+from app.presentation.api import websocket_routes
+from app.presentation.responses import FastJSONResponse
+from app.presentation.middleware.compression import CompressionMiddleware
+from app.presentation.middleware.metrics import MetricsMiddleware
+from app.presentation.middleware.query_tracking import QueryTrackingMiddleware
+from app.presentation.middleware.idempotency import IdempotencyMiddleware
+from app.presentation.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.core.metrics import REGISTRY
+from app.application.services.vehicle_aggregates import run_reconciliation, vehicle_aggregates
+from app.infrastructure.repositories.vehicle_repository import VehicleRepositorySQLAlchemy
+from app.application.exceptions import AppError, NotFoundError, ConflictError, AuthenticationError, RateLimitError
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    reconcile_task = None
+    if settings.AGGREGATES_RECONCILE_SECONDS > 0:
+        reconcile_task = asyncio.create_task(run_reconciliation(
+            vehicle_aggregates, new_session, VehicleRepositorySQLAlchemy, settings.AGGREGATES_RECONCILE_SECONDS))
+    if settings.JOBS_ENABLED:
+        await job_runner.start()
     yield
+    # Shutdown
+    if settings.JOBS_ENABLED:
+        # Los trabajos en curso vuelven a la cola para otro proceso o el próximo arranque
+        await job_runner.stop()
+    if reconcile_task:
+        reconcile_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await reconcile_task
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API backend prueba técnica GPSCONTROL",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Configurar CORS
@@ -36,8 +65,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Idempotency-Key en escrituras; queda dentro de la compresión para guardar el cuerpo sin comprimir
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=(
+            DatabaseIdempotencyStore(new_session)
+            if settings.IDEMPOTENCY_BACKEND == "database"
+            else InMemoryIdempotencyStore(max_entries=settings.IDEMPOTENCY_MAX_ENTRIES)
+        ),
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_request_size=settings.IDEMPOTENCY_MAX_REQUEST_BYTES,
+        # Solo escrituras de vehículos: las respuestas de auth llevan tokens
+        path_prefixes=("/api/v1/vehicles",),
+        # El import se procesa en streaming: bufferizarlo para la huella anularía eso
+        exempt_paths=("/api/v1/vehicles/import",),
+    )
+
+# Lecturas al primario durante un rato tras escribir (solo con réplica configurada)
+if settings.READ_DATABASE_URL and settings.READ_YOUR_WRITES_SECONDS > 0:
+    app.add_middleware(ReadYourWritesMiddleware, tracker=read_your_writes)
+
+# Compresión de respuestas
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        threadpool_min_size=settings.COMPRESSION_THREADPOOL_MIN_SIZE,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_QUALITY,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+    )
+
+# Presupuesto de consultas por request (detector de N+1)
+if settings.QUERY_TRACKING_MODE != "off":
+    app.add_middleware(
+        QueryTrackingMiddleware,
+        count_limit=settings.QUERY_COUNT_LIMIT,
+        repeat_limit=settings.QUERY_REPEAT_LIMIT,
+        mode=settings.QUERY_TRACKING_MODE,
+    )
+
+# Métricas de requests (latencia, estados, en curso)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Perfilado por request (opt-in); queda por fuera para medir también la compresión
+if settings.PROFILING_ENABLED:
+    # Import diferido: el sampler y las rutas de debug solo se cargan si se usan
+    from app.presentation.api import debug_routes
+    from app.presentation.middleware.profiling import ProfilingMiddleware
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        token=settings.PROFILING_TOKEN,
+        sample_every=settings.PROFILING_SAMPLE_EVERY,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+        max_files=settings.PROFILING_MAX_FILES,
+    )
+    app.include_router(debug_routes.router, prefix="/debug", tags=["debug"])
+
 app.include_router(auth_routes.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(vehicle_routes.router, prefix="/api/v1/vehicles", tags=["vehicles"])
+app.include_router(job_routes.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(geofence_routes.router, prefix="/api/v1/geofences", tags=["geofences"])
+app.include_router(position_routes.router, prefix="/api/v1/positions", tags=["positions"])
+app.include_router(websocket_routes.router, tags=["websocket"])
 
 @app.get("/", tags=["root"])
 async def root():
@@ -60,6 +156,11 @@ async def health_check():
         "database": "connected"
     }
 
+@app.get("/metrics", tags=["health"], include_in_schema=False)
+async def metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # --- Global Exception Handlers ---
 @app.exception_handler(NotFoundError)
 async def not_found_error_handler(request: Request, exc: NotFoundError):
@@ -82,12 +183,21 @@ async def auth_error_handler(request: Request, exc: AuthenticationError):
         content={"detail": exc.message}
     )
 
+@app.exception_handler(RateLimitError)
+async def rate_limit_error_handler(request: Request, exc: RateLimitError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.message},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
 @app.exception_handler(AppError)
 async def app_error_handler(request: Request, exc: AppError):
     status_map = {
         "not_found": 404,
         "conflict": 409,
         "auth_error": 401,
+        "rate_limited": 429,
     }
     status_code = status_map.get(exc.code, 400)
     return JSONResponse(
@@ -0,0 +1,39 @@
+import hmac
+import os
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from app.core.config import settings
+from app.presentation.middleware.profiling import PROFILE_SUFFIX
+
+router = APIRouter()
+
+async def require_profiling_token(x_profile: str | None = Header(default=None)):
+    """Los perfiles exponen rutas y nombres internos: exigir el mismo token que los dispara."""
+    if not settings.PROFILING_TOKEN or not x_profile or not hmac.compare_digest(x_profile, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling token required")
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """Lista los perfiles guardados (más recientes primero)."""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return []
+    entries = [e for e in os.scandir(settings.PROFILING_DIR) if e.name.endswith(PROFILE_SUFFIX)]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return [
+        {
+            "name": e.name,
+            "size": e.stat().st_size,
+            "created_at": datetime.fromtimestamp(e.stat().st_mtime, tz=timezone.utc),
+            "url": f"/debug/profiles/{e.name}",
+        }
+        for e in entries
+    ]
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profiling_token)])
+async def get_profile(name: str):
+    """Descarga un perfil en formato collapsed stacks."""
+    path = os.path.join(settings.PROFILING_DIR, os.path.basename(name))
+    if not name.endswith(PROFILE_SUFFIX) or not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from app.domain.schemas.user_schema import UserCreate, UserResponse, Token, UserLogin
+from app.domain.schemas.user_schema import UserCreate, UserResponse, Token, UserLogin, RefreshRequest
 from app.application.services.user_service import UserService
 from app.application.exceptions import AuthenticationError, ConflictError
-from app.presentation.dependencies import get_user_service
+from app.presentation.dependencies import enforce_login_rate_limit, get_current_user, get_user_service
+from app.domain.models.authenticated_user import AuthenticatedUser
 
 router = APIRouter()
 
@@ -14,7 +15,9 @@ async def auth_info():
         "version": "1.0.0",
         "endpoints": {
             "register": "POST /api/v1/auth/register",
-            "login": "POST /api/v1/auth/login"
+            "login": "POST /api/v1/auth/login",
+            "refresh": "POST /api/v1/auth/refresh",
+            "revoke": "POST /api/v1/auth/revoke"
         },
         "documentation": "/docs"
     }
@@ -27,21 +30,42 @@ async def register(user_in: UserCreate, service: UserService = Depends(get_user_
     except ConflictError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(enforce_login_rate_limit)])
 async def login(
     user_data: UserLogin,
     user_service: UserService = Depends(get_user_service)
 ):
     """
     Espera JSON { "username": "...", "password": "..." }.
-    Devuelve: { "access_token": "...", "token_type": "bearer" }.
+    Devuelve: { "access_token": "...", "refresh_token": "...", "token_type": "bearer", "expires_in": N }.
+    Responde 429 (con Retry-After) si se excede el límite de intentos.
     """
     try:
-        token = await user_service.authenticate_user(user_data.username, user_data.password)
-        return {"access_token": token, "token_type": "bearer"}
+        return await user_service.authenticate_user(user_data.username, user_data.password)
     except AuthenticationError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     except Exception as e:
         # Log del error para debugging
         print(f"Unexpected error in login: {type(e).__name__}: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, user_service: UserService = Depends(get_user_service)):
+    """
+    Canjea un refresh token por un par nuevo (el refresh token se rota).
+    """
+    try:
+        return await user_service.refresh_tokens(body.refresh_token)
+    except AuthenticationError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+@router.post("/revoke")
+async def revoke(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Revoca todos los tokens del usuario actual (cerrar sesión en todos los dispositivos).
+    """
+    await user_service.revoke_tokens(str(current_user.id))
+    return {"detail": "revoked"}
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Query
+from app.application.services.geofence_service import GeofenceService
+from app.domain.schemas.geofence_schema import GeofenceCreate, GeofenceEventResponse, GeofenceResponse
+from app.presentation.dependencies import get_current_user, get_geofence_service
+
+router = APIRouter()
+
+@router.get("/", response_model=list[GeofenceResponse])
+async def list_geofences(limit: int = Query(100, ge=1, le=1000),
+                         offset: int = Query(0, ge=0),
+                         service: GeofenceService = Depends(get_geofence_service),
+                         current_user = Depends(get_current_user)):
+    return await service.list_geofences(limit, offset)
+
+@router.post("/", response_model=GeofenceResponse)
+async def create_geofence(geofence: GeofenceCreate,
+                          service: GeofenceService = Depends(get_geofence_service),
+                          current_user = Depends(get_current_user)):
+    """
+    Crea una geocerca (``depot``, ``restricted`` o ``zone``) a partir de su
+    anillo exterior ``[[lon, lat], ...]``, cerrado o no.
+    """
+    return await service.create_geofence(geofence)
+
+@router.get("/{geofence_id}", response_model=GeofenceResponse)
+async def get_geofence(geofence_id: str,
+                       service: GeofenceService = Depends(get_geofence_service),
+                       current_user = Depends(get_current_user)):
+    return await service.get_geofence(geofence_id)
+
+@router.put("/{geofence_id}", response_model=GeofenceResponse)
+async def update_geofence(geofence_id: str, geofence: GeofenceCreate,
+                          service: GeofenceService = Depends(get_geofence_service),
+                          current_user = Depends(get_current_user)):
+    return await service.update_geofence(geofence_id, geofence)
+
+@router.delete("/{geofence_id}")
+async def delete_geofence(geofence_id: str,
+                          service: GeofenceService = Depends(get_geofence_service),
+                          current_user = Depends(get_current_user)):
+    await service.delete_geofence(geofence_id)
+    return {"detail": "deleted"}
+
+@router.get("/{geofence_id}/events", response_model=list[GeofenceEventResponse])
+async def list_geofence_events(geofence_id: str,
+                               limit: int = Query(100, ge=1, le=1000),
+                               service: GeofenceService = Depends(get_geofence_service),
+                               current_user = Depends(get_current_user)):
+    """Entradas y salidas registradas en la cerca, de la más reciente a la más antigua."""
+    return await service.list_events(geofence_id, limit)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query
+from app.application.services.job_service import JobService
+from app.domain.models.authenticated_user import AuthenticatedUser
+from app.domain.schemas.job_schema import JobResponse, JobResultResponse
+from app.presentation.dependencies import get_current_user, get_job_service
+
+router = APIRouter()
+
+@router.get("/", response_model=list[JobResponse])
+async def list_jobs(limit: int = Query(50, ge=1, le=200),
+                    service: JobService = Depends(get_job_service),
+                    current_user: AuthenticatedUser = Depends(get_current_user)):
+    """Trabajos del usuario, del más reciente al más antiguo."""
+    return await service.list_jobs(current_user.id, limit)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str,
+                  service: JobService = Depends(get_job_service),
+                  current_user: AuthenticatedUser = Depends(get_current_user)):
+    """Estado y avance (``progress_current`` de ``progress_total``) del trabajo."""
+    return await service.get_job(job_id, current_user.id)
+
+@router.get("/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str,
+                         service: JobService = Depends(get_job_service),
+                         current_user: AuthenticatedUser = Depends(get_current_user)):
+    """Resultado de un trabajo terminado; 409 si todavía está en cola o en curso."""
+    return await service.get_result(job_id, current_user.id)
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str,
+                     service: JobService = Depends(get_job_service),
+                     current_user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Cancela un trabajo en cola; uno en curso se detiene en su próximo chunk
+    (``cancel_requested`` queda en true hasta entonces). 409 si ya terminó.
+    """
+    return await service.cancel_job(job_id, current_user.id)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from app.application.services.position_service import PositionService
+from app.core.config import settings
+from app.core.metrics import GEOFENCE_EVENTS, POSITIONS_INGESTED
+from app.domain.schemas.geofence_schema import GeofenceEventResponse
+from app.domain.schemas.position_schema import PositionBatch, PositionIngestResult
+from app.presentation.dependencies import get_current_user, get_position_service
+from app.websocket.manager import manager
+
+router = APIRouter()
+
+@router.post("/", response_model=PositionIngestResult)
+async def ingest_positions(batch: PositionBatch,
+                           service: PositionService = Depends(get_position_service),
+                           current_user = Depends(get_current_user)):
+    """
+    Recibe un lote de posiciones (hasta 5000), las evalúa contra las geocercas,
+    avanza la detección de viajes y paradas y las retransmite por ``/ws`` junto
+    con los eventos de entrada/salida.
+    """
+    positions = [p.model_dump() for p in batch.positions]
+    events = await service.ingest(positions)
+    POSITIONS_INGESTED.labels().inc(len(positions))
+    # Solo se encola: el envío a cada socket corre fuera de la request
+    if settings.WS_BROADCAST_ENABLED:
+        manager.publish_positions(positions)
+    payload = [GeofenceEventResponse.model_validate(e).model_dump(mode="json") for e in events]
+    for event in payload:
+        GEOFENCE_EVENTS.labels(event["event"]).inc()
+        if settings.WS_BROADCAST_ENABLED:
+            manager.broadcast({"type": "geofence", **event})
+    return {"accepted": len(positions), "events": payload}
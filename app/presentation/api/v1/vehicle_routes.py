@@ -1,34 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.domain.schemas.vehicle_schema import VehicleCreate, VehicleResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from app.domain.schemas.vehicle_schema import (
+    VehicleCreate, VehicleResponse, VehicleBatchGetRequest, VehicleBatchGetResponse,
+    VehicleBulkSelection, VehicleBulkUpdateRequest, VehicleBulkResult, VehicleAggregatesResponse, VehicleImportResult,
+    VehicleChangesResponse, CHANGES_DEFAULT_LIMIT, CHANGES_MAX_LIMIT,
+)
 from app.application.services.vehicle_service import VehicleService
+from app.application.services.job_service import JobService
+from app.application.services.trip_service import TripService
+from app.application.services.vehicle_jobs import VEHICLE_BULK_DELETE, VEHICLE_BULK_UPDATE
+from app.domain.schemas.job_schema import JobResponse
+from app.domain.schemas.trip_schema import VehicleTripsResponse
 from app.application.exceptions import NotFoundError
-from app.presentation.dependencies import get_vehicle_service, get_current_user
+from app.core.config import settings
+from app.core.metrics import RESPONSE_CACHE
+from app.core.response_cache import normalized_key
+from app.presentation.dependencies import (
+    get_vehicle_service, get_read_vehicle_service, get_current_user, get_job_service, get_read_trip_service,
+    job_runner, vehicle_list_cache,
+)
+from app.presentation.uploads import upload_chunks
+from app.presentation.responses import (
+    FastJSONResponse, cached_json_response, vehicle_batch_response, vehicle_changes_response, vehicle_response, vehicles_response,
+)
 
 router = APIRouter()
 
 @router.get("/", response_model=list[VehicleResponse])
-async def list_vehicles(service: VehicleService = Depends(get_vehicle_service)):
-    return await service.list_vehicles()
+async def list_vehicles(request: Request, service: VehicleService = Depends(get_read_vehicle_service)):
+    """
+    Las requests anónimas se sirven desde una caché de TTL corto (una entrada
+    por ruta: el listado no usa query params); con ``Authorization`` siempre
+    se consulta la base.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED or "authorization" in request.headers:
+        return vehicles_response(await service.list_vehicles())
+
+    async def render() -> bytes:
+        return vehicles_response(await service.list_vehicles()).body
+
+    key = normalized_key(request.url.path, request.url.query, used=())
+    body, cache_status = await vehicle_list_cache.get_or_compute(key, render)
+    RESPONSE_CACHE.labels("vehicle_list", cache_status.lower()).inc()
+    return cached_json_response(body, cache_status, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+@router.post("/batch-get", response_model=VehicleBatchGetResponse)
+async def batch_get_vehicles(body: VehicleBatchGetRequest, service: VehicleService = Depends(get_read_vehicle_service)):
+    """
+    Varios vehículos por id en una sola request (consultas IN por chunks).
+    Devuelve los encontrados en el orden pedido y los ids que no existen.
+    """
+    records, missing = await service.get_vehicles(body.ids)
+    return vehicle_batch_response(records, missing)
+
+async def _enqueue(jobs: JobService, kind: str, body, owner_id) -> FastJSONResponse:
+    job = await jobs.enqueue(kind, body.model_dump(mode="json", exclude_none=True), owner_id)
+    job_runner.notify()
+    return FastJSONResponse(JobResponse.model_validate(job).model_dump(mode="json"), status_code=status.HTTP_202_ACCEPTED)
+
+@router.post("/bulk-update", response_model=VehicleBulkResult, responses={202: {"model": JobResponse}})
+async def bulk_update_vehicles(body: VehicleBulkUpdateRequest,
+                               background: bool = Query(False, description="Run as a job and answer 202 with it"),
+                               service: VehicleService = Depends(get_vehicle_service),
+                               jobs: JobService = Depends(get_job_service),
+                               current_user = Depends(get_current_user)):
+    """
+    Actualiza en bloque los vehículos de ``ids`` o los que cumplen ``filter``.
+    Con ``?background=true`` se encola un trabajo (ver ``/api/v1/jobs``).
+    """
+    if background:
+        return await _enqueue(jobs, VEHICLE_BULK_UPDATE, body, current_user.id)
+    ids = await service.bulk_update_vehicles(body.ids, body.filter, body.changes)
+    return {"affected": len(ids), "ids": ids}
+
+@router.post("/bulk-delete", response_model=VehicleBulkResult, responses={202: {"model": JobResponse}})
+async def bulk_delete_vehicles(body: VehicleBulkSelection,
+                               background: bool = Query(False, description="Run as a job and answer 202 with it"),
+                               service: VehicleService = Depends(get_vehicle_service),
+                               jobs: JobService = Depends(get_job_service),
+                               current_user = Depends(get_current_user)):
+    """
+    Elimina en bloque los vehículos de ``ids`` o los que cumplen ``filter``.
+    Con ``?background=true`` se encola un trabajo (ver ``/api/v1/jobs``).
+    """
+    if background:
+        return await _enqueue(jobs, VEHICLE_BULK_DELETE, body, current_user.id)
+    ids = await service.bulk_delete_vehicles(body.ids, body.filter)
+    return {"affected": len(ids), "ids": ids}
+
+_IMPORT_REQUEST_BODY = {
+    "content": {
+        "multipart/form-data": {
+            "schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}, "required": ["file"]},
+        },
+        "text/csv": {"schema": {"type": "string"}},
+    },
+    "required": True,
+}
+
+@router.post("/import", response_model=VehicleImportResult, openapi_extra={"requestBody": _IMPORT_REQUEST_BODY})
+async def import_vehicles(request: Request,
+                          service: VehicleService = Depends(get_vehicle_service),
+                          current_user = Depends(get_current_user)):
+    """
+    Importa vehículos desde un CSV con encabezado ``brand,arrival_location,applicant``
+    (campo ``file`` de un multipart o el CSV como cuerpo). El archivo se procesa
+    en streaming por lotes; las filas inválidas se informan con su línea.
+    """
+    return await service.import_vehicles_csv(upload_chunks(request))
+
+@router.get("/aggregates", response_model=VehicleAggregatesResponse)
+async def vehicle_aggregates(service: VehicleService = Depends(get_read_vehicle_service)):
+    """
+    Conteos de vehículos por marca, lugar de llegada y día de creación (UTC).
+    """
+    return await service.get_aggregates()
+
+@router.get("/changes", response_model=VehicleChangesResponse)
+async def vehicle_changes(since: str | None = Query(None, description="Sequence number or the next_since cursor of the previous page"),
+                          limit: int = Query(CHANGES_DEFAULT_LIMIT, ge=1, le=CHANGES_MAX_LIMIT),
+                          service: VehicleService = Depends(get_read_vehicle_service)):
+    """
+    Vehículos creados, modificados o eliminados después de ``since``, en orden
+    de cambio. Sin ``since`` se recorre todo desde el principio; se sigue
+    pidiendo con ``next_since`` mientras ``has_more`` sea true.
+    """
+    changes, next_since, has_more = await service.get_changes(since, limit)
+    return vehicle_changes_response(changes, next_since, has_more)
 
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
-async def get_vehicle(vehicle_id: str, service: VehicleService = Depends(get_vehicle_service)):
+async def get_vehicle(vehicle_id: str, service: VehicleService = Depends(get_read_vehicle_service)):
     try:
-        return await service.get_vehicle(vehicle_id)
+        return vehicle_response(await service.get_vehicle(vehicle_id))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
+@router.get("/{vehicle_id}/trips", response_model=VehicleTripsResponse)
+async def vehicle_trips(vehicle_id: str,
+                        limit: int = Query(50, ge=1, le=500),
+                        service: TripService = Depends(get_read_trip_service),
+                        current_user = Depends(get_current_user)):
+    """
+    Viajes y paradas del vehículo (más recientes primero), materializados a
+    medida que se ingieren sus posiciones, y el tramo en curso en ``current``.
+    """
+    return await service.get_trips(vehicle_id, limit)
+
 @router.post("/", response_model=VehicleResponse)
 async def create_vehicle(vehicle: VehicleCreate, 
                          service: VehicleService = Depends(get_vehicle_service),
                          current_user = Depends(get_current_user)):
-    return await service.create_vehicle(vehicle)
+    return vehicle_response(await service.create_vehicle(vehicle))
 
 @router.put("/{vehicle_id}", response_model=VehicleResponse)
 async def update_vehicle(vehicle_id: str, vehicle: VehicleCreate, 
                          service: VehicleService = Depends(get_vehicle_service),
                          current_user = Depends(get_current_user)):
     try:
-        return await service.update_vehicle(vehicle_id, vehicle)
+        return vehicle_response(await service.update_vehicle(vehicle_id, vehicle))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
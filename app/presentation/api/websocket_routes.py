@@ -0,0 +1,47 @@
+import json
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.websocket.manager import manager
+from app.websocket.codec import SUBPROTOCOLS, WIRE_FORMATS, decode_ack
+
+router = APIRouter()
+
+def negotiate_format(websocket: WebSocket) -> tuple[str, str | None]:
+    """
+    Elige el formato de la conexión. Prioridad:
+     1. subprotocolo ``Sec-WebSocket-Protocol`` (gps.bin.v1 / gps.json.v1)
+     2. query param ``?format=binary|json``
+     3. json (compatibilidad con clientes existentes)
+    """
+    for proto in websocket.scope.get("subprotocols", []):
+        if proto in SUBPROTOCOLS:
+            return SUBPROTOCOLS[proto], proto
+    requested = websocket.query_params.get("format", "json")
+    return (requested if requested in WIRE_FORMATS else "json"), None
+
+@router.websocket("/ws")
+async def positions_ws(websocket: WebSocket):
+    """
+    Stream de posiciones en tiempo real.
+    Los clientes binarios confirman frames con ``{"ack": seq}`` o un frame ack binario.
+    """
+    wire_format, subprotocol = negotiate_format(websocket)
+    await manager.connect(websocket, wire_format=wire_format, subprotocol=subprotocol)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            seq = None
+            if message.get("bytes") is not None:
+                seq = decode_ack(message["bytes"])
+            elif message.get("text"):
+                try:
+                    seq = json.loads(message["text"]).get("ack")
+                except (ValueError, AttributeError):
+                    seq = None
+            if isinstance(seq, int):
+                manager.ack(websocket, seq)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
@@ -1,13 +1,32 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, new_session
 from app.infrastructure.repositories.user_repository import UserRepositorySQLAlchemy
 from app.application.services.user_service import UserService
-from app.application.exceptions import AuthenticationError
+from app.application.exceptions import AuthenticationError, RateLimitError
 from app.infrastructure.repositories.vehicle_repository import VehicleRepositorySQLAlchemy
+from app.infrastructure.repositories.job_repository import JobRepositorySQLAlchemy
+from app.infrastructure.repositories.geofence_repository import GeofenceRepositorySQLAlchemy
+from app.infrastructure.repositories.trip_repository import TripRepositorySQLAlchemy
 from app.application.services.vehicle_service import VehicleService
-from app.core.security import decode_token
+from app.application.services.vehicle_aggregates import vehicle_aggregates
+from app.application.services.job_service import JobService
+from app.application.services.job_runner import JobRunner
+from app.application.services.geofence_service import GeofenceIndexCache, GeofenceService
+from app.application.services.position_service import PositionService
+from app.application.services.trip_detector import TripDetector
+from app.application.services.trip_service import TripService
+from app.application.services.vehicle_jobs import vehicle_job_handlers
+from app.core.security import decode_token, token_versions, ACCESS_TOKEN_TYPE
+from app.core.config import settings
+from app.core.metrics import AUTH_RATE_LIMITED
+from app.core.rate_limit import LoginRateLimiter, create_rate_limit_backend
+from app.core.response_cache import ResponseCache
+from app.core.single_flight import SingleFlight
+from app.domain.schemas.user_schema import UserLogin
+from app.domain.models.authenticated_user import AuthenticatedUser
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -18,13 +37,42 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     repo = UserRepositorySQLAlchemy(db)
     return UserService(repo)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), user_service: UserService = Depends(get_user_service)):
+login_rate_limiter = LoginRateLimiter(
+    create_rate_limit_backend(settings.RATE_LIMIT_STORAGE_URL),
+    per_username=settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+# Listado anónimo de vehículos (ver app/core/response_cache.py)
+vehicle_list_cache = ResponseCache(
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    stale_ttl=settings.RESPONSE_CACHE_STALE_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    name="vehicle_list",
+)
+
+async def enforce_login_rate_limit(user_data: UserLogin, request: Request):
+    """
+    Rechaza intentos de login excedentes antes de abrir sesión de DB o correr bcrypt.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    client_ip = request.client.host if request.client else None
+    exceeded = await login_rate_limiter.check(user_data.username, client_ip)
+    if exceeded:
+        scope, retry_after = exceeded
+        AUTH_RATE_LIMITED.labels(scope).inc()
+        raise RateLimitError("Too many login attempts", retry_after=retry_after)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), user_service: UserService = Depends(get_user_service)) -> AuthenticatedUser:
     """
-    Valida el JWT (usando oauth2_scheme), extrae el "sub" y devuelve el User.
-    Lanza HTTP 401 si el token no es válido o el usuario no existe.
+    Valida el access token y devuelve el usuario a partir de sus claims, sin
+    consultar la base. Solo los tokens antiguos (sin "ver") se resuelven en la DB.
+    Lanza HTTP 401 si el token no es válido, fue revocado o el usuario no existe.
     """
     try:
-        payload = decode_token(token)
+        payload = decode_token(token, expected_type=ACCESS_TOKEN_TYPE)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
 
@@ -32,11 +80,71 @@ async def get_current_user(token: str = Depends(oauth2_scheme), user_service: Us
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    user = await user_service.user_repo.get_by_id(user_id)  # direct access to repo (fast)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    version = payload.get("ver")
+    if version is None:
+        user = await user_service.user_repo.get_by_id(user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        return AuthenticatedUser(user.id, user.username, user.token_version or 0)
+
+    if token_versions.is_revoked(user_id, version):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    try:
+        return AuthenticatedUser(UUID(user_id), payload.get("username", ""), version)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+
+# Una instancia por destino: una lectura que read-your-writes manda al primario
+# no debe reutilizar una consulta en curso contra la réplica
+primary_vehicle_reads = SingleFlight("vehicle_reads_primary")
+replica_vehicle_reads = SingleFlight("vehicle_reads_replica")
 
 async def get_vehicle_service(db: AsyncSession = Depends(get_db)) -> VehicleService:
     repo = VehicleRepositorySQLAlchemy(db)
-    return VehicleService(repo)
+    return VehicleService(repo, vehicle_aggregates, primary_vehicle_reads)
+
+async def get_read_vehicle_service(db: AsyncSession = Depends(get_read_db),
+                                   primary: AsyncSession = Depends(get_db)) -> VehicleService:
+    """VehicleService para rutas de solo lectura (réplica si está configurada)."""
+    repo = VehicleRepositorySQLAlchemy(db)
+    return VehicleService(repo, vehicle_aggregates, primary_vehicle_reads if db is primary else replica_vehicle_reads)
+
+async def get_job_service(db: AsyncSession = Depends(get_db)) -> JobService:
+    return JobService(JobRepositorySQLAlchemy(db))
+
+# Trabajos en segundo plano; main.py lo arranca y detiene en el lifespan
+job_runner = JobRunner(
+    new_session,
+    JobRepositorySQLAlchemy,
+    vehicle_job_handlers(VehicleRepositorySQLAlchemy, vehicle_aggregates, primary_vehicle_reads),
+    concurrency=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_SECONDS,
+    heartbeat_interval=settings.JOB_HEARTBEAT_SECONDS,
+)
+
+# Índice espacial de geocercas compartido por las requests del proceso
+geofence_index = GeofenceIndexCache(
+    ttl=settings.GEOFENCE_REFRESH_SECONDS,
+    cell_size=settings.GEOFENCE_GRID_CELL_DEGREES,
+)
+
+async def get_geofence_service(db: AsyncSession = Depends(get_db)) -> GeofenceService:
+    return GeofenceService(GeofenceRepositorySQLAlchemy(db), geofence_index)
+
+trip_detector = TripDetector(
+    stop_speed_kmh=settings.TRIP_STOP_SPEED_KMH,
+    dwell_seconds=settings.TRIP_STOP_DWELL_SECONDS,
+    min_trip_meters=settings.TRIP_MIN_DISTANCE_METERS,
+    max_gap_seconds=settings.TRIP_MAX_GAP_SECONDS,
+)
+
+async def get_trip_service(db: AsyncSession = Depends(get_db)) -> TripService:
+    return TripService(TripRepositorySQLAlchemy(db), trip_detector)
+
+async def get_read_trip_service(db: AsyncSession = Depends(get_read_db)) -> TripService:
+    """TripService para consultar viajes (réplica si está configurada)."""
+    return TripService(TripRepositorySQLAlchemy(db), trip_detector)
+
+async def get_position_service(geofences: GeofenceService = Depends(get_geofence_service),
+                               trips: TripService = Depends(get_trip_service)) -> PositionService:
+    return PositionService(geofences, trips)
@@ -0,0 +1,4 @@
+"""
+Middleware module.
+Contains ASGI middlewares installed by the application.
+"""
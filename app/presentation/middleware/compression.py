@@ -0,0 +1,217 @@
+"""
+Compresión de respuestas negociada por ``Accept-Encoding`` (zstd, br, gzip).
+
+ - Respuestas por debajo de ``minimum_size`` se envían sin comprimir.
+ - ``StreamingResponse`` se comprime chunk a chunk (flush por chunk) sin
+   acumular el cuerpo completo.
+ - Niveles costosos o chunks grandes se comprimen en el thread pool para no
+   bloquear el event loop.
+
+``brotli`` y ``zstandard`` son opcionales: si no están instalados, esos
+encodings simplemente no se ofrecen y se negocia gzip.
+"""
+import zlib
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+EXCLUDED_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.process(chunk) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _one_shot(stream_cls, level: int, body: bytes) -> bytes:
+    stream = stream_cls(level)
+    return stream.compress(body) + stream.finish()
+
+
+# encoding -> (stream, nivel a partir del cual se considera costoso)
+CODECS = {"gzip": (_GzipStream, 7)}
+if brotli is not None:
+    CODECS["br"] = (_BrotliStream, 6)
+if zstandard is not None:
+    CODECS["zstd"] = (_ZstdStream, 10)
+
+# Preferencia del servidor en caso de empate de q-values
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def negotiate_encoding(accept_encoding: str, available=None) -> str | None:
+    """Elige el mejor encoding soportado según los q-values del cliente."""
+    available = CODECS if available is None else available
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in PREFERENCE:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        threadpool_min_size: int = 64 * 1024,
+        levels: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.threadpool_min_size = threadpool_min_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        stream_cls, heavy_level = CODECS[encoding]
+        responder = _CompressionResponder(
+            self.app, encoding, stream_cls, self.levels[encoding],
+            heavy=self.levels[encoding] >= heavy_level,
+            minimum_size=self.minimum_size,
+            threadpool_min_size=self.threadpool_min_size,
+        )
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app, encoding, stream_cls, level, heavy, minimum_size, threadpool_min_size):
+        self.app = app
+        self.encoding = encoding
+        self.stream_cls = stream_cls
+        self.level = level
+        self.heavy = heavy
+        self.minimum_size = minimum_size
+        self.threadpool_min_size = threadpool_min_size
+        self.send: Send | None = None
+        self.start_message: Message | None = None
+        self.passthrough = False
+        self.stream = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def _run(self, fn, *args):
+        size = len(args[-1]) if args and isinstance(args[-1], (bytes, bytearray)) else 0
+        if self.heavy or size >= self.threadpool_min_size:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def _mark_encoded(self, length: int | None):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def send_compressed(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+        if kind != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and self.start_message is not None:
+            if not more_body:
+                # Respuesta completa en un único mensaje
+                if len(body) < self.minimum_size:
+                    await self.send(self.start_message)
+                    await self.send(message)
+                else:
+                    compressed = await self._run(_one_shot, self.stream_cls, self.level, body)
+                    self._mark_encoded(len(compressed))
+                    await self.send(self.start_message)
+                    await self.send({"type": "http.response.body", "body": compressed})
+                self.start_message = None
+                return
+            # Streaming: longitud desconocida, se comprime por chunks
+            self.stream = self.stream_cls(self.level)
+            self._mark_encoded(None)
+            await self.send(self.start_message)
+            self.start_message = None
+
+        if self.stream is None:
+            await self.send(message)
+            return
+        chunk = await self._run(self.stream.compress, body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,186 @@
+"""
+Soporte de ``Idempotency-Key`` para escrituras (POST/PUT/PATCH).
+
+ - La primera request con una clave se ejecuta normalmente y su respuesta
+   (estado < 500) se guarda en el store con un TTL.
+ - Un reintento con la misma clave recibe la respuesta guardada (con el header
+   ``Idempotent-Replayed: true``) sin llegar a la ruta ni al repositorio.
+ - Requests concurrentes con la misma clave se coalescen: esperan a la que
+   está en curso en este proceso y reutilizan su respuesta.
+ - Reusar una clave con otro cuerpo o en otra ruta devuelve 422.
+
+La clave se aísla por usuario (``sub`` del access token), así que dos usuarios
+no comparten respuestas aunque generen la misma clave y un reintento con un
+token recién refrescado sigue reconociendo la clave. Si el token no se puede
+decodificar se usa el hash del header ``Authorization``.
+
+Solo cubre las rutas bajo ``path_prefixes`` (las escrituras de vehículos):
+las de auth devuelven tokens, que no deben quedar guardados ni poder
+reobtenerse reenviando la misma clave. Por la misma razón nunca se guardan
+respuestas con ``Set-Cookie``.
+
+El cuerpo se lee completo para la huella: las requests de más de
+``max_request_size`` bytes responden 413 y las rutas de ``exempt_paths``
+(subidas en streaming) ignoran el header.
+"""
+import asyncio
+import hashlib
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.idempotency import IdempotencyStore, StoredResponse
+from app.core.security import decode_token, InvalidTokenError, ACCESS_TOKEN_TYPE
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+IDEMPOTENT_METHODS = ("POST", "PUT", "PATCH")
+
+
+async def _send_json(send: Send, status_code: int, detail: str):
+    body = orjson.dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _replay(send: Send, stored: StoredResponse):
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+    headers.append((REPLAYED_HEADER, b"true"))
+    await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+def _key_scope(authorization: str) -> str:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_token(token, expected_type=ACCESS_TOKEN_TYPE).get("sub")
+        except InvalidTokenError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return "credential:" + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, ttl: float = 86400, max_body_size: int = 1_048_576,
+                 max_request_size: int = 1_048_576, path_prefixes: tuple[str, ...] = ("/",),
+                 exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.store = store
+        self.ttl = ttl
+        self.max_body_size = max_body_size
+        self.max_request_size = max_request_size
+        self.path_prefixes = tuple(path_prefixes)
+        self.exempt_paths = frozenset(exempt_paths)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in IDEMPOTENT_METHODS
+            or not scope["path"].startswith(self.path_prefixes)
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 1 <= len(idempotency_key) <= 255:
+            await _send_json(send, 400, "Idempotency-Key must be 1-255 characters")
+            return
+
+        too_large = f"Requests with Idempotency-Key are limited to {self.max_request_size} bytes"
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_request_size:
+            await _send_json(send, 413, too_large)
+            return
+
+        # El cuerpo se lee completo para calcular la huella y se re-entrega a la app
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_request_size:
+                await _send_json(send, 413, too_large)
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        scope_key = _key_scope(headers.get("authorization", ""))
+        key = hashlib.sha256(f"{scope_key}:{idempotency_key}".encode()).hexdigest()
+        fingerprint = hashlib.sha256(f"{scope['method']} {scope['path']}\n".encode() + body).hexdigest()
+
+        while True:
+            stored = await self.store.get(key)
+            if stored is None:
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    break
+                stored = await asyncio.shield(inflight)
+                if stored is None:
+                    # La request original falló (5xx o excepción): esta la reintenta
+                    continue
+            if stored.fingerprint != fingerprint:
+                await _send_json(send, 422, "Idempotency-Key reused with a different request")
+            else:
+                await _replay(send, stored)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        stored = None
+        try:
+            stored = await self._run(scope, body, receive, send, fingerprint)
+            if stored is not None:
+                await self.store.set(key, stored, self.ttl)
+        finally:
+            del self._inflight[key]
+            future.set_result(stored)
+
+    async def _run(self, scope: Scope, body: bytes, receive: Receive, send: Send,
+                   fingerprint: str) -> StoredResponse | None:
+        delivered = False
+
+        async def replay_receive() -> Message:
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Después del cuerpo solo queda esperar la desconexión real del cliente
+            return await receive()
+
+        status_code = 500
+        response_headers: list = []
+        response_body: list[bytes] = []
+        size = 0
+
+        async def capture_send(message: Message):
+            nonlocal status_code, response_headers, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in message.get("headers", [])]
+            elif message["type"] == "http.response.body" and size <= self.max_body_size:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                response_body.append(chunk)
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+        if status_code >= 500 or size > self.max_body_size:
+            return None
+        if any(name.lower() == "set-cookie" for name, _ in response_headers):
+            return None
+        return StoredResponse(fingerprint, status_code, response_headers, b"".join(response_body))
@@ -0,0 +1,55 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import HTTP_IN_PROGRESS, HTTP_LATENCY, HTTP_REQUESTS
+
+def route_template(scope: Scope) -> str:
+    """
+    Plantilla completa de la ruta resuelta. Algunas versiones de FastAPI dejan en
+    ``scope["route"]`` la ruta relativa al router incluido (``/{vehicle_id}``);
+    el prefijo estático se recupera de los primeros segmentos del path real.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    path_parts = scope["path"].split("/")
+    keep = len(path_parts) - len(template.split("/")) + 1
+    prefix = "/".join(path_parts[:keep]) if keep > 1 else ""
+    return prefix + template
+
+class MetricsMiddleware:
+    """
+    Latencia, códigos de estado y requests en curso por ruta.
+    Se etiqueta con la plantilla de la ruta (``/api/v1/vehicles/{vehicle_id}``)
+    para no crear una serie por id; lo que no enruta queda como ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            template = route_template(scope)
+            HTTP_LATENCY.labels(method, template).observe(elapsed)
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
@@ -0,0 +1,162 @@
+"""
+Perfilado bajo demanda de requests individuales.
+
+Se activa con ``PROFILING_ENABLED`` y perfila una request cuando:
+ - trae el header ``X-Profile`` con el valor de ``PROFILING_TOKEN``, o
+ - le toca por muestreo (1 de cada ``PROFILING_SAMPLE_EVERY``).
+
+El sampler corre en un hilo aparte y cada ``interval`` segundos mira la
+task de la request:
+ - si la task está ejecutándose, registra la pila real del hilo del loop (CPU);
+ - si está suspendida, registra la cadena de ``await`` de la corrutina con una
+   hoja ``[await <tipo>]``, de modo que el tiempo esperando a la DB aparece
+   en el perfil aunque no consuma CPU.
+
+El resultado se guarda en formato "collapsed stacks" (una línea
+``frame;frame;frame N`` por pila), listo para ``flamegraph.pl`` o speedscope.
+"""
+import asyncio
+import hmac
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SUFFIX = ".folded"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _await_chain(task: asyncio.Task) -> tuple[list, object]:
+    """Frames de la cadena de corrutinas (raíz primero) y el objeto esperado al final."""
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return frames, awaitable
+
+
+class RequestSampler:
+    """Muestrea la pila de una task de asyncio desde un hilo auxiliar."""
+
+    def __init__(self, task: asyncio.Task, loop_thread_id: int, interval: float = 0.005):
+        self.task = task
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # Lectura concurrente del estado de la corrutina; se descarta la muestra
+                continue
+
+    def sample(self):
+        chain, awaited = _await_chain(self.task)
+        if not chain:
+            return
+        root = chain[0]
+        thread_frame = sys._current_frames().get(self.loop_thread_id)
+
+        stack = []
+        frame = thread_frame
+        while frame is not None:
+            stack.append(frame)
+            if frame is root:
+                break
+            frame = frame.f_back
+        if frame is root:
+            # La task está en CPU: pila real del hilo desde la raíz de la task
+            labels = [_frame_label(f) for f in reversed(stack)]
+        else:
+            labels = [_frame_label(f) for f in chain]
+            labels.append(f"[await {type(awaited).__name__}]" if awaited is not None else "[ready]")
+        self.samples[";".join(labels)] += 1
+
+
+def write_profile(directory: str, name: str, samples: Counter, max_files: int) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as fh:
+        for stack, count in samples.most_common():
+            fh.write(f"{stack} {count}\n")
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(PROFILE_SUFFIX)),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-max_files] if max_files > 0 else []:
+        os.remove(entry.path)
+    return path
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        token: str | None = None,
+        sample_every: int = 0,
+        interval: float = 0.005,
+        max_files: int = 200,
+    ):
+        self.app = app
+        self.directory = directory
+        self.token = token
+        self.sample_every = sample_every
+        self.interval = interval
+        self.max_files = max_files
+        self._counter = itertools.count(1)
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            provided = Headers(scope=scope).get(PROFILE_HEADER)
+            if provided and hmac.compare_digest(provided, self.token):
+                return True
+        return self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = RequestSampler(asyncio.current_task(), threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = sampler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+            name = f"{time.strftime('%Y%m%dT%H%M%S')}-{int(elapsed_ms)}ms-{scope['method']}-{slug}-{os.getpid()}-{id(sampler):x}{PROFILE_SUFFIX}"
+            await run_in_threadpool(write_profile, self.directory, name, samples, self.max_files)
@@ -0,0 +1,19 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.query_tracking import check_budget, track_queries
+
+class QueryTrackingMiddleware:
+    """Abre un tracker de consultas por request y revisa el presupuesto al terminar."""
+
+    def __init__(self, app: ASGIApp, count_limit: int = 20, repeat_limit: int = 1, mode: str = "warn"):
+        self.app = app
+        self.count_limit = count_limit
+        self.repeat_limit = repeat_limit
+        self.mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries(f"{scope['method']} {scope['path']}") as tracker:
+            await self.app(scope, receive, send)
+        check_budget(tracker, self.count_limit, self.repeat_limit, self.mode)
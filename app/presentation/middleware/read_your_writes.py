@@ -0,0 +1,37 @@
+"""
+Read-your-writes para la réplica de lectura.
+
+Tras una escritura exitosa (método distinto de GET/HEAD/OPTIONS con estado
+< 400) el cliente queda "pegado" al primario durante la ventana configurada:
+se registra en ``ReadYourWrites`` de este proceso y en la cookie
+``rw_primary_until`` que ``get_read_db`` consulta en cualquier worker.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.database import STICKY_COOKIE, ReadYourWrites, client_key
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp, tracker: ReadYourWrites):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                client = scope.get("client")
+                until = self.tracker.record(client_key(Headers(scope=scope), client[0] if client else None))
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={until:.3f}; Max-Age={max(1, int(self.tracker.window))}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
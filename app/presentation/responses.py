@@ -0,0 +1,59 @@
+"""
+Respuestas JSON rápidas.
+
+``FastJSONResponse`` es la clase de respuesta por defecto de la app (orjson).
+Las rutas calientes usan ``vehicles_response``/``vehicle_response`` para
+construir el JSON directamente desde las filas (ORM, ``Row`` de Core o DTOs)
+sin pasar por la validación de ``response_model`` ni ``jsonable_encoder``.
+El esquema publicado en OpenAPI sigue siendo ``VehicleResponse``.
+"""
+from typing import Any, Iterable
+import orjson
+from fastapi.responses import JSONResponse, Response
+from app.domain.schemas.vehicle_schema import VehicleResponse
+
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+VEHICLE_FIELDS = tuple(VehicleResponse.model_fields)
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+def vehicle_to_dict(row) -> dict:
+    """Proyecta una fila con atributos (ORM, Row, DTO) a los campos de VehicleResponse."""
+    return {field: getattr(row, field) for field in VEHICLE_FIELDS}
+
+def vehicles_response(rows: Iterable, status_code: int = 200) -> FastJSONResponse:
+    return FastJSONResponse([vehicle_to_dict(r) for r in rows], status_code=status_code)
+
+def vehicle_response(row, status_code: int = 200) -> FastJSONResponse:
+    return FastJSONResponse(vehicle_to_dict(row), status_code=status_code)
+
+def vehicle_batch_response(rows: Iterable, missing: list[str]) -> FastJSONResponse:
+    return FastJSONResponse({"vehicles": [vehicle_to_dict(r) for r in rows], "missing": missing})
+
+def vehicle_changes_response(changes: Iterable, next_since: str, has_more: bool) -> FastJSONResponse:
+    return FastJSONResponse({
+        "changes": [
+            {
+                "change_seq": c.change_seq,
+                "id": c.id,
+                "deleted": c.vehicle is None,
+                "vehicle": vehicle_to_dict(c.vehicle) if c.vehicle is not None else None,
+                "deleted_at": c.deleted_at,
+            }
+            for c in changes
+        ],
+        "next_since": next_since,
+        "has_more": has_more,
+    })
+
+def cached_json_response(body: bytes, cache_status: str, max_age: float) -> Response:
+    """JSON ya serializado desde una caché; ``X-Cache`` indica HIT/STALE/MISS/COALESCED."""
+    return Response(body, media_type="application/json", headers={
+        "X-Cache": cache_status,
+        "Cache-Control": f"public, max-age={int(max_age)}",
+    })
@@ -0,0 +1,81 @@
+"""
+Lectura en streaming de archivos subidos.
+
+``UploadFile`` de FastAPI recibe el archivo completo (en un temporal) antes de
+llamar a la ruta. ``upload_chunks`` en cambio entrega los bytes del archivo a
+medida que llegan por el socket, con el parser incremental de
+``python-multipart``, así que la memoria no depende del tamaño del archivo.
+
+Acepta ``multipart/form-data`` (campo ``field``) o el archivo como cuerpo
+crudo (``text/csv``, ``application/octet-stream``...).
+"""
+from typing import AsyncIterator
+from fastapi import Request
+from app.application.exceptions import ValidationError
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # pragma: no cover - python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+async def upload_chunks(request: Request, field: str = "file") -> AsyncIterator[bytes]:
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data":
+        async for chunk in request.stream():
+            if chunk:
+                yield chunk
+        return
+
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise ValidationError("Missing multipart boundary")
+    wanted = field.encode()
+    headers: dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    state = {"active": False, "found": False}
+    out: list[bytes] = []
+
+    def on_part_begin():
+        headers.clear()
+        state["active"] = False
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        _, params = parse_options_header(headers.get(b"content-disposition", b""))
+        state["active"] = params.get(b"name") == wanted
+        state["found"] = state["found"] or state["active"]
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state["active"]:
+            out.append(data[start:end])
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if out:
+            yield b"".join(out)
+            out.clear()
+    parser.finalize()
+    if out:
+        yield b"".join(out)
+    if not state["found"]:
+        raise ValidationError(f"Missing multipart field {field!r}")
@@ -0,0 +1,149 @@
+"""
+Punto de entrada de producción: ``python -m app.server`` (ver ``Procfile``).
+
+ - Cantidad de workers: ``WEB_CONCURRENCY`` si está definido; si no, uno por
+   CPU disponible (afinidad y cuota de cgroup), acotado por la memoria del
+   contenedor / ``WORKER_MEMORY_MB`` y por ``WEB_MAX_WORKERS``. El tamaño
+   automático solo se usa si el estado compartido está configurado (ver abajo);
+   si no, arranca un único worker.
+ - Usa uvloop y httptools cuando están instalados (asyncio/h11 si no).
+ - Detrás del proxy de Render la IP del cliente sale de ``X-Forwarded-For``
+   (``proxy_headers``), confiando solo en ``FORWARDED_ALLOW_IPS``.
+ - Keep-alive, backlog y tiempo de drenado salen de ``Settings``. Con SIGTERM
+   uvicorn deja de aceptar conexiones, cierra las inactivas y espera a las
+   requests en curso hasta ``SERVER_GRACEFUL_SHUTDOWN_SECONDS`` antes de
+   correr el shutdown del lifespan.
+
+Con más de un worker, el rate limiting y la idempotencia en memoria son por
+proceso: el límite de login se multiplica por la cantidad de workers y un
+reintento puede caer en otro worker y repetir la escritura. Hay que usar
+``RATE_LIMIT_STORAGE_URL`` e ``IDEMPOTENCY_BACKEND=database``. La difusión por
+``/ws`` también es por proceso (un cliente solo recibe las posiciones que
+ingresó su mismo worker), así que requiere ``WS_BROADCAST_ENABLED=false``. Si
+se fuerza ``WEB_CONCURRENCY`` > 1 sin todo eso, se avisa al arrancar.
+"""
+import importlib.util
+import logging
+import os
+import uvicorn
+from app.core.config import settings
+
+logger = logging.getLogger("app.server")
+
+APP = "app.main:app"
+CGROUP_ROOT = "/sys/fs/cgroup"
+# cgroup v1 informa "sin límite" con un valor cercano a 2**63
+_UNLIMITED_BYTES = 1 << 60
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit(root: str = CGROUP_ROOT) -> float | None:
+    """CPUs permitidas por la cuota del cgroup (v2 ``cpu.max`` o v1 ``cfs_quota``)."""
+    cpu_max = _read(os.path.join(root, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+    period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cgroup_memory_limit_mb(root: str = CGROUP_ROOT) -> int | None:
+    for path in (os.path.join(root, "memory.max"), os.path.join(root, "memory", "memory.limit_in_bytes")):
+        value = _read(path)
+        if value and value != "max" and int(value) < _UNLIMITED_BYTES:
+            return int(value) // (1024 * 1024)
+    return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - macOS/Windows
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit(root)
+    if quota is not None:
+        cpus = min(cpus, int(quota))
+    return max(1, cpus)
+
+
+def available_memory_mb(root: str = CGROUP_ROOT) -> int | None:
+    limit = cgroup_memory_limit_mb(root)
+    if limit is not None:
+        return limit
+    meminfo = _read("/proc/meminfo") or ""
+    for line in meminfo.splitlines():
+        if line.startswith("MemTotal:"):
+            return int(line.split()[1]) // 1024
+    return None
+
+
+def auto_workers(cpus: int, memory_mb: int | None, worker_memory_mb: int, max_workers: int) -> int:
+    """Un worker por CPU (la app es async), sin pasarse de la memoria disponible."""
+    workers = cpus
+    if memory_mb is not None:
+        workers = min(workers, memory_mb // worker_memory_mb)
+    return max(1, min(workers, max_workers))
+
+
+def per_process_state() -> list[str]:
+    """Componentes habilitados cuyo estado quedaría separado en cada worker."""
+    local = []
+    if settings.RATE_LIMIT_ENABLED and not settings.RATE_LIMIT_STORAGE_URL:
+        local.append("login rate limiting (set RATE_LIMIT_STORAGE_URL)")
+    if settings.IDEMPOTENCY_ENABLED and settings.IDEMPOTENCY_BACKEND == "memory":
+        local.append("idempotency keys (set IDEMPOTENCY_BACKEND=database)")
+    if settings.WS_BROADCAST_ENABLED:
+        local.append("/ws fan-out reaches only clients of the ingesting worker (set WS_BROADCAST_ENABLED=false)")
+    return local
+
+
+def server_options() -> dict:
+    """Argumentos de ``uvicorn.run`` derivados de ``Settings`` y del entorno."""
+    if settings.WEB_CONCURRENCY:
+        workers = settings.WEB_CONCURRENCY
+    elif per_process_state():
+        workers = 1
+    else:
+        workers = auto_workers(
+            available_cpus(), available_memory_mb(), settings.WORKER_MEMORY_MB, settings.WEB_MAX_WORKERS)
+    return {
+        "host": settings.HOST,
+        "port": settings.PORT,
+        "workers": workers,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    }
+
+
+def main():
+    options = server_options()
+    logging.basicConfig(level=logging.INFO)
+    local = per_process_state()
+    if local and options["workers"] > 1:
+        logger.warning("Running %d workers with per-process state: %s", options["workers"], "; ".join(local))
+    elif local and not settings.WEB_CONCURRENCY:
+        logger.info("Using a single worker because of per-process state: %s", "; ".join(local))
+    logger.info("Starting %s with %d worker(s), loop=%s, http=%s",
+                APP, options["workers"], options["loop"], options["http"])
+    uvicorn.run(APP, **options)
+
+
+if __name__ == "__main__":
+    main()
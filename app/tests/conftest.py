@@ -1,3 +1,7 @@
+import os
+# Las pruebas fallan ante N+1 o consultas repetidas en una misma request
+os.environ.setdefault("QUERY_TRACKING_MODE", "raise")
+
 import pytest
 import pytest_asyncio
 import asyncio
@@ -9,6 +13,8 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.core.database import get_db, Base
 from app.core.config import settings
+from app.core.query_tracking import install_query_tracking
+from app.presentation.dependencies import geofence_index, vehicle_list_cache
 
 # Base de datos de prueba en memoria
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -28,6 +34,7 @@ async def test_engine():
         echo=False,
         future=True
     )
+    install_query_tracking(engine.sync_engine, slow_threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS)
     
     # Crear todas las tablas
     async with engine.begin() as conn:
@@ -70,6 +77,8 @@ async def test_client(test_session: AsyncSession):
             yield test_client
     
     app.dependency_overrides.clear()
+    vehicle_list_cache.clear()
+    geofence_index.invalidate()
 
 @pytest_asyncio.fixture
 async def test_user_token(test_client: AsyncClient) -> str:
@@ -205,3 +205,59 @@ async def test_full_auth_flow(test_client: AsyncClient):
     headers = {"Authorization": f"Bearer {token_data['access_token']}"}
     vehicles_response = await test_client.get("/api/v1/vehicles/", headers=headers)
     assert vehicles_response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limited(test_client: AsyncClient, monkeypatch):
+    """Excess login attempts get 429 with Retry-After before touching the DB."""
+    from app.core.rate_limit import InMemoryRateLimitBackend
+    from app.presentation.dependencies import login_rate_limiter
+
+    monkeypatch.setattr(login_rate_limiter, "backend", InMemoryRateLimitBackend())
+    monkeypatch.setattr(login_rate_limiter, "per_username", 2)
+
+    login_data = {"username": "ratelimited", "password": "wrongpassword"}
+    for _ in range(2):
+        response = await test_client.post("/api/v1/auth/login", json=login_data)
+        assert response.status_code == 401
+
+    response = await test_client.post("/api/v1/auth/login", json=login_data)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_and_revoke_flow(test_client: AsyncClient):
+    """Login returns a refresh token; /refresh rotates it and /revoke invalidates both tokens."""
+    user_data = {"username": "refreshuser", "email": "refresh@example.com", "password": "password123"}
+    assert (await test_client.post("/api/v1/auth/register", json=user_data)).status_code == 200
+
+    login = await test_client.post("/api/v1/auth/login", json={"username": "refreshuser", "password": "password123"})
+    assert login.status_code == 200
+    tokens = login.json()
+    assert tokens["refresh_token"] and tokens["expires_in"] > 0
+
+    refreshed = await test_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    new_tokens = refreshed.json()
+
+    # El refresh token rotado no se puede volver a canjear
+    response = await test_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    # ...y el reuso revoca la familia: el que lo reemplazó tampoco sirve
+    response = await test_client.post("/api/v1/auth/refresh", json={"refresh_token": new_tokens["refresh_token"]})
+    assert response.status_code == 401
+    login = await test_client.post("/api/v1/auth/login", json={"username": "refreshuser", "password": "password123"})
+    new_tokens = (await test_client.post("/api/v1/auth/refresh", json={"refresh_token": login.json()["refresh_token"]})).json()
+
+    # El access token no se acepta como refresh token
+    response = await test_client.post("/api/v1/auth/refresh", json={"refresh_token": new_tokens["access_token"]})
+    assert response.status_code == 401
+
+    headers = {"Authorization": f"Bearer {new_tokens['access_token']}"}
+    assert (await test_client.post("/api/v1/auth/revoke", headers=headers)).status_code == 200
+
+    response = await test_client.post("/api/v1/auth/revoke", headers=headers)
+    assert response.status_code == 401
+    response = await test_client.post("/api/v1/auth/refresh", json={"refresh_token": new_tokens["refresh_token"]})
+    assert response.status_code == 401
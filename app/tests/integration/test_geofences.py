@@ -0,0 +1,121 @@
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+
+DEPOT = [[-74.10, 4.60], [-74.05, 4.60], [-74.05, 4.65], [-74.10, 4.65], [-74.10, 4.60]]
+
+
+@pytest.mark.asyncio
+async def test_geofence_crud(test_client: AsyncClient, test_user_token: str):
+    """Geofences can be created, read, updated and deleted; invalid rings are rejected."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    response = await test_client.post("/api/v1/geofences/", headers=headers,
+                                      json={"name": "Depot Norte", "kind": "depot", "coordinates": DEPOT})
+    assert response.status_code == 200
+    fence = response.json()
+    assert len(fence["coordinates"]) == 4  # el vértice de cierre no se guarda
+
+    response = await test_client.put(f"/api/v1/geofences/{fence['id']}", headers=headers,
+                                     json={"name": "Depot Norte 2", "kind": "depot", "coordinates": DEPOT[:4]})
+    assert response.json()["name"] == "Depot Norte 2"
+    assert (await test_client.get(f"/api/v1/geofences/{fence['id']}", headers=headers)).status_code == 200
+
+    assert (await test_client.delete(f"/api/v1/geofences/{fence['id']}", headers=headers)).status_code == 200
+    assert (await test_client.get(f"/api/v1/geofences/{fence['id']}", headers=headers)).status_code == 404
+
+    response = await test_client.post("/api/v1/geofences/", headers=headers,
+                                      json={"name": "Line", "coordinates": [[0, 0], [1, 1], [0, 0]]})
+    assert response.status_code == 422
+    assert (await test_client.get("/api/v1/geofences/")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_ingested_positions_emit_geofence_transitions(test_client: AsyncClient, test_user_token: str):
+    """Only entering and leaving a geofence produce events, also across batches."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    fence = (await test_client.post("/api/v1/geofences/", headers=headers,
+                                    json={"name": "Restricted", "kind": "restricted", "coordinates": DEPOT})).json()
+    vehicle = str(uuid4())
+
+    def position(lon, lat, ts):
+        return {"vehicle_id": vehicle, "lat": lat, "lon": lon, "speed": 20, "timestamp": ts}
+
+    # Desordenadas a propósito: el lote se procesa por timestamp
+    response = await test_client.post("/api/v1/positions/", headers=headers, json={"positions": [
+        position(-74.07, 4.62, 1_700_000_010), position(-74.20, 4.62, 1_700_000_000),
+        position(-74.08, 4.63, 1_700_000_020),
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["accepted"] == 3
+    assert [(e["event"], e["geofence_id"]) for e in body["events"]] == [("enter", fence["id"])]
+
+    response = await test_client.post("/api/v1/positions/", headers=headers, json={"positions": [
+        position(-74.06, 4.61, 1_700_000_030), position(-74.00, 4.61, 1_700_000_040),
+    ]})
+    assert [e["event"] for e in response.json()["events"]] == ["exit"]
+
+    # Un lote atrasado (o reintentado) no vuelve el estado atrás
+    response = await test_client.post("/api/v1/positions/", headers=headers, json={"positions": [
+        position(-74.07, 4.62, 1_700_000_035),
+    ]})
+    assert response.json()["events"] == []
+
+    events = (await test_client.get(f"/api/v1/geofences/{fence['id']}/events", headers=headers)).json()
+    assert [e["event"] for e in events] == ["exit", "enter"]
+    assert (await test_client.post("/api/v1/positions/", json={"positions": [position(0, 0, 1)]})).status_code == 401
+    # El timestamp tiene que caber en el uint32 del frame binario de /ws
+    response = await test_client.post("/api/v1/positions/", headers=headers, json={"positions": [position(0, 0, 2**32)]})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_interleaved_batches_for_a_vehicle_emit_each_transition_once(tmp_path):
+    """A batch that arrives while another holds the vehicle's cursor waits for it instead of repeating its events."""
+    import asyncio
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.domain.models.geofence_model import Geofence, GeofenceEvent
+    from app.application.services.geofence_service import GeofenceIndexCache, GeofenceService
+    from app.infrastructure.repositories.geofence_repository import GeofenceRepositorySQLAlchemy
+
+    # Archivo y no memoria: cada sesión necesita su propia conexión para competir por el lock
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'geofences.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        session.add(Geofence(name="Depot", kind="depot", coordinates=DEPOT[:-1]))
+        await session.commit()
+
+    vehicle = uuid4()
+    batch = [{"vehicle_id": vehicle, "lat": 4.62, "lon": lon, "timestamp": ts}
+             for lon, ts in ((-74.20, 1_700_000_000), (-74.07, 1_700_000_010))]
+    cache = GeofenceIndexCache()
+    locked, resume = asyncio.Event(), asyncio.Event()
+
+    class PausingRepository(GeofenceRepositorySQLAlchemy):
+        async def lock_cursors(self, vehicle_ids):
+            cursors = await super().lock_cursors(vehicle_ids)
+            locked.set()
+            await resume.wait()
+            return cursors
+
+    try:
+        async with Session() as first, Session() as second:
+            await cache.get(GeofenceRepositorySQLAlchemy(first))
+            holder = asyncio.create_task(GeofenceService(PausingRepository(first), cache).evaluate(batch))
+            await locked.wait()
+            racer = asyncio.create_task(GeofenceService(GeofenceRepositorySQLAlchemy(second), cache).evaluate(batch))
+            await asyncio.sleep(0.2)
+            assert not racer.done()
+            resume.set()
+            held_events, raced_events = await asyncio.gather(holder, racer)
+
+        assert [e["event"] for e in held_events] == ["enter"] and raced_events == []
+        async with Session() as session:
+            assert await session.scalar(select(func.count()).select_from(GeofenceEvent)) == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,60 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.application.services.job_runner import JobRunner
+from app.application.services.vehicle_jobs import vehicle_job_handlers
+from app.infrastructure.repositories.job_repository import JobRepositorySQLAlchemy
+from app.infrastructure.repositories.vehicle_repository import VehicleRepositorySQLAlchemy
+
+
+@pytest.mark.asyncio
+async def test_background_bulk_update_job(test_client: AsyncClient, test_user_token: str, test_engine):
+    """A background bulk update is queued, run by the job runner and its result retrieved."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    ids = []
+    for i in range(3):
+        response = await test_client.post(
+            "/api/v1/vehicles/", json={"brand": "Seat", "arrival_location": "Ibagué", "applicant": f"Job {i}"}, headers=headers)
+        ids.append(response.json()["id"])
+
+    response = await test_client.post("/api/v1/vehicles/bulk-update?background=true", headers=headers, json={
+        "ids": ids, "changes": {"arrival_location": "Armenia"}})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+
+    pending = await test_client.get(f"/api/v1/jobs/{job['id']}/result", headers=headers)
+    assert pending.status_code == 409
+
+    sessionmaker = async_sessionmaker(test_engine, expire_on_commit=False, class_=AsyncSession)
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, vehicle_job_handlers(VehicleRepositorySQLAlchemy))
+    assert (await runner.run_next()).id.hex == job["id"].replace("-", "")
+
+    status_response = await test_client.get(f"/api/v1/jobs/{job['id']}", headers=headers)
+    assert status_response.json()["status"] == "succeeded"
+    assert (status_response.json()["progress_current"], status_response.json()["progress_total"]) == (3, 3)
+
+    result = (await test_client.get(f"/api/v1/jobs/{job['id']}/result", headers=headers)).json()["result"]
+    assert result["affected"] == 3 and sorted(result["ids"]) == sorted(ids)
+    fetched = (await test_client.post("/api/v1/vehicles/batch-get", json={"ids": ids})).json()["vehicles"]
+    assert {v["arrival_location"] for v in fetched} == {"Armenia"}
+
+    listed = (await test_client.get("/api/v1/jobs/", headers=headers)).json()
+    assert job["id"] in {j["id"] for j in listed}
+    assert (await test_client.post(f"/api/v1/jobs/{job['id']}/cancel", headers=headers)).status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_private_and_cancellable(test_client: AsyncClient, test_user_token: str):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    response = await test_client.post("/api/v1/vehicles/bulk-delete?background=true", headers=headers, json={
+        "filter": {"brand": "Nobody"}})
+    job_id = response.json()["id"]
+
+    cancelled = await test_client.post(f"/api/v1/jobs/{job_id}/cancel", headers=headers)
+    assert cancelled.status_code == 200
+    assert cancelled.json()["status"] == "cancelled"
+
+    assert (await test_client.get(f"/api/v1/jobs/{job_id}")).status_code == 401
+    assert (await test_client.get("/api/v1/jobs/not-a-uuid", headers=headers)).status_code == 404
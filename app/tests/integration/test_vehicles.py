@@ -116,6 +116,32 @@ async def test_list_vehicles_success(test_client: AsyncClient, test_user_token:
     assert len(data) >= 3  # At least the 3 we created
 
 
+@pytest.mark.asyncio
+async def test_anonymous_list_served_from_cache(test_client: AsyncClient, test_user_token: str):
+    """Anonymous list requests share a cached body; authenticated ones bypass it."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+
+    first = await test_client.get("/api/v1/vehicles/")
+    assert first.headers["x-cache"] == "MISS"
+
+    create_response = await test_client.post("/api/v1/vehicles/", json={
+        "brand": "Kia", "arrival_location": "Pasto", "applicant": "Laura"}, headers=headers)
+    assert create_response.status_code == 200
+
+    cached = await test_client.get("/api/v1/vehicles/")
+    assert cached.headers["x-cache"] == "HIT"
+    assert cached.content == first.content
+
+    fresh = await test_client.get("/api/v1/vehicles/", headers=headers)
+    assert "x-cache" not in fresh.headers
+
+    # The list ignores query params, so they must not open new entries
+    busted = await test_client.get("/api/v1/vehicles/?x=123")
+    assert busted.headers["x-cache"] == "HIT"
+    assert busted.content == first.content
+    assert create_response.json()["id"] in {v["id"] for v in fresh.json()}
+
+
 @pytest.mark.asyncio
 async def test_update_vehicle_success(test_client: AsyncClient, test_user_token: str):
     """Test successful vehicle update."""
@@ -146,6 +172,7 @@ async def test_update_vehicle_success(test_client: AsyncClient, test_user_token:
     assert data["brand"] == "Mazda"
     assert data["arrival_location"] == "Medellín"
     assert data["applicant"] == "María González"
+    assert data["updated_at"] is not None
 
 
 @pytest.mark.asyncio
@@ -289,3 +316,292 @@ async def test_complete_vehicle_crud_flow(test_client: AsyncClient, test_user_to
     # 5. Verify deletion
     final_get_response = await test_client.get(f"/api/v1/vehicles/{vehicle_id}")
     assert final_get_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates(test_client: AsyncClient):
+    """Request metrics are labelled by route template, not by concrete id."""
+    fake_id = "550e8400-e29b-41d4-a716-446655440999"
+    await test_client.get(f"/api/v1/vehicles/{fake_id}")
+
+    response = await test_client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/vehicles/{vehicle_id}",status="404"}' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert fake_id not in body
+
+
+@pytest.mark.asyncio
+async def test_create_vehicle_idempotency_key(test_client: AsyncClient, test_user_token: str):
+    """Retrying a create with the same Idempotency-Key returns the same vehicle."""
+    headers = {"Authorization": f"Bearer {test_user_token}", "Idempotency-Key": "create-once"}
+    vehicle_data = {"brand": "Mazda", "arrival_location": "Cali", "applicant": "Retry Client"}
+
+    first = await test_client.post("/api/v1/vehicles/", json=vehicle_data, headers=headers)
+    second = await test_client.post("/api/v1/vehicles/", json=vehicle_data, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["id"] == second.json()["id"]
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_batch_get_vehicles(test_client: AsyncClient, test_user_token: str, monkeypatch):
+    """Batch get fetches chunked IN queries and preserves request order."""
+    from app.infrastructure.repositories import vehicle_repository
+
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    ids = []
+    for brand in ("Kia", "Seat", "Fiat"):
+        response = await test_client.post(
+            "/api/v1/vehicles/", json={"brand": brand, "arrival_location": "Pasto", "applicant": "Batch"}, headers=headers)
+        ids.append(response.json()["id"])
+
+    monkeypatch.setattr(vehicle_repository, "IN_CHUNK_SIZE", 2)
+    missing_id = "550e8400-e29b-41d4-a716-446655449999"
+    response = await test_client.post("/api/v1/vehicles/batch-get", json={"ids": [ids[2], missing_id, ids[0], ids[1]]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [v["id"] for v in data["vehicles"]] == [ids[2], ids[0], ids[1]]
+    assert [v["brand"] for v in data["vehicles"]] == ["Fiat", "Kia", "Seat"]
+    assert data["missing"] == [missing_id]
+
+    response = await test_client.post("/api/v1/vehicles/batch-get", json={"ids": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_vehicles(test_client: AsyncClient, test_user_token: str, monkeypatch):
+    """Bulk endpoints update/delete by ids or filter and report affected ids."""
+    from app.infrastructure.repositories import vehicle_repository
+
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    ids = []
+    for i in range(3):
+        response = await test_client.post(
+            "/api/v1/vehicles/", json={"brand": "Renault", "arrival_location": "Tunja", "applicant": f"Bulk {i}"}, headers=headers)
+        ids.append(response.json()["id"])
+
+    monkeypatch.setattr(vehicle_repository, "IN_CHUNK_SIZE", 2)
+    response = await test_client.post("/api/v1/vehicles/bulk-update", headers=headers, json={
+        "ids": ids + ["not-a-uuid"], "changes": {"arrival_location": "Neiva"}})
+    assert response.status_code == 200
+    assert response.json()["affected"] == 3
+    assert sorted(response.json()["ids"]) == sorted(ids)
+
+    fetched = (await test_client.post("/api/v1/vehicles/batch-get", json={"ids": ids})).json()["vehicles"]
+    assert {v["arrival_location"] for v in fetched} == {"Neiva"}
+    assert all(v["updated_at"] for v in fetched)
+
+    response = await test_client.post("/api/v1/vehicles/bulk-update", headers=headers, json={
+        "filter": {"applicant": "Bulk 0", "arrival_location": "Neiva"}, "changes": {"brand": "Dacia"}})
+    assert response.json() == {"affected": 1, "ids": [ids[0]]}
+
+    response = await test_client.post("/api/v1/vehicles/bulk-delete", headers=headers, json={
+        "filter": {"arrival_location": "Neiva"}})
+    assert response.json()["affected"] == 3
+    missing = (await test_client.post("/api/v1/vehicles/batch-get", json={"ids": ids})).json()["missing"]
+    assert missing == ids
+
+
+@pytest.mark.asyncio
+async def test_bulk_requests_are_validated(test_client: AsyncClient, test_user_token: str):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    bad_bodies = [
+        {"changes": {"brand": "X"}},
+        {"ids": ["550e8400-e29b-41d4-a716-446655440000"], "filter": {"brand": "X"}, "changes": {"brand": "X"}},
+        {"filter": {}, "changes": {"brand": "X"}},
+        {"filter": {"brand": "X"}, "changes": {}},
+    ]
+    for body in bad_bodies:
+        response = await test_client.post("/api/v1/vehicles/bulk-update", headers=headers, json=body)
+        assert response.status_code == 422
+
+    response = await test_client.post("/api/v1/vehicles/bulk-delete", json={"filter": {"brand": "X"}})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_vehicle_aggregates_match_group_by(test_client: AsyncClient, test_user_token: str, test_session):
+    """The summary table is kept equal to a fresh GROUP BY by every kind of write."""
+    from app.infrastructure.repositories.vehicle_repository import VehicleRepositorySQLAlchemy
+
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    repo = VehicleRepositorySQLAlchemy(test_session)
+    await repo.rebuild_aggregate_counts()
+
+    created = await test_client.post(
+        "/api/v1/vehicles/", json={"brand": "Lada", "arrival_location": "Yopal", "applicant": "Agg"}, headers=headers)
+    vehicle_id = created.json()["id"]
+    await test_client.put(
+        f"/api/v1/vehicles/{vehicle_id}", json={"brand": "Skoda", "arrival_location": "Yopal", "applicant": "Agg"}, headers=headers)
+    second = await test_client.post(
+        "/api/v1/vehicles/", json={"brand": "Lada", "arrival_location": "Mocoa", "applicant": "Agg"}, headers=headers)
+    await test_client.post(
+        "/api/v1/vehicles/", json={"brand": "Lada", "arrival_location": "Leticia", "applicant": "Agg"}, headers=headers)
+    await test_client.post("/api/v1/vehicles/bulk-update", headers=headers, json={
+        "filter": {"brand": "Lada", "applicant": "Agg"}, "changes": {"brand": "Niva"}})
+    await test_client.delete(f"/api/v1/vehicles/{second.json()['id']}", headers=headers)
+    await test_client.post("/api/v1/vehicles/bulk-delete", headers=headers, json={"filter": {"arrival_location": "Leticia"}})
+    await test_client.post("/api/v1/vehicles/import", content=b"brand,arrival_location,applicant\nSkoda,Mocoa,Agg\n",
+                           headers={**headers, "Content-Type": "text/csv"})
+
+    response = await test_client.get("/api/v1/vehicles/aggregates")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["by_brand"]["Skoda"] >= 2 and "Niva" not in data["by_brand"]
+    assert data["by_arrival_location"]["Mocoa"] >= 1
+
+    # Nada que corregir: cada escritura ya ajustó la tabla resumen en su transacción
+    assert await repo.rebuild_aggregate_counts() == 0
+    assert (await test_client.get("/api/v1/vehicles/aggregates")).json()["by_brand"] == data["by_brand"]
+
+
+@pytest.mark.asyncio
+async def test_import_vehicles_csv(test_client: AsyncClient, test_user_token: str, test_session):
+    """CSV import via multipart or raw body inserts valid rows and reports rejected ones."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    csv_body = "brand,arrival_location,applicant\nChevrolet,Cúcuta,Import 1\n,Cúcuta,Import 2\nChevrolet,\"Santa Marta, Magdalena\",Import 3\n"
+
+    response = await test_client.post("/api/v1/vehicles/import", headers=headers,
+                                      files={"file": ("fleet.csv", csv_body.encode(), "text/csv")})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["rejected"]) == (2, 1)
+    assert body["errors"][0]["line"] == 3
+
+    response = await test_client.post("/api/v1/vehicles/import", content=csv_body.encode(),
+                                      headers={**headers, "Content-Type": "text/csv"})
+    assert response.json()["inserted"] == 2
+
+    from sqlalchemy import func, select
+    from app.domain.models.vehicle_model import Vehicle
+    imported = await test_session.scalar(select(func.count()).where(Vehicle.applicant.in_(["Import 1", "Import 3"])))
+    assert imported == 4
+
+    response = await test_client.post("/api/v1/vehicles/import", headers=headers, content=b"brand\nX\n")
+    assert response.status_code == 400
+
+    response = await test_client.post("/api/v1/vehicles/import", files={"file": ("f.csv", csv_body.encode(), "text/csv")})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_vehicle_changes_feed(test_client: AsyncClient, test_user_token: str):
+    """The changes feed pages through creates, updates and deletes (as tombstones) in order."""
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+
+    async def read_all(since):
+        changes = []
+        while True:
+            params = {"limit": 2} if since is None else {"since": since, "limit": 2}
+            body = (await test_client.get("/api/v1/vehicles/changes", params=params)).json()
+            changes.extend(body["changes"])
+            since = body["next_since"]
+            if not body["has_more"]:
+                return changes, since
+
+    _, tail = await read_all(None)
+    ids = []
+    for n in range(3):
+        response = await test_client.post("/api/v1/vehicles/", headers=headers,
+                                          json={"brand": "Kia", "arrival_location": "Pasto", "applicant": f"Feed {n}"})
+        ids.append(response.json()["id"])
+    await test_client.put(f"/api/v1/vehicles/{ids[0]}", headers=headers,
+                          json={"brand": "Kia", "arrival_location": "Ipiales", "applicant": "Feed 0"})
+    await test_client.delete(f"/api/v1/vehicles/{ids[1]}", headers=headers)
+    await test_client.post("/api/v1/vehicles/bulk-delete", headers=headers, json={"ids": [ids[2]]})
+
+    changes, new_tail = await read_all(tail)
+    assert [(c["id"], c["deleted"]) for c in changes] == [(ids[0], False), (ids[1], True), (ids[2], True)]
+    assert changes[0]["vehicle"]["arrival_location"] == "Ipiales"
+    assert changes[1]["vehicle"] is None and changes[1]["deleted_at"]
+    assert [c["change_seq"] for c in changes] == sorted(c["change_seq"] for c in changes)
+
+    assert (await read_all(new_tail))[0] == []
+    response = await test_client.get("/api/v1/vehicles/changes", params={"since": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_vehicle_trips_materialized_from_ingested_positions(test_client: AsyncClient, test_user_token: str):
+    """Trips and stops are detected as positions arrive and served from the stored results."""
+    from uuid import uuid4
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    vehicle = str(uuid4())
+    t0 = 1_700_000_000
+    positions = [{"vehicle_id": vehicle, "lat": 4.6, "lon": -74.1, "speed": 0, "timestamp": t0 + i * 60} for i in range(6)]
+    positions += [{"vehicle_id": vehicle, "lat": 4.6, "lon": -74.1 + 0.005 * i, "speed": 40, "timestamp": t0 + 300 + i * 60}
+                  for i in range(1, 5)]
+    positions += [{"vehicle_id": vehicle, "lat": 4.6, "lon": -74.08, "speed": 0, "timestamp": t0 + 540 + i * 60}
+                  for i in range(1, 6)]
+
+    # En dos lotes: el segundo continúa desde el checkpoint del primero
+    for batch in (positions[:8], positions[8:]):
+        assert (await test_client.post("/api/v1/positions/", headers=headers, json={"positions": batch})).status_code == 200
+
+    response = await test_client.get(f"/api/v1/vehicles/{vehicle}/trips", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["trips"]) == 1 and body["trips"][0]["duration_seconds"] == 300
+    assert 2000 < body["trips"][0]["distance_m"] < 2500
+    assert [s["duration_seconds"] for s in body["stops"]] == [300]
+    assert body["current"]["mode"] == "stopped"
+
+    assert (await test_client.get(f"/api/v1/vehicles/{vehicle}/trips")).status_code == 401
+    assert (await test_client.get("/api/v1/vehicles/not-a-uuid/trips", headers=headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_interleaved_trip_batches_for_a_vehicle_are_serialized(tmp_path):
+    """A batch that arrives while another holds the vehicle's checkpoint waits for it instead of duplicating trips."""
+    import asyncio
+    from uuid import uuid4
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.domain.models.trip_model import Trip, TripCheckpoint
+    from app.application.services.trip_detector import TripDetector
+    from app.application.services.trip_service import TripService
+    from app.infrastructure.repositories.trip_repository import TripRepositorySQLAlchemy
+
+    # Archivo y no memoria: cada sesión necesita su propia conexión para competir por el lock
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'trips.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    detector = TripDetector(stop_speed_kmh=3, dwell_seconds=180, min_trip_meters=100, max_gap_seconds=900)
+
+    vehicle, t0 = uuid4(), 1_700_000_000
+    batch = [{"vehicle_id": vehicle, "lat": 4.6, "lon": lon, "speed": speed, "timestamp": t0 + ts}
+             for ts, lon, speed in ((0, -74.1, 0), (60, -74.1, 40), (360, -74.08, 40), (420, -74.08, 0), (700, -74.08, 0))]
+
+    locked, resume = asyncio.Event(), asyncio.Event()
+
+    class PausingRepository(TripRepositorySQLAlchemy):
+        async def load_checkpoints(self, vehicle_ids):
+            checkpoints = await super().load_checkpoints(vehicle_ids)
+            locked.set()
+            await resume.wait()
+            return checkpoints
+
+    try:
+        async with Session() as first, Session() as second:
+            holder = asyncio.create_task(TripService(PausingRepository(first), detector).process(batch))
+            await locked.wait()
+            racer = asyncio.create_task(TripService(TripRepositorySQLAlchemy(second), detector).process(batch))
+            await asyncio.sleep(0.2)
+            assert not racer.done()
+            resume.set()
+            await asyncio.gather(holder, racer)
+
+        async with Session() as session:
+            assert await session.scalar(select(func.count()).select_from(Trip)) == 1
+            checkpoint = await session.get(TripCheckpoint, vehicle)
+            assert checkpoint.last_timestamp == t0 + 700
+    finally:
+        await engine.dispose()
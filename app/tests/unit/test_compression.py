@@ -0,0 +1,64 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.presentation.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+
+def build_app(**kwargs):
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def large(request):
+        return PlainTextResponse("vehicle," * 1000)
+
+    async def stream(request):
+        async def chunks():
+            for i in range(5):
+                yield f"row-{i}," * 200
+        return StreamingResponse(chunks(), media_type="text/csv")
+
+    app = Starlette(routes=[Route("/small", small), Route("/large", large), Route("/stream", stream)])
+    return CompressionMiddleware(app, minimum_size=500, **kwargs)
+
+
+def test_negotiate_encoding_respects_q_values():
+    available = {"gzip": None, "br": None, "zstd": None}
+    assert negotiate_encoding("gzip, br, zstd", available) == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0", available) is None
+    assert negotiate_encoding("*", {"gzip": None}) == "gzip"
+    assert negotiate_encoding("identity", available) is None
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_are_not_compressed():
+    transport = ASGITransport(app=build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+@pytest.mark.asyncio
+async def test_large_body_gzip():
+    transport = ASGITransport(app=build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < 8000
+    assert response.text == "vehicle," * 1000
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_compressed_chunk_by_chunk():
+    """Heavy levels go through the thread pool and still produce a valid stream."""
+    transport = ASGITransport(app=build_app(levels={"gzip": 9}, threadpool_min_size=0))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"row-{i}," * 200 for i in range(5))
@@ -0,0 +1,56 @@
+import random
+from uuid import uuid4
+
+from app.application.services.geofence_engine import Fence, GeofenceIndex, points_in_ring, transitions
+
+SQUARE = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+# Forma de U: el hueco (0.4..0.6, 0.3..1) queda fuera
+U_SHAPE = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.6, 1.0), (0.6, 0.3), (0.4, 0.3), (0.4, 1.0), (0.0, 1.0)]
+
+
+def test_points_in_ring_handles_concave_polygons():
+    fence = Fence.from_coordinates(uuid4(), U_SHAPE)
+    px = [0.2, 0.5, 0.5, 0.8, 1.5, -0.1]
+    py = [0.5, 0.5, 0.1, 0.9, 0.5, 0.5]
+    assert points_in_ring(fence.xs, fence.ys, px, py) == [True, False, True, True, False, False]
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(3)
+    fences = []
+    for _ in range(40):
+        x, y, size = rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(0.01, 0.3)
+        fences.append(Fence.from_coordinates(uuid4(), [(x, y), (x + size, y), (x + size / 2, y + size)]))
+    fences.append(Fence.from_coordinates(uuid4(), [(-50, -50), (50, -50), (50, 50), (-50, 50)]))
+    index = GeofenceIndex(fences, cell_size=0.05)
+    assert index.large  # la cerca enorme no se reparte en la grilla
+
+    lons = [rng.uniform(-1.2, 1.2) for _ in range(500)]
+    lats = [rng.uniform(-1.2, 1.2) for _ in range(500)]
+    expected = [
+        {f.id for f in fences if points_in_ring(f.xs, f.ys, [x], [y])[0]}
+        for x, y in zip(lons, lats)
+    ]
+    assert index.locate(lons, lats) == expected
+
+
+def test_transitions_emit_only_enter_and_exit():
+    depot = Fence.from_coordinates(uuid4(), SQUARE)
+    index = GeofenceIndex([depot])
+    vehicle = uuid4()
+    path = [(-0.5, 0.5), (0.5, 0.5), (0.6, 0.6), (1.5, 0.5), (2.0, 0.5)]
+    positions = [{"vehicle_id": vehicle, "lon": x, "lat": y, "timestamp": 1_700_000_000 + i}
+                 for i, (x, y) in enumerate(path)]
+    states = {}
+
+    events = transitions(index, positions, states)
+    assert [(e["event"], e["occurred_at"].timestamp()) for e in events] == [
+        ("enter", 1_700_000_001), ("exit", 1_700_000_003),
+    ]
+    assert states[vehicle] == set()
+
+    # Estado de una cerca que este índice no conoce: se conserva y no genera salida
+    unknown = uuid4()
+    states = {vehicle: {unknown}}
+    assert [e["event"] for e in transitions(index, positions[1:2], states)] == ["enter"]
+    assert states[vehicle] == {depot.id, unknown}
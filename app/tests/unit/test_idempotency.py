@@ -0,0 +1,190 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.database import Base
+from app.core.idempotency import DatabaseIdempotencyStore, InMemoryIdempotencyStore, StoredResponse
+from app.presentation.middleware.idempotency import IdempotencyMiddleware
+
+
+def build_app(store=None, delay: float = 0.0, status_code: int = 200):
+    calls = []
+
+    async def create(request):
+        payload = await request.json()
+        calls.append(payload)
+        await asyncio.sleep(delay)
+        return JSONResponse({"n": len(calls), **payload}, status_code=status_code)
+
+    app = Starlette(routes=[Route("/items", create, methods=["POST"])])
+    return IdempotencyMiddleware(app, store or InMemoryIdempotencyStore(), ttl=60), calls
+
+
+@pytest.mark.asyncio
+async def test_repeated_key_replays_stored_response():
+    """A retry with the same key gets the first response without reaching the route."""
+    app, calls = build_app()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+        second = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+        other = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k2"})
+
+    assert first.json() == second.json() == {"n": 1, "a": 1}
+    assert second.headers["idempotent-replayed"] == "true"
+    assert other.json()["n"] == 2
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_body_is_rejected():
+    app, calls = build_app()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+        response = await client.post("/items", json={"a": 2}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_per_credential():
+    app, calls = build_app()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer a"})
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer b"})
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    """In-flight duplicates wait for the first request instead of running again."""
+    app, calls = build_app(delay=0.05)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "same"}) for _ in range(5)
+        ))
+
+    assert len(calls) == 1
+    assert {r.json()["n"] for r in responses} == {1}
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored():
+    app, calls = build_app(status_code=503)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1"})
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_store_expires_and_is_bounded():
+    now = [0.0]
+    store = InMemoryIdempotencyStore(max_entries=3, clock=lambda: now[0])
+    response = StoredResponse("f", 200, [], b"{}")
+
+    for i in range(5):
+        await store.set(f"k{i}", response, ttl=10)
+    assert len(store) == 3
+    assert await store.get("k0") is None
+
+    now[0] = 11
+    assert await store.get("k4") is None
+
+
+@pytest.mark.asyncio
+async def test_database_store_round_trip():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    store = DatabaseIdempotencyStore(async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession))
+
+    stored = StoredResponse("f", 201, [["content-type", "application/json"]], b'{"id": 1}')
+    await store.set("key", stored, ttl=60)
+    assert await store.get("key") == stored
+    assert await store.get("missing") is None
+
+    await store.set("expired", stored, ttl=-1)
+    assert await store.get("expired") is None
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_per_user_across_token_refresh():
+    """A retry with a refreshed access token for the same user still replays the response."""
+    from app.core.security import create_access_token
+    app, calls = build_app()
+    first_token = create_access_token("user-1", claims={"ver": 0})
+    refreshed_token = create_access_token("user-1", expires_minutes=30, claims={"ver": 0})
+    other_user = create_access_token("user-2", claims={"ver": 0})
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for token in (first_token, refreshed_token, other_user):
+            await client.post("/items", json={"a": 1},
+                              headers={"Idempotency-Key": "k1", "Authorization": f"Bearer {token}"})
+    assert first_token != refreshed_token
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_oversized_requests_are_rejected_and_exempt_paths_pass_through():
+    app, calls = build_app()
+    app.max_request_size = 16
+    app.exempt_paths = frozenset({"/items"})
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/items", json={"a": "x" * 32}, headers={"Idempotency-Key": "k1"})
+        assert response.status_code == 200 and "idempotent-replayed" not in response.headers
+        app.exempt_paths = frozenset()
+        response = await client.post("/items", json={"a": "x" * 32}, headers={"Idempotency-Key": "k2"})
+    assert response.status_code == 413
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_covered_paths_are_stored_and_never_with_cookies():
+    """Routes outside the covered prefixes and responses that set cookies are never replayed."""
+    calls = []
+
+    async def login(request):
+        calls.append(await request.json())
+        response = JSONResponse({"access_token": f"t{len(calls)}"})
+        response.set_cookie("session", "secret")
+        return response
+
+    async def token(request):
+        calls.append(await request.json())
+        return JSONResponse({"access_token": f"t{len(calls)}"})
+
+    app = IdempotencyMiddleware(
+        Starlette(routes=[Route("/api/v1/vehicles/login", login, methods=["POST"]),
+                          Route("/api/v1/auth/refresh", token, methods=["POST"])]),
+        InMemoryIdempotencyStore(), ttl=60, path_prefixes=("/api/v1/vehicles",),
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for path in ("/api/v1/auth/refresh", "/api/v1/vehicles/login"):
+            first = await client.post(path, json={"a": 1}, headers={"Idempotency-Key": path})
+            second = await client.post(path, json={"a": 1}, headers={"Idempotency-Key": path})
+            assert first.json() != second.json()
+            assert "idempotent-replayed" not in second.headers
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_route_does_not_see_a_disconnect_after_the_body():
+    """After the buffered body the route waits on the real receive instead of seeing a fake disconnect."""
+    seen = []
+
+    async def create(request):
+        await request.body()
+        seen.append(await request.is_disconnected())
+        return JSONResponse({})
+
+    app = IdempotencyMiddleware(Starlette(routes=[Route("/items", create, methods=["POST"])]),
+                                InMemoryIdempotencyStore(), ttl=60)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    assert seen == [False]
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.application.services.job_runner import JobRunner
+from app.core.database import Base
+from app.domain.models.job_model import Job, JOB_CANCELLED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED
+from app.infrastructure.repositories.job_repository import JobRepositorySQLAlchemy
+
+
+@pytest_asyncio.fixture
+async def sessionmaker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+async def enqueue(sessionmaker, kind: str, params: dict | None = None) -> Job:
+    async with sessionmaker() as session:
+        return await JobRepositorySQLAlchemy(session).create(Job(kind=kind, params=params or {}))
+
+
+async def load(sessionmaker, job_id) -> Job:
+    async with sessionmaker() as session:
+        return await JobRepositorySQLAlchemy(session).get(job_id)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_with_progress_and_result(sessionmaker):
+    async def count(ctx):
+        for i in range(1, 4):
+            await ctx.progress(i, 3)
+        return {"counted": ctx.params["n"]}
+
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, {"count": count})
+    job = await enqueue(sessionmaker, "count", {"n": 3})
+
+    assert (await runner.run_next()).id == job.id
+    assert await runner.run_next() is None
+    done = await load(sessionmaker, job.id)
+    assert done.status == JOB_SUCCEEDED
+    assert (done.progress_current, done.progress_total) == (3, 3)
+    assert done.result == {"counted": 3}
+    assert done.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_and_unknown_jobs_record_error(sessionmaker):
+    async def broken(ctx):
+        raise RuntimeError("boom")
+
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, {"broken": broken})
+    failing = await enqueue(sessionmaker, "broken")
+    unknown = await enqueue(sessionmaker, "missing")
+    await runner.run_next()
+    await runner.run_next()
+
+    assert (await load(sessionmaker, failing.id)).error == "RuntimeError: boom"
+    assert (await load(sessionmaker, unknown.id)).status == JOB_FAILED
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job_stops_at_next_progress(sessionmaker):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    chunks = []
+
+    async def chunked(ctx):
+        for i in range(5):
+            chunks.append(i)
+            started.set()
+            await release.wait()
+            await ctx.progress(i + 1, 5)
+
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, {"chunked": chunked})
+    job = await enqueue(sessionmaker, "chunked")
+    task = asyncio.create_task(runner.run_next())
+    await started.wait()
+    async with sessionmaker() as session:
+        assert (await JobRepositorySQLAlchemy(session).request_cancel(job.id)).cancel_requested
+    release.set()
+    await task
+
+    assert (await load(sessionmaker, job.id)).status == JOB_CANCELLED
+    assert chunks == [0]
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_job_is_immediate(sessionmaker):
+    job = await enqueue(sessionmaker, "anything")
+    async with sessionmaker() as session:
+        assert (await JobRepositorySQLAlchemy(session).request_cancel(job.id)).status == JOB_CANCELLED
+    assert await JobRunner(sessionmaker, JobRepositorySQLAlchemy).run_next() is None
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_picks_up_notified_jobs_and_requeues_on_stop(sessionmaker):
+    never = asyncio.Event()
+    started = asyncio.Event()
+
+    async def quick(ctx):
+        return {"ok": True}
+
+    async def hanging(ctx):
+        started.set()
+        await never.wait()
+
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, {"quick": quick, "hanging": hanging},
+                       concurrency=2, poll_interval=60)
+    await runner.start()
+    quick_job = await enqueue(sessionmaker, "quick")
+    runner.notify()
+    for _ in range(100):
+        if (await load(sessionmaker, quick_job.id)).status == JOB_SUCCEEDED:
+            break
+        await asyncio.sleep(0.01)
+    assert (await load(sessionmaker, quick_job.id)).status == JOB_SUCCEEDED
+
+    hanging_job = await enqueue(sessionmaker, "hanging")
+    runner.notify()
+    await asyncio.wait_for(started.wait(), 5)
+    await runner.stop()
+    requeued = await load(sessionmaker, hanging_job.id)
+    assert requeued.status == JOB_QUEUED and requeued.started_at is None
+
+
+@pytest.mark.asyncio
+async def test_requeue_stale_running_jobs(sessionmaker):
+    job = await enqueue(sessionmaker, "anything")
+    async with sessionmaker() as session:
+        repo = JobRepositorySQLAlchemy(session)
+        assert (await repo.claim_next()).status == JOB_RUNNING
+        assert await repo.requeue_stale(datetime.now(timezone.utc) - timedelta(minutes=1)) == 0
+        assert await repo.requeue_stale(datetime.now(timezone.utc) + timedelta(minutes=1)) == 1
+    assert (await load(sessionmaker, job.id)).status == JOB_QUEUED
+
+
+@pytest.mark.asyncio
+async def test_stale_worker_does_not_overwrite_reclaimed_job(sessionmaker):
+    """A worker whose job was requeued and claimed elsewhere drops its outcome instead of overwriting it."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow(ctx):
+        started.set()
+        await release.wait()
+        return {"run": "stale"}
+
+    runner = JobRunner(sessionmaker, JobRepositorySQLAlchemy, {"slow": slow})
+    job = await enqueue(sessionmaker, "slow")
+    task = asyncio.create_task(runner.run_next())
+    await started.wait()
+
+    async with sessionmaker() as session:
+        repo = JobRepositorySQLAlchemy(session)
+        assert await repo.requeue_stale(datetime.now(timezone.utc) + timedelta(minutes=1)) == 1
+        reclaimed = await repo.claim_next()
+        assert reclaimed.id == job.id
+        assert await repo.update_progress(job.id, reclaimed.started_at, 1, 1) is False
+        assert await repo.finish(job.id, reclaimed.started_at, JOB_SUCCEEDED, {"run": "current"})
+
+    release.set()
+    await task
+    done = await load(sessionmaker, job.id)
+    assert done.status == JOB_SUCCEEDED and done.result == {"run": "current"}
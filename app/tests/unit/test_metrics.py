@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import Counter, Histogram, DB_QUERIES, DB_POOL_WAIT, instrument_engine, statement_type
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    child = histogram.labels("/vehicles")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        child.observe(value)
+
+    lines = histogram.render()
+    assert 'test_latency_seconds_bucket{route="/vehicles",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/vehicles",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{route="/vehicles",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{route="/vehicles"} 4' in lines
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_total", "Test", ("path",))
+    counter.labels('a"b').inc()
+    assert 'test_total{path="a\\"b"} 1.0' in counter.render()
+
+
+def test_statement_type():
+    assert statement_type("  select 1") == "SELECT"
+    assert statement_type("INSERT INTO vehicles VALUES (1)") == "INSERT"
+    assert statement_type("PRAGMA foreign_keys") == "OTHER"
+
+
+@pytest.mark.asyncio
+async def test_instrument_engine_counts_queries_and_pool_waits():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine.sync_engine)
+    instrument_engine(engine.sync_engine)  # idempotente
+
+    selects_before = DB_QUERIES.labels("SELECT").value
+    waits_before = DB_POOL_WAIT.labels().counts[:]
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+    await engine.dispose()
+
+    assert DB_QUERIES.labels("SELECT").value == selects_before + 2
+    assert sum(DB_POOL_WAIT.labels().counts) == sum(waits_before) + 1
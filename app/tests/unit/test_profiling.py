@@ -0,0 +1,60 @@
+import asyncio
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.presentation.middleware.profiling import ProfilingMiddleware, PROFILE_SUFFIX
+
+TOKEN = "profiling-token-for-tests"
+
+
+async def fake_db_query():
+    await asyncio.sleep(0.05)
+
+
+async def handler(request):
+    await fake_db_query()
+    return PlainTextResponse("ok")
+
+
+def build_app(directory, **kwargs):
+    app = Starlette(routes=[Route("/vehicles", handler)])
+    return ProfilingMiddleware(app, directory=str(directory), token=TOKEN, interval=0.002, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_profile_written_when_header_matches(tmp_path):
+    """Awaited time (e.g. the DB) shows up in the collapsed stacks."""
+    transport = ASGITransport(app=build_app(tmp_path))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/vehicles", headers={"X-Profile": TOKEN})
+    assert response.status_code == 200
+
+    files = [f for f in os.listdir(tmp_path) if f.endswith(PROFILE_SUFFIX)]
+    assert len(files) == 1
+    content = (tmp_path / files[0]).read_text()
+    assert "fake_db_query" in content
+    assert "[await " in content
+    stack, count = content.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_no_profile_without_token_or_sampling(tmp_path):
+    transport = ASGITransport(app=build_app(tmp_path))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/vehicles", headers={"X-Profile": "wrong-token"})
+        await client.get("/vehicles")
+    assert not tmp_path.exists() or os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_sampling_one_in_n(tmp_path):
+    transport = ASGITransport(app=build_app(tmp_path, sample_every=2))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(4):
+            await client.get("/vehicles")
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,68 @@
+import logging
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.query_tracking import (
+    QueryBudgetExceeded, allow_repeated_queries, check_budget, install_query_tracking,
+    redact_parameters, statement_shape, track_queries,
+)
+
+
+def test_statement_shape_collapses_in_lists():
+    a = statement_shape("SELECT * FROM vehicles WHERE id IN (?, ?, ?)")
+    b = statement_shape("SELECT *\n  FROM vehicles WHERE id IN (?, ?)")
+    assert a == b
+
+
+def test_redact_parameters_hides_values():
+    redacted = redact_parameters(("secret@example.com", 42))
+    assert "secret" not in redacted
+    assert redacted == "[<str>, <int>]"
+    assert redact_parameters({"password": "hunter2"}) == "{password: <str>}"
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_detected():
+    """The same statement shape twice in one block is reported as a possible N+1."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_tracking(engine.sync_engine, slow_threshold_ms=0)
+    async with engine.connect() as conn:
+        with track_queries("test") as tracker:
+            await conn.execute(text("SELECT :x"), {"x": 1})
+            await conn.execute(text("SELECT :x"), {"x": 2})
+    await engine.dispose()
+
+    assert tracker.count == 2
+    with pytest.raises(QueryBudgetExceeded, match="2x same statement"):
+        check_budget(tracker, count_limit=10, repeat_limit=1, mode="raise")
+
+
+@pytest.mark.asyncio
+async def test_allow_repeated_queries_and_count_limit(caplog):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_tracking(engine.sync_engine, slow_threshold_ms=0)
+    async with engine.connect() as conn:
+        with track_queries("chunks") as tracker:
+            with allow_repeated_queries():
+                for i in range(3):
+                    await conn.execute(text("SELECT :x"), {"x": i})
+    await engine.dispose()
+
+    check_budget(tracker, count_limit=10, repeat_limit=1, mode="raise")
+    with caplog.at_level(logging.WARNING, logger="app.queries"):
+        check_budget(tracker, count_limit=2, repeat_limit=1, mode="warn")
+    assert "3 queries (limit 2)" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_with_redacted_params(caplog):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    install_query_tracking(engine.sync_engine, slow_threshold_ms=0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.queries"):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT :email"), {"email": "alice@example.com"})
+    await engine.dispose()
+
+    assert "Slow query" in caplog.text
+    assert "alice@example.com" not in caplog.text
@@ -0,0 +1,60 @@
+import pytest
+
+from app.core.rate_limit import InMemoryRateLimitBackend, LoginRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_blocks_then_recovers():
+    """Attempts over the limit are rejected until the window slides past them."""
+    clock = FakeClock(1200.0)  # inicio exacto de una ventana de 60 s
+    backend = InMemoryRateLimitBackend(clock=clock)
+
+    for _ in range(3):
+        assert (await backend.hit("k", limit=3, window=60))[0]
+    allowed, retry_after = await backend.hit("k", limit=3, window=60)
+    assert not allowed
+    assert 0 < retry_after <= 60
+
+    # Justo al cambiar de ventana el contador previo todavía pesa casi completo
+    clock.now += 60
+    assert not (await backend.hit("k", limit=3, window=60))[0]
+
+    clock.now += 120
+    assert (await backend.hit("k", limit=3, window=60))[0]
+
+
+@pytest.mark.asyncio
+async def test_memory_is_bounded():
+    """Each shard purges expired keys and evicts the oldest ones past its quota."""
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(shards=4, max_keys=40, clock=clock)
+
+    for i in range(500):
+        await backend.hit(f"key-{i}", limit=5, window=60)
+        clock.now += 1
+    assert len(backend) <= 40
+
+
+@pytest.mark.asyncio
+async def test_login_limiter_reports_scope():
+    """The username limit applies across IPs and the IP limit across usernames."""
+    limiter = LoginRateLimiter(InMemoryRateLimitBackend(clock=FakeClock()), per_username=2, per_ip=3, window=60)
+
+    assert await limiter.check("alice", "10.0.0.1") is None
+    assert await limiter.check("Alice", "10.0.0.2") is None
+    scope, _ = await limiter.check("alice", "10.0.0.3")
+    assert scope == "username"
+
+    assert await limiter.check("bob", "10.0.0.9") is None
+    assert await limiter.check("carol", "10.0.0.9") is None
+    assert await limiter.check("dave", "10.0.0.9") is None
+    scope, _ = await limiter.check("erin", "10.0.0.9")
+    assert scope == "ip"
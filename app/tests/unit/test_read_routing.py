@@ -0,0 +1,70 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core import database
+from app.core.database import STICKY_COOKIE, ReadYourWrites, get_read_db
+from app.presentation.middleware.read_your_writes import ReadYourWritesMiddleware
+
+
+class FakeSessionmaker:
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return "replica"
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_request(headers: dict | None = None, client=("10.0.0.1", 1234)) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "client": client})
+
+
+async def resolve(request: Request) -> str:
+    generator = get_read_db(request, primary="primary")
+    session = await generator.__anext__()
+    await generator.aclose()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_read_db_falls_back_to_primary_without_replica(monkeypatch):
+    monkeypatch.setattr(database, "get_read_sessionmaker", lambda: None)
+    assert await resolve(make_request()) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_db_routes_to_replica_unless_client_wrote_recently(monkeypatch):
+    """Recent writers stick to the primary, by process memory or by cookie."""
+    tracker = ReadYourWrites(window=5)
+    monkeypatch.setattr(database, "get_read_sessionmaker", FakeSessionmaker)
+    monkeypatch.setattr(database, "read_your_writes", tracker)
+
+    assert await resolve(make_request()) == "replica"
+
+    tracker.record(database.client_key({}, "10.0.0.1"))
+    assert await resolve(make_request()) == "primary"
+    assert await resolve(make_request(client=("10.0.0.2", 1))) == "replica"
+
+    until = ReadYourWrites(window=5).record("other-worker")
+    cookie = {"Cookie": f"{STICKY_COOKIE}={until}"}
+    assert await resolve(make_request(cookie, client=("10.0.0.3", 1))) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_middleware_marks_successful_writes_only():
+    async def endpoint(request):
+        return PlainTextResponse("ok", status_code=int(request.query_params.get("status", 200)))
+
+    tracker = ReadYourWrites(window=5)
+    app = ReadYourWritesMiddleware(Starlette(routes=[Route("/", endpoint, methods=["GET", "POST"])]), tracker)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert STICKY_COOKIE not in (await client.get("/")).headers.get("set-cookie", "")
+        assert STICKY_COOKIE not in (await client.post("/?status=422")).headers.get("set-cookie", "")
+        assert STICKY_COOKIE in (await client.post("/")).headers["set-cookie"]
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from app.core.response_cache import COALESCED, HIT, MISS, STALE, ResponseCache, normalized_key
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalized_key_sorts_used_query_params_and_drops_the_rest():
+    used = {"a", "b"}
+    assert normalized_key("/v", "b=2&a=1", used) == normalized_key("/v", "a=1&b=2&x=9", used) == "/v?a=1&b=2"
+    assert normalized_key("/v", "x=1") == normalized_key("/v", "") == "/v"
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_without_recompute():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=2, stale_ttl=10, clock=clock)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return b"v1"
+
+    assert await cache.get_or_compute("k", compute) == (b"v1", MISS)
+    clock.now = 1.9
+    assert await cache.get_or_compute("k", compute) == (b"v1", HIT)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_recompute():
+    cache = ResponseCache(ttl=2)
+    release = asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return b"body"
+
+    tasks = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == [COALESCED] * 4 + [MISS]
+    assert all(body == b"body" for body, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_one_request_revalidates():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=2, stale_ttl=10, clock=clock)
+    await cache.get_or_compute("k", lambda: asyncio.sleep(0, b"old"))
+    clock.now = 5
+    release = asyncio.Event()
+
+    async def slow_compute():
+        await release.wait()
+        return b"new"
+
+    leader = asyncio.create_task(cache.get_or_compute("k", slow_compute))
+    await asyncio.sleep(0)
+    assert await cache.get_or_compute("k", slow_compute) == (b"old", STALE)
+    release.set()
+    assert await leader == (b"new", MISS)
+    assert await cache.get_or_compute("k", slow_compute) == (b"new", HIT)
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_waiters_and_are_not_cached():
+    cache = ResponseCache(ttl=2)
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    tasks = [asyncio.create_task(cache.get_or_compute("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(cache) == 0
+    assert await cache.get_or_compute("k", lambda: asyncio.sleep(0, b"ok")) == (b"ok", MISS)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over_to_a_waiter():
+    cache = ResponseCache(ttl=2)
+    never = asyncio.Event()
+
+    async def hanging():
+        await never.wait()
+        return b"unused"
+
+    leader = asyncio.create_task(cache.get_or_compute("k", hanging))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_compute("k", lambda: asyncio.sleep(0, b"fresh")))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await waiter == (b"fresh", MISS)
+
+
+@pytest.mark.asyncio
+async def test_max_entries_evicts_least_recently_stored():
+    cache = ResponseCache(ttl=60, max_entries=2)
+    for key in ("a", "b", "c"):
+        await cache.get_or_compute(key, lambda: asyncio.sleep(0, key.encode()))
+    assert len(cache) == 2
+    assert (await cache.get_or_compute("a", lambda: asyncio.sleep(0, b"a2")))[1] == MISS
@@ -0,0 +1,36 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+from app.domain.models.vehicle_model import Vehicle
+from app.domain.schemas.vehicle_schema import VehicleResponse
+from app.presentation.responses import vehicles_response, vehicle_response
+
+
+def make_vehicle(**overrides) -> Vehicle:
+    data = {
+        "id": uuid.uuid4(),
+        "brand": "Toyota",
+        "arrival_location": "Bogotá",
+        "applicant": "Juan Pérez",
+        "created_at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        "updated_at": None,
+    }
+    data.update(overrides)
+    return Vehicle(**data)
+
+
+def test_fast_path_matches_pydantic_output():
+    """The fast serializer produces the same JSON document as VehicleResponse."""
+    vehicles = [make_vehicle(), make_vehicle(brand="Mazda", updated_at=datetime(2024, 5, 2))]
+
+    fast = json.loads(vehicles_response(vehicles).body)
+    slow = [json.loads(VehicleResponse.model_validate(v).model_dump_json()) for v in vehicles]
+
+    assert fast == slow
+
+
+def test_single_vehicle_response_status_code():
+    response = vehicle_response(make_vehicle(), status_code=201)
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
@@ -0,0 +1,76 @@
+from app import server
+from app.core.config import settings
+
+
+def write_cgroup(tmp_path, **files):
+    for name, content in files.items():
+        path = tmp_path.joinpath(*name.split("__"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return str(tmp_path)
+
+
+def test_auto_workers_one_per_cpu_capped_by_memory_and_maximum():
+    assert server.auto_workers(cpus=4, memory_mb=None, worker_memory_mb=256, max_workers=8) == 4
+    assert server.auto_workers(cpus=4, memory_mb=512, worker_memory_mb=256, max_workers=8) == 2
+    assert server.auto_workers(cpus=16, memory_mb=None, worker_memory_mb=256, max_workers=8) == 8
+    # Always at least one worker, even when memory looks too small
+    assert server.auto_workers(cpus=2, memory_mb=100, worker_memory_mb=256, max_workers=8) == 1
+
+
+def test_cgroup_v2_limits(tmp_path):
+    root = write_cgroup(tmp_path, **{"cpu.max": "200000 100000\n", "memory.max": str(1024 * 1024 * 1024)})
+    assert server.cgroup_cpu_limit(root) == 2.0
+    assert server.cgroup_memory_limit_mb(root) == 1024
+
+
+def test_cgroup_v2_unlimited(tmp_path):
+    root = write_cgroup(tmp_path, **{"cpu.max": "max 100000\n", "memory.max": "max\n"})
+    assert server.cgroup_cpu_limit(root) is None
+    assert server.cgroup_memory_limit_mb(root) is None
+
+
+def test_cgroup_v1_limits(tmp_path):
+    root = write_cgroup(tmp_path, **{
+        "cpu__cpu.cfs_quota_us": "150000",
+        "cpu__cpu.cfs_period_us": "100000",
+        "memory__memory.limit_in_bytes": str(9223372036854771712),
+    })
+    assert server.cgroup_cpu_limit(root) == 1.5
+    assert server.cgroup_memory_limit_mb(root) is None
+
+
+def test_server_options_use_settings(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "SERVER_KEEPALIVE_SECONDS", 75)
+    options = server.server_options()
+    assert options["workers"] == 3
+    assert options["timeout_keep_alive"] == 75
+    assert options["backlog"] == settings.SERVER_BACKLOG
+    assert options["timeout_graceful_shutdown"] == settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] == settings.FORWARDED_ALLOW_IPS
+
+
+def test_auto_sizing_needs_shared_state(monkeypatch):
+    """Without shared rate-limit and idempotency backends, or with /ws fan-out on, the auto-sized server runs one worker."""
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(server, "available_cpus", lambda: 4)
+    monkeypatch.setattr(server, "available_memory_mb", lambda: None)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_STORAGE_URL", None)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "database")
+    monkeypatch.setattr(settings, "WS_BROADCAST_ENABLED", False)
+    assert server.server_options()["workers"] == 1
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_STORAGE_URL", "redis://cache:6379/0")
+    assert server.server_options()["workers"] == min(4, settings.WEB_MAX_WORKERS)
+
+    monkeypatch.setattr(settings, "WS_BROADCAST_ENABLED", True)
+    assert server.server_options()["workers"] == 1
+    monkeypatch.setattr(settings, "WS_BROADCAST_ENABLED", False)
+
+    monkeypatch.setattr(settings, "IDEMPOTENCY_BACKEND", "memory")
+    assert server.server_options()["workers"] == 1
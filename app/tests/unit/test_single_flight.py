@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return "row"
+
+    tasks = [asyncio.create_task(flight.do("k", fetch)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    assert len(calls) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert all(result == "row" for result, _ in results)
+    assert flight.coalesced == 9
+    assert not flight.in_flight("k")
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("boom")
+
+    tasks = [asyncio.create_task(flight.do("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await flight.do("k", lambda: asyncio.sleep(0, "ok")) == ("ok", False)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_waiters():
+    flight = SingleFlight("test")
+    never = asyncio.Event()
+
+    async def hanging():
+        await never.wait()
+
+    leader = asyncio.create_task(flight.do("k", hanging))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("k", lambda: asyncio.sleep(0, "retried")))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await waiter == ("retried", False)
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_leader_running():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "row"
+
+    leader = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    assert await leader == ("row", False)
+
+
+@pytest.mark.asyncio
+async def test_forget_starts_a_new_execution():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return len(calls)
+
+    first = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    flight.forget("k")
+    second = asyncio.create_task(flight.do("k", fetch))
+    await asyncio.sleep(0)
+    release.set()
+    assert (await first)[1] is False and (await second)[1] is False
+    assert len(calls) == 2
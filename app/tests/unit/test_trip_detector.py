@@ -0,0 +1,79 @@
+import json
+
+from app.application.services.trip_detector import MOVING, STOPPED, TripDetector, haversine_m
+
+T0 = 1_700_000_000
+
+
+def route():
+    """Parked 10 min, drives ~2.2 km east in 4 min, parks 10 min, drives again."""
+    points = [(T0 + i * 60, 4.60, -74.10, 0.0) for i in range(11)]
+    points += [(T0 + 600 + i * 60, 4.60, -74.10 + 0.005 * i, 40.0) for i in range(1, 5)]
+    points += [(T0 + 840 + i * 60, 4.60, -74.08, 0.0) for i in range(1, 11)]
+    points += [(T0 + 1440 + i * 60, 4.60, -74.08 + 0.005 * i, 40.0) for i in range(1, 3)]
+    return [{"timestamp": t, "lat": lat, "lon": lon, "speed": speed} for t, lat, lon, speed in points]
+
+
+def test_detects_stops_and_trips():
+    state, trips, stops = TripDetector(dwell_seconds=180).feed(None, route())
+
+    # Cada parada empieza en el primer reporte quieto y termina en el último
+    assert [(s["started_at"].timestamp(), s["duration_seconds"]) for s in stops] == [(T0, 600), (T0 + 900, 540)]
+    assert len(trips) == 1
+    trip = trips[0]
+    assert (trip["started_at"].timestamp(), trip["ended_at"].timestamp()) == (T0 + 600, T0 + 900)
+    assert abs(trip["distance_m"] - haversine_m(4.60, -74.10, 4.60, -74.08)) < 1
+    assert state["mode"] == MOVING and state["start"][0] == T0 + 1440
+
+
+def test_resuming_from_checkpoint_matches_single_pass():
+    detector = TripDetector(dwell_seconds=180)
+    points = route()
+    expected = detector.feed(None, points)
+
+    state, trips, stops = None, [], []
+    for start in range(0, len(points), 7):
+        # El checkpoint pasa por JSON como en la tabla trip_checkpoints
+        state = json.loads(json.dumps(state))
+        state, closed_trips, closed_stops = detector.feed(state, points[start:start + 7])
+        trips += closed_trips
+        stops += closed_stops
+    assert (state, trips, stops) == expected
+
+    # Reenviar un lote ya procesado no genera nada nuevo
+    assert detector.feed(state, points[-7:]) == (state, [], [])
+
+
+def test_gap_closes_trip_and_short_trips_are_dropped():
+    detector = TripDetector(dwell_seconds=180, min_trip_meters=100, max_gap_seconds=600)
+    points = [
+        {"timestamp": T0, "lat": 4.60, "lon": -74.10, "speed": 30.0},
+        {"timestamp": T0 + 30, "lat": 4.60, "lon": -74.09, "speed": 30.0},
+        {"timestamp": T0 + 3600, "lat": 4.60, "lon": -74.09, "speed": 0.0},
+        {"timestamp": T0 + 3630, "lat": 4.60, "lon": -74.0899, "speed": 20.0},
+        {"timestamp": T0 + 3660, "lat": 4.60, "lon": -74.0898, "speed": 0.0},
+        {"timestamp": T0 + 3900, "lat": 4.60, "lon": -74.0898, "speed": 0.0},
+    ]
+    state, trips, stops = detector.feed(None, points)
+
+    assert [t["ended_at"].timestamp() for t in trips] == [T0 + 30]
+    assert [(s["started_at"].timestamp(), s["ended_at"].timestamp()) for s in stops] == [(T0 + 30, T0 + 3600)]
+    assert state["mode"] == STOPPED
+
+
+def test_moving_point_after_gap_starts_a_new_trip_there():
+    """A gap ends the stop (or trip) where reporting stopped; the next trip starts at the first point after it."""
+    detector = TripDetector(dwell_seconds=60, min_trip_meters=100, max_gap_seconds=600)
+    parked = [{"timestamp": T0 + i * 60, "lat": 4.60, "lon": -74.10, "speed": 0.0} for i in range(3)]
+    morning = [{"timestamp": T0 + 43_200 + i * 60, "lat": 4.70, "lon": -74.50 + 0.005 * i, "speed": 40.0}
+               for i in range(4)]
+    later = [{"timestamp": T0 + 90_000 + i * 60, "lat": 5.00, "lon": -74.50 + 0.005 * i, "speed": 40.0}
+             for i in range(2)]
+    state, trips, stops = detector.feed(None, parked + morning + later)
+
+    assert [(s["started_at"].timestamp(), s["ended_at"].timestamp()) for s in stops] == [(T0, T0 + 120)]
+    assert len(trips) == 1
+    trip = trips[0]
+    assert (trip["started_at"].timestamp(), trip["ended_at"].timestamp()) == (T0 + 43_200, T0 + 43_380)
+    assert abs(trip["distance_m"] - haversine_m(4.70, -74.50, 4.70, -74.485)) < 1
+    assert state["mode"] == MOVING and state["start"][0] == T0 + 90_000 and state["distance"] < 1000
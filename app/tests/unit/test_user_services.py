@@ -7,6 +7,7 @@ from datetime import datetime
 from app.application.services.user_service import UserService
 from app.domain.schemas.user_schema import UserCreate
 from app.application.exceptions import AuthenticationError, ConflictError
+from app.core.security import decode_token
 from app.domain.models.user_model import User
 
 
@@ -14,6 +15,7 @@ class MockUserRepository:
     def __init__(self):
         self._users = {}
         self._users_by_email = {}
+        self._refresh_tokens = {}
 
     async def get_by_username(self, username: str):
         return self._users.get(username)
@@ -36,6 +38,31 @@ class MockUserRepository:
         self._users_by_email[user.email] = user
         return user
 
+    async def increment_token_version(self, user_id: str):
+        user = await self.get_by_id(user_id)
+        if not user:
+            return None
+        user.token_version = (user.token_version or 0) + 1
+        return user.token_version
+
+    async def add_refresh_token(self, jti, user_id, family_id, expires_at):
+        self._refresh_tokens[jti] = SimpleNamespace(jti=jti, family_id=family_id, used_at=None, revoked_at=None)
+
+    async def consume_refresh_token(self, jti):
+        token = self._refresh_tokens.get(jti)
+        if token is None or token.used_at or token.revoked_at:
+            return False
+        token.used_at = datetime.utcnow()
+        return True
+
+    async def get_refresh_token(self, jti):
+        return self._refresh_tokens.get(jti)
+
+    async def revoke_refresh_family(self, family_id):
+        for token in self._refresh_tokens.values():
+            if token.family_id == family_id:
+                token.revoked_at = datetime.utcnow()
+
 
 @pytest.mark.asyncio
 async def test_register_user_success():
@@ -122,9 +149,10 @@ async def test_authenticate_user_success():
     await service.register_user(user_data)
 
     # Authenticate with correct credentials
-    token = await service.authenticate_user("alice", "correctpassword")
-    assert isinstance(token, str)
-    assert len(token) > 0
+    tokens = await service.authenticate_user("alice", "correctpassword")
+    assert isinstance(tokens["access_token"], str)
+    assert isinstance(tokens["refresh_token"], str)
+    assert tokens["token_type"] == "bearer"
 
 
 @pytest.mark.asyncio
@@ -155,3 +183,56 @@ async def test_authenticate_user_not_found():
     # Try to authenticate non-existent user
     with pytest.raises(AuthenticationError, match="Invalid credentials"):
         await service.authenticate_user("nonexistent", "anypassword")
+
+
+@pytest.mark.asyncio
+async def test_access_token_carries_claims():
+    """Access tokens carry user id, username and token version."""
+    repo = MockUserRepository()
+    service = UserService(repo)
+    user = await service.register_user(UserCreate(username="alice", email="alice@example.com", password="correctpassword"))
+
+    tokens = await service.authenticate_user("alice", "correctpassword")
+    payload = decode_token(tokens["access_token"], expected_type="access")
+    assert payload["sub"] == str(user.id)
+    assert payload["username"] == "alice"
+    assert payload["ver"] == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_and_revocation_invalidates():
+    """Refresh issues a new pair; revoking bumps the version and rejects old refresh tokens."""
+    repo = MockUserRepository()
+    service = UserService(repo)
+    user = await service.register_user(UserCreate(username="alice", email="alice@example.com", password="correctpassword"))
+    tokens = await service.authenticate_user("alice", "correctpassword")
+
+    refreshed = await service.refresh_tokens(tokens["refresh_token"])
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    # Un access token no sirve como refresh token
+    with pytest.raises(AuthenticationError):
+        await service.refresh_tokens(tokens["access_token"])
+
+    await service.revoke_tokens(str(user.id))
+    with pytest.raises(AuthenticationError, match="revoked"):
+        await service.refresh_tokens(refreshed["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_reuse_revokes_family():
+    """A refresh token is single-use; presenting it again revokes its whole rotation family."""
+    repo = MockUserRepository()
+    service = UserService(repo)
+    await service.register_user(UserCreate(username="alice", email="alice@example.com", password="correctpassword"))
+    tokens = await service.authenticate_user("alice", "correctpassword")
+    other_device = await service.authenticate_user("alice", "correctpassword")
+
+    rotated = await service.refresh_tokens(tokens["refresh_token"])
+    with pytest.raises(AuthenticationError, match="reuse"):
+        await service.refresh_tokens(tokens["refresh_token"])
+    with pytest.raises(AuthenticationError, match="revoked"):
+        await service.refresh_tokens(rotated["refresh_token"])
+
+    # Otra familia (otro login) no se ve afectada
+    assert (await service.refresh_tokens(other_device["refresh_token"]))["access_token"]
@@ -0,0 +1,78 @@
+import pytest
+
+from app.application.exceptions import ValidationError
+from app.application.services.vehicle_import import CsvRecordSplitter, read_csv_rows, validate_batch
+from app.application.services.vehicle_service import VehicleService
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class InsertOnlyRepository:
+    def __init__(self):
+        self.batches = []
+
+    async def bulk_insert(self, rows):
+        self.batches.append(list(rows))
+        return len(rows)
+
+
+def test_splitter_keeps_quoted_newlines_inside_record():
+    splitter = CsvRecordSplitter()
+    assert splitter.feed('a,"multi\nli') == []
+    assert splitter.feed('ne",c\nnext,row') == ['a,"multi\nline",c\n']
+    assert splitter.close() == ["next,row"]
+
+
+def test_splitter_rejects_unterminated_quote():
+    splitter = CsvRecordSplitter(max_record_chars=10)
+    with pytest.raises(ValidationError):
+        splitter.feed('"never closed\nand more lines\n')
+
+
+@pytest.mark.asyncio
+async def test_read_csv_rows_across_tiny_chunks():
+    data = '﻿brand,arrival_location,applicant\r\nToyota,"Bogotá, D.C.",Juan\n"Mazda\n2",Cali,Ana\n'.encode()
+    rows = [item async for item in read_csv_rows(chunked(data, 3))]
+    assert rows == [
+        (1, ["brand", "arrival_location", "applicant"]),
+        (2, ["Toyota", "Bogotá, D.C.", "Juan"]),
+        (3, ["Mazda\n2", "Cali", "Ana"]),
+    ]
+
+
+def test_validate_batch_reports_only_invalid_rows():
+    valid, rejected = validate_batch([
+        (2, {"brand": "Toyota", "arrival_location": "Bogotá", "applicant": "Juan"}),
+        (3, {"brand": "  ", "arrival_location": "Cali", "applicant": "Ana"}),
+        (4, {"brand": "Ford", "arrival_location": "Pasto"}),
+    ])
+    assert [v.brand for v in valid] == ["Toyota"]
+    assert [line for line, _ in rejected] == [3, 4]
+    assert rejected[0][1].startswith("brand:")
+
+
+@pytest.mark.asyncio
+async def test_import_in_batches_with_rejections():
+    lines = ["brand,arrival_location,applicant,notes"]
+    lines += [f"Brand {i},Loc {i},Person {i},x" for i in range(7)]
+    lines += [",Loc,Nobody,x", "only,two", ""]
+    repo = InsertOnlyRepository()
+
+    summary = await VehicleService(repo).import_vehicles_csv(chunked("\n".join(lines).encode(), 16), batch_size=3)
+
+    assert summary["inserted"] == 7
+    assert summary["rejected"] == 2
+    assert sorted(e["line"] for e in summary["errors"]) == [9, 10]
+    assert [len(b) for b in repo.batches] == [3, 3, 1]
+    assert set(repo.batches[0][0]) == {"brand", "arrival_location", "applicant"}
+
+
+@pytest.mark.asyncio
+async def test_import_requires_header_columns():
+    with pytest.raises(ValidationError):
+        await VehicleService(InsertOnlyRepository()).import_vehicles_csv(chunked(b"brand,applicant\nA,B\n", 64))
+    with pytest.raises(ValidationError):
+        await VehicleService(InsertOnlyRepository()).import_vehicles_csv(chunked(b"", 64))
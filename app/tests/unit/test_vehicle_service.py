@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import Mock, AsyncMock
 from uuid import UUID
@@ -7,6 +8,7 @@ from app.application.services.vehicle_service import VehicleService
 from app.domain.schemas.vehicle_schema import VehicleCreate
 from app.application.exceptions import NotFoundError
 from app.domain.models.vehicle_model import Vehicle
+from app.core.single_flight import SingleFlight
 
 
 class MockVehicleRepository:
@@ -18,6 +20,17 @@ class MockVehicleRepository:
         vehicles = list(self._vehicles.values())
         return vehicles[offset:offset + limit]
 
+    async def list_records(self, limit: int = 10, offset: int = 0):
+        return await self.list(limit=limit, offset=offset)
+
+    async def get_record(self, vehicle_id: str):
+        return await self.get_by_id(vehicle_id)
+
+    async def get_many(self, vehicle_ids):
+        self.get_many_calls = getattr(self, "get_many_calls", 0) + 1
+        wanted = {str(i) for i in vehicle_ids}
+        return [v for k, v in self._vehicles.items() if k in wanted]
+
     async def create(self, vehicle: Vehicle):
         # Simular creación con ID
         vehicle.id = f"550e8400-e29b-41d4-a716-44665544000{self._counter}"
@@ -199,3 +212,79 @@ async def test_delete_vehicle_not_found():
 
     with pytest.raises(NotFoundError, match="Vehicle not found"):
         await service.delete_vehicle("550e8400-e29b-41d4-a716-446655440999")
+
+
+@pytest.mark.asyncio
+async def test_get_vehicles_keeps_request_order_and_reports_missing():
+    """Batch get returns found vehicles in request order and lists missing/invalid ids."""
+    repo = MockVehicleRepository()
+    service = VehicleService(repo)
+    first = await service.create_vehicle(VehicleCreate(brand="Toyota", arrival_location="Bogotá", applicant="A"))
+    second = await service.create_vehicle(VehicleCreate(brand="Mazda", arrival_location="Cali", applicant="B"))
+    absent = "550e8400-e29b-41d4-a716-446655449999"
+
+    records, missing = await service.get_vehicles([second.id, absent, first.id, "not-a-uuid", second.id])
+
+    assert [r.id for r in records] == [second.id, first.id]
+    assert missing == [absent, "not-a-uuid"]
+    assert repo.get_many_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_aggregates_are_read_from_the_shared_counts():
+    """Aggregates come from the repository's summary counts; reconcile rebuilds them."""
+    from app.application.services.vehicle_aggregates import VehicleAggregates
+
+    repo = MockVehicleRepository()
+    rebuilds = []
+
+    async def aggregate_counts():
+        return {
+            "brand": {"Toyota": 2, "Mazda": 1},
+            "arrival_location": {"Bogotá": 3},
+            "created_day": {"2024-01-02": 1, "2024-01-01": 2},
+        }
+
+    async def rebuild_aggregate_counts():
+        rebuilds.append(1)
+        return 0
+
+    repo.aggregate_counts = aggregate_counts
+    repo.rebuild_aggregate_counts = rebuild_aggregate_counts
+    service = VehicleService(repo, VehicleAggregates())
+
+    aggregates = await service.get_aggregates()
+    assert aggregates["total"] == 3
+    assert aggregates["by_brand"] == {"Toyota": 2, "Mazda": 1}
+    assert list(aggregates["by_created_day"]) == ["2024-01-01", "2024-01-02"]
+    assert aggregates["reconciled_at"] is None and rebuilds == []
+
+    await service.aggregates.reconcile(repo)
+    assert rebuilds == [1]
+    assert (await service.get_aggregates())["reconciled_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_vehicle_coalesced():
+    """Concurrent reads of the same vehicle share one repository call."""
+    repo = MockVehicleRepository()
+    created = await VehicleService(repo).create_vehicle(
+        VehicleCreate(brand="Toyota", arrival_location="Bogotá", applicant="Juan"))
+    release = asyncio.Event()
+    calls = []
+
+    async def slow_get_record(vehicle_id):
+        calls.append(vehicle_id)
+        await release.wait()
+        return await repo.get_by_id(vehicle_id)
+
+    repo.get_record = slow_get_record
+    reads = SingleFlight("test_vehicle_reads")
+    tasks = [asyncio.create_task(VehicleService(repo, reads=reads).get_vehicle(created.id)) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert reads.coalesced == 19
+    assert all(r is results[0] for r in results)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import pytest
+from uuid import uuid4
+
+from app.websocket.codec import BinaryDecoder, PositionEncoder, FRAME_KEY, FRAME_DELTA, encode_ack, decode_ack
+from app.websocket.manager import ConnectionManager
+
+
+def make_position(vehicle_id, step: int) -> dict:
+    return {
+        "vehicle_id": vehicle_id,
+        "lat": 4.6097 + step * 0.0001,
+        "lon": -74.0817 - step * 0.0002,
+        "speed": 42.5,
+        "heading": 90.0 + step,
+        "timestamp": 1_700_000_000 + step * 5,
+    }
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+
+class StuckWebSocket(FakeWebSocket):
+    closed_with = None
+
+    async def send_text(self, data: str):
+        await asyncio.Event().wait()
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        self.closed_with = code
+
+
+def test_first_frame_is_keyframe_then_deltas_after_ack():
+    """Deltas are only emitted against a state the client acknowledged."""
+    encoder = PositionEncoder(keyframe_interval=10)
+    decoder = BinaryDecoder()
+    vehicle_id = str(uuid4())
+
+    first = encoder.encode(make_position(vehicle_id, 0))
+    assert first[0] == FRAME_KEY
+    decoder.feed(first)
+
+    # Sin ack todavía: otro keyframe
+    assert encoder.encode(make_position(vehicle_id, 1))[0] == FRAME_KEY
+
+    encoder.ack(decoder.last_seq)
+    frame = encoder.encode(make_position(vehicle_id, 2))
+    assert frame[0] == FRAME_DELTA
+    assert len(frame) < len(first)
+
+    decoded = decoder.feed(frame)
+    assert decoded["vehicle_id"] == vehicle_id
+    assert decoded["lat"] == pytest.approx(4.6097 + 0.0002)
+    assert decoded["lon"] == pytest.approx(-74.0817 - 0.0004)
+    assert decoded["heading"] == pytest.approx(92.0)
+    assert decoded["timestamp"] == 1_700_000_010
+
+
+def test_periodic_keyframes():
+    """A keyframe is forced every `keyframe_interval` frames per vehicle."""
+    encoder = PositionEncoder(keyframe_interval=3)
+    decoder = BinaryDecoder()
+    vehicle_id = str(uuid4())
+    kinds = []
+    for step in range(8):
+        frame = encoder.encode(make_position(vehicle_id, step))
+        decoder.feed(frame)
+        encoder.ack(decoder.last_seq)
+        kinds.append(frame[0])
+
+    assert kinds == [FRAME_KEY, FRAME_DELTA, FRAME_DELTA, FRAME_DELTA, FRAME_KEY, FRAME_DELTA, FRAME_DELTA, FRAME_DELTA]
+
+
+def test_least_recent_alias_is_reused_with_a_keyframe():
+    """Past `max_aliases` vehicles, a new one takes the LRU alias and starts from a keyframe."""
+    encoder = PositionEncoder(keyframe_interval=10, max_aliases=2)
+    decoder = BinaryDecoder()
+    first, second, third = (str(uuid4()) for _ in range(3))
+    for vehicle_id in (first, second):
+        decoder.feed(encoder.encode(make_position(vehicle_id, 0)))
+    encoder.ack(decoder.last_seq)
+    decoder.feed(encoder.encode(make_position(second, 1)))
+    late_ack = decoder.last_seq
+    decoder.feed(encoder.encode(make_position(first, 1)))
+
+    reused = encoder.encode(make_position(third, 2))
+    assert reused[0] == FRAME_KEY
+    assert encoder.aliases == {first: 0, third: 1}
+    assert decoder.feed(reused)["vehicle_id"] == third
+
+    # Un ack tardío del vehículo desalojado no sirve de base para el nuevo
+    encoder.ack(late_ack)
+    frame = encoder.encode(make_position(third, 3))
+    assert frame[0] == FRAME_KEY
+
+    decoder.feed(frame)
+    encoder.ack(decoder.last_seq)
+    delta = encoder.encode(make_position(third, 4))
+    assert delta[0] == FRAME_DELTA
+    decoded = decoder.feed(delta)
+    assert decoded["vehicle_id"] == third
+    assert decoded["lat"] == pytest.approx(4.6097 + 0.0004)
+
+
+def test_ack_frame_roundtrip():
+    assert decode_ack(encode_ack(123)) == 123
+    assert decode_ack(b"\x01\x00") is None
+
+
+@pytest.mark.asyncio
+async def test_published_batch_is_one_message_per_client_format():
+    """JSON and binary clients each receive a whole batch as one message in their own format."""
+    manager = ConnectionManager(keyframe_interval=5)
+    json_ws, binary_ws = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(json_ws)
+    await manager.connect(binary_ws, wire_format="binary", subprotocol="gps.bin.v1")
+
+    vehicle = str(uuid4())
+    batch = [make_position(vehicle, step) for step in range(3)]
+    manager.publish_positions(batch)
+    manager.broadcast({"type": "geofence"})
+    await manager.drain()
+
+    assert len(json_ws.sent) == 2 and len(binary_ws.sent) == 2
+    assert [p["timestamp"] for p in json.loads(json_ws.sent[0])] == [p["timestamp"] for p in batch]
+    decoded = BinaryDecoder().feed_message(binary_ws.sent[0])
+    assert [(d["vehicle_id"], d["timestamp"]) for d in decoded] == [(vehicle, p["timestamp"]) for p in batch]
+    assert json.loads(binary_ws.sent[1]) == {"type": "geofence"}
+    assert binary_ws.subprotocol == "gps.bin.v1"
+
+    manager.disconnect(binary_ws)
+    manager.disconnect(json_ws)
+    assert binary_ws not in manager.encoders and not manager.writers
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_publishing():
+    """A client that stops reading is dropped once its queue fills; publishing never waits on it."""
+    manager = ConnectionManager(queue_size=2)
+    stuck, healthy = StuckWebSocket(), FakeWebSocket()
+    await manager.connect(stuck)
+    await manager.connect(healthy)
+
+    for step in range(4):
+        manager.publish_positions([make_position(str(uuid4()), step)])
+        await asyncio.sleep(0)
+    await asyncio.wait_for(manager.drain(), timeout=1)
+
+    assert stuck not in manager.active_connections and stuck.closed_with == 1013
+    assert len(healthy.sent) == 4
+    manager.disconnect(healthy)
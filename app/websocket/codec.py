@@ -0,0 +1,234 @@
+"""
+Codificación de actualizaciones de posición para WebSocket.
+
+Formatos negociables por conexión:
+ - ``json``: objeto completo por actualización (formato histórico, ``send_json``).
+ - ``binary``: frames binarios empaquetados con ``struct``. Cada vehículo recibe
+   un keyframe completo y luego deltas contra el último estado que el cliente
+   confirmó (ack acumulativo por número de secuencia), con keyframes periódicos.
+
+Layout binario (little-endian):
+ - Keyframe: ``<B I H 16s i i H H I``
+   tipo=1, seq, alias, uuid, lat*1e7, lon*1e7, speed*10, heading*100, timestamp
+ - Delta:    ``<B I I H B`` + campos presentes según la máscara
+   tipo=2, seq, base_seq, alias, máscara; luego dlat (i), dlon (i),
+   speed (H), heading (H), dts (H) en ese orden.
+ - Ack del cliente: ``<B I`` tipo=3, seq (también se acepta ``{"ack": seq}``).
+
+Cada mensaje binario del servidor lleva los frames de un lote concatenados;
+el tamaño de cada uno sale de su tipo y de la máscara del delta.
+"""
+import json
+import struct
+from collections import OrderedDict
+from uuid import UUID
+
+WIRE_FORMATS = ("json", "binary")
+SUBPROTOCOLS = {"gps.json.v1": "json", "gps.bin.v1": "binary"}
+
+FRAME_KEY = 1
+FRAME_DELTA = 2
+FRAME_ACK = 3
+
+_KEYFRAME = struct.Struct("<BIH16siiHHI")
+_DELTA_HEADER = struct.Struct("<BIIHB")
+_ACK = struct.Struct("<BI")
+
+# (campo, struct, escala) en el orden en que aparecen en el delta
+_DELTA_FIELDS = (
+    ("lat", struct.Struct("<i"), 10_000_000),
+    ("lon", struct.Struct("<i"), 10_000_000),
+    ("speed", struct.Struct("<H"), 10),
+    ("heading", struct.Struct("<H"), 100),
+    ("timestamp", struct.Struct("<H"), 1),
+)
+_ABSOLUTE_FIELDS = {"speed", "heading"}
+_MAX_PENDING = 256
+_MAX_ALIASES = 0x10000
+
+
+def quantize(position: dict) -> tuple[int, int, int, int, int]:
+    """Convierte una posición a enteros en las unidades del formato binario."""
+    return (
+        round(position["lat"] * 10_000_000),
+        round(position["lon"] * 10_000_000),
+        min(max(round(position.get("speed", 0) * 10), 0), 0xFFFF),
+        round((position.get("heading", 0) % 360) * 100),
+        int(position["timestamp"]),
+    )
+
+
+def encode_json(position: dict) -> str:
+    return json.dumps(position, separators=(",", ":"), default=str)
+
+
+def encode_keyframe(seq: int, alias: int, vehicle_id: str, state: tuple) -> bytes:
+    return _KEYFRAME.pack(FRAME_KEY, seq, alias, UUID(str(vehicle_id)).bytes, *state)
+
+
+def encode_delta(seq: int, base_seq: int, alias: int, base: tuple, state: tuple) -> bytes | None:
+    """
+    Codifica ``state`` como delta contra ``base``.
+    Devuelve None si algún campo no cabe en el delta (hay que enviar keyframe).
+    """
+    mask = 0
+    parts = []
+    for bit, ((name, fmt, _), old, new) in enumerate(zip(_DELTA_FIELDS, base, state)):
+        if old == new:
+            continue
+        value = new if name in _ABSOLUTE_FIELDS else new - old
+        try:
+            parts.append(fmt.pack(value))
+        except struct.error:
+            return None
+        mask |= 1 << bit
+    return _DELTA_HEADER.pack(FRAME_DELTA, seq, base_seq, alias, mask) + b"".join(parts)
+
+
+def frame_size(data: bytes, offset: int = 0) -> int:
+    """Largo del frame que empieza en ``offset``."""
+    kind = data[offset]
+    if kind == FRAME_KEY:
+        return _KEYFRAME.size
+    if kind == FRAME_DELTA:
+        mask = data[offset + _DELTA_HEADER.size - 1]
+        return _DELTA_HEADER.size + sum(fmt.size for bit, (_, fmt, _) in enumerate(_DELTA_FIELDS) if mask & (1 << bit))
+    raise ValueError(f"Unknown frame type {kind}")
+
+
+def decode_ack(data: bytes) -> int | None:
+    if len(data) != _ACK.size:
+        return None
+    kind, seq = _ACK.unpack(data)
+    return seq if kind == FRAME_ACK else None
+
+
+def encode_ack(seq: int) -> bytes:
+    return _ACK.pack(FRAME_ACK, seq)
+
+
+class BinaryDecoder:
+    """
+    Decodificador de referencia del lado cliente (usado en pruebas y benchmarks).
+    Mantiene el estado confirmado por vehículo igual que lo haría la app móvil.
+    """
+
+    def __init__(self):
+        self.aliases: dict[int, str] = {}
+        self.states: dict[int, dict[int, tuple]] = {}
+        self.last_seq = 0
+
+    def feed_message(self, data: bytes) -> list[dict]:
+        """Decodifica un mensaje del servidor (uno o más frames concatenados)."""
+        updates = []
+        offset = 0
+        while offset < len(data):
+            size = frame_size(data, offset)
+            updates.append(self.feed(data[offset:offset + size]))
+            offset += size
+        return updates
+
+    def feed(self, frame: bytes) -> dict:
+        kind = frame[0]
+        if kind == FRAME_KEY:
+            _, seq, alias, raw_id, *state = _KEYFRAME.unpack(frame)
+            vehicle_id = str(UUID(bytes=raw_id))
+            if self.aliases.get(alias) != vehicle_id:
+                # Alias reasignado: el historial era de otro vehículo
+                self.aliases[alias] = vehicle_id
+                self.states.pop(alias, None)
+            state = tuple(state)
+        elif kind == FRAME_DELTA:
+            _, seq, base_seq, alias, mask = _DELTA_HEADER.unpack_from(frame)
+            base = self.states[alias][base_seq]
+            offset = _DELTA_HEADER.size
+            state = list(base)
+            for bit, (name, fmt, _) in enumerate(_DELTA_FIELDS):
+                if mask & (1 << bit):
+                    (value,) = fmt.unpack_from(frame, offset)
+                    offset += fmt.size
+                    state[bit] = value if name in _ABSOLUTE_FIELDS else base[bit] + value
+            state = tuple(state)
+        else:
+            raise ValueError(f"Unknown frame type {kind}")
+        history = self.states.setdefault(alias, {})
+        history[seq] = state
+        if len(history) > _MAX_PENDING:
+            history.pop(next(iter(history)))
+        self.last_seq = seq
+        return {
+            "vehicle_id": self.aliases[alias],
+            **{name: value / scale for (name, _, scale), value in zip(_DELTA_FIELDS[:4], state[:4])},
+            "timestamp": state[4],
+        }
+
+
+class PositionEncoder:
+    """
+    Estado de codificación de una conexión binaria.
+
+    ``acked`` guarda, por vehículo, el último estado confirmado por el cliente y
+    su seq; los deltas siempre se calculan contra ese estado, así un frame
+    perdido en el cliente nunca rompe la cadena de deltas.
+
+    El alias ocupa 16 bits: con ``max_aliases`` vehículos ya asignados, el
+    nuevo hereda el alias del usado hace más tiempo (LRU). Se descarta todo el
+    estado de ese alias, así que el siguiente frame es un keyframe con el uuid
+    nuevo y el cliente remapea el alias.
+    """
+
+    def __init__(self, keyframe_interval: int = 20, max_aliases: int = _MAX_ALIASES):
+        self.keyframe_interval = keyframe_interval
+        self.max_aliases = min(max_aliases, _MAX_ALIASES)
+        self.seq = 0
+        self.aliases: OrderedDict[str, int] = OrderedDict()
+        self.acked: dict[int, tuple[int, tuple, int]] = {}
+        self.pending: dict[int, tuple[int, tuple, int]] = {}
+        self.sent: dict[int, int] = {}
+        self.last_keyframe: dict[int, int] = {}
+
+    def encode(self, position: dict) -> bytes:
+        vehicle_id = str(position["vehicle_id"])
+        alias = self.aliases.get(vehicle_id)
+        if alias is None:
+            alias = self.aliases[vehicle_id] = self._assign_alias()
+        else:
+            self.aliases.move_to_end(vehicle_id)
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        state = quantize(position)
+
+        sent = self.sent[alias] = self.sent.get(alias, 0) + 1
+        frame = None
+        base = self.acked.get(alias)
+        if (
+            base is not None
+            and sent - self.last_keyframe.get(alias, 0) <= self.keyframe_interval
+            and sent - base[2] < _MAX_PENDING
+        ):
+            frame = encode_delta(self.seq, base[0], alias, base[1], state)
+        if frame is None:
+            frame = encode_keyframe(self.seq, alias, vehicle_id, state)
+            self.last_keyframe[alias] = sent
+
+        self.pending[self.seq] = (alias, state, sent)
+        if len(self.pending) > _MAX_PENDING:
+            self.pending.pop(next(iter(self.pending)))
+        return frame
+
+    def _assign_alias(self) -> int:
+        if len(self.aliases) < self.max_aliases:
+            return len(self.aliases)
+        _, alias = self.aliases.popitem(last=False)
+        self.acked.pop(alias, None)
+        self.sent.pop(alias, None)
+        self.last_keyframe.pop(alias, None)
+        # Un ack tardío del vehículo anterior no puede volverse base del nuevo
+        for seq in [s for s, (a, _, _) in self.pending.items() if a == alias]:
+            del self.pending[seq]
+        return alias
+
+    def ack(self, seq: int) -> None:
+        """Ack acumulativo: todo lo enviado hasta ``seq`` pasa a ser base de delta."""
+        for sent_seq in [s for s in self.pending if s <= seq]:
+            alias, state, sent = self.pending.pop(sent_seq)
+            self.acked[alias] = (sent_seq, state, sent)
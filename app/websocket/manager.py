@@ -1,21 +1,100 @@
+"""
+Difusión de posiciones y eventos a los clientes de ``/ws``.
+
+Cada conexión tiene una cola de salida acotada y una tarea que la vacía:
+``publish_positions`` y ``broadcast`` solo encolan, así que un socket lento no
+frena la ingesta ni al resto de los clientes. Un lote de posiciones viaja en
+un solo mensaje (array JSON o frames binarios concatenados). Si la cola de un
+cliente se llena, se lo desconecta con el código 1013.
+"""
+import asyncio
 from fastapi import WebSocket
+from app.core.config import settings
+from app.websocket.codec import PositionEncoder, encode_json
+
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, keyframe_interval: int = 20, queue_size: int = 64):
         self.active_connections: list[WebSocket] = []
+        self.keyframe_interval = keyframe_interval
+        self.queue_size = queue_size
+        # Conexiones binarias -> estado de delta (las JSON no tienen entrada)
+        self.encoders: dict[WebSocket, PositionEncoder] = {}
+        self.outboxes: dict[WebSocket, asyncio.Queue] = {}
+        self.writers: dict[WebSocket, asyncio.Task] = {}
+        self._closing: set[asyncio.Task] = set()
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, wire_format: str = "json", subprotocol: str | None = None):
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections.append(websocket)
+        if wire_format == "binary":
+            self.encoders[websocket] = PositionEncoder(self.keyframe_interval)
+        outbox = self.outboxes[websocket] = asyncio.Queue(maxsize=self.queue_size)
+        self.writers[websocket] = asyncio.create_task(self._write(websocket, outbox))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        self.encoders.pop(websocket, None)
+        self.outboxes.pop(websocket, None)
+        writer = self.writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+    def ack(self, websocket: WebSocket, seq: int):
+        encoder = self.encoders.get(websocket)
+        if encoder:
+            encoder.ack(seq)
+
+    async def _write(self, websocket: WebSocket, outbox: asyncio.Queue):
+        encoder = self.encoders.get(websocket)
+        try:
+            while True:
+                # (posiciones o None, texto JSON ya serializado)
+                positions, text = await outbox.get()
+                try:
+                    if positions is not None and encoder is not None:
+                        await websocket.send_bytes(b"".join(encoder.encode(p) for p in positions))
+                    else:
+                        await websocket.send_text(text)
+                finally:
+                    outbox.task_done()
+        except Exception:
+            self.disconnect(websocket)
 
-    async def broadcast(self, message: dict):
-        for conn in list(self.active_connections):
+    def _enqueue(self, item: tuple):
+        for conn, outbox in list(self.outboxes.items()):
             try:
-                await conn.send_json(message)
-            except Exception:
+                outbox.put_nowait(item)
+            except asyncio.QueueFull:
                 self.disconnect(conn)
+                task = asyncio.create_task(self._close(conn))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
+
+    def broadcast(self, message: dict):
+        """Encola un mensaje JSON para todos los clientes (serializado una sola vez)."""
+        if self.outboxes:
+            self._enqueue((None, encode_json(message)))
+
+    def publish_positions(self, positions: list[dict]):
+        """
+        Encola un lote de posiciones: cada cliente lo recibe en un mensaje, como
+        array JSON o como frames keyframe/delta concatenados.
+        """
+        if self.outboxes and positions:
+            text = encode_json(positions) if len(self.encoders) < len(self.outboxes) else None
+            self._enqueue((positions, text))
+
+    async def drain(self):
+        """Espera a que todas las colas de salida se hayan enviado."""
+        await asyncio.gather(*(outbox.join() for outbox in list(self.outboxes.values())))
 
-manager = ConnectionManager()
+manager = ConnectionManager(keyframe_interval=settings.WS_KEYFRAME_INTERVAL, queue_size=settings.WS_SEND_QUEUE_SIZE)
@@ -0,0 +1,4 @@
+"""
+Benchmarks module.
+Contains performance scripts that run outside the pytest suite.
+"""
@@ -0,0 +1,91 @@
+"""
+Throughput de la evaluación de geocercas: posiciones por segundo con el índice
+en grilla frente a probar cada punto contra todas las cercas.
+
+Genera cercas (polígonos de 12 vértices, de 200 m a 2 km) y una flota
+alrededor de Bogotá, y evalúa lotes como los que recibe ``POST /api/v1/positions``.
+
+Uso:
+    python -m benchmarks.geofence --fences 500 --points 20000 --batch 1000
+"""
+import argparse
+import math
+import random
+import time
+from uuid import uuid4
+
+from app.application.services.geofence_engine import Fence, GeofenceIndex, points_in_ring, transitions
+
+
+def make_fences(count: int, rng: random.Random) -> list[Fence]:
+    fences = []
+    for _ in range(count):
+        cx, cy = -74.08 + rng.uniform(-0.3, 0.3), 4.65 + rng.uniform(-0.3, 0.3)
+        radius = rng.uniform(0.002, 0.02)
+        ring = [
+            (cx + radius * math.cos(a) * rng.uniform(0.6, 1.0), cy + radius * math.sin(a) * rng.uniform(0.6, 1.0))
+            for a in (2 * math.pi * k / 12 for k in range(12))
+        ]
+        fences.append(Fence.from_coordinates(uuid4(), ring))
+    return fences
+
+
+def make_positions(count: int, vehicles: int, rng: random.Random) -> list[dict]:
+    fleet = [uuid4() for _ in range(vehicles)]
+    return [
+        {"vehicle_id": fleet[i % vehicles], "lon": -74.08 + rng.uniform(-0.3, 0.3),
+         "lat": 4.65 + rng.uniform(-0.3, 0.3), "timestamp": 1_700_000_000 + i}
+        for i in range(count)
+    ]
+
+
+def brute_force(fences: list[Fence], positions: list[dict]):
+    for p in positions:
+        {f.id for f in fences if points_in_ring(f.xs, f.ys, [p["lon"]], [p["lat"]])[0]}
+
+
+def run(fences: int, points: int, batch: int, vehicles: int, cell_size: float, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    fence_list = make_fences(fences, rng)
+    positions = make_positions(points, vehicles, rng)
+
+    start = time.perf_counter()
+    index = GeofenceIndex(fence_list, cell_size)
+    build = time.perf_counter() - start
+
+    states: dict = {}
+    events = 0
+    start = time.perf_counter()
+    for offset in range(0, points, batch):
+        events += len(transitions(index, positions[offset:offset + batch], states))
+    indexed = time.perf_counter() - start
+
+    sample = positions[:min(points, 2000)]
+    start = time.perf_counter()
+    brute_force(fence_list, sample)
+    brute = time.perf_counter() - start
+
+    return {
+        "index_build_ms": round(build * 1000, 2),
+        "indexed_points_per_s": round(points / indexed),
+        "brute_force_points_per_s": round(len(sample) / brute),
+        "events": events,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fences", type=int, default=500)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000, help="Positions per ingested batch")
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--cell-size", type=float, default=0.05, help="Grid cell in degrees (GEOFENCE_GRID_CELL_DEGREES)")
+    args = parser.parse_args()
+    results = run(args.fences, args.points, args.batch, args.vehicles, args.cell_size)
+    print(f"{'metric':<28}{'value':>14}")
+    for name, value in results.items():
+        print(f"{name:<28}{value:>14}")
+
+
+if __name__ == "__main__":
+    main()
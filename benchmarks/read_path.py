@@ -0,0 +1,93 @@
+"""
+Lecturas de vehículos: ORM (``list``) vs Core + VehicleRecord (``list_records``).
+
+Mide filas/s y bloques/bytes asignados por fila (tracemalloc) sobre una base
+SQLite local sembrada con ``--rows`` vehículos.
+
+Uso:
+    python -m benchmarks.read_path --rows 5000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.domain.models.vehicle_model import Vehicle
+from app.infrastructure.repositories.vehicle_repository import VehicleRepositorySQLAlchemy
+
+
+async def seed(engine, rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Vehicle),
+            [
+                {"id": uuid.uuid4(), "brand": f"Brand {i % 17}", "arrival_location": f"Loc {i % 31}", "applicant": f"A{i}"}
+                for i in range(rows)
+            ],
+        )
+
+
+async def measure(sessionmaker, method: str, rows: int, repeat: int) -> dict:
+    async def once():
+        async with sessionmaker() as session:
+            result = await getattr(VehicleRepositorySQLAlchemy(session), method)(limit=rows)
+            assert len(result) == rows
+            return result
+
+    await once()  # warm-up (compilación de la query)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await once()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = await once()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    del kept
+
+    return {
+        "rows_per_sec": round(rows * repeat / elapsed),
+        "retained_blocks_per_row": round(blocks / rows, 2),
+        "retained_bytes_per_row": round(size / rows, 1),
+    }
+
+
+async def run(rows: int, repeat: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await seed(engine, rows)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        return {
+            "rows": rows,
+            "orm": await measure(sessionmaker, "list", rows, repeat),
+            "core_records": await measure(sessionmaker, "list_records", rows, repeat),
+        }
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Serialización de listados de vehículos: ruta FastAPI clásica vs ruta rápida.
+
+ - ``pydantic``: validación de ``response_model`` (``list[VehicleResponse]``,
+   from_attributes) + ``jsonable_encoder`` + ``json.dumps`` (lo que hacía la app).
+ - ``fast``: ``vehicles_response`` (dict por fila + orjson, sin re-validar).
+
+Uso:
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.domain.models.vehicle_model import Vehicle
+from app.domain.schemas.vehicle_schema import VehicleResponse
+from app.presentation.responses import vehicles_response
+
+
+def make_rows(n: int) -> list[Vehicle]:
+    now = datetime.now(timezone.utc)
+    return [
+        Vehicle(
+            id=uuid.uuid4(),
+            brand=f"Brand {i % 17}",
+            arrival_location=f"Location {i % 31}",
+            applicant=f"Applicant {i}",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def pydantic_path(rows, adapter) -> bytes:
+    validated = adapter.validate_python(rows, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(rows) -> bytes:
+    return vehicles_response(rows).body
+
+
+def timeit(fn, repeat: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def run(rows: int, repeat: int) -> dict:
+    data = make_rows(rows)
+    adapter = TypeAdapter(list[VehicleResponse])
+    slow = timeit(lambda: pydantic_path(data, adapter), repeat)
+    fast = timeit(lambda: fast_path(data), repeat)
+    return {
+        "rows": rows,
+        "pydantic_ms": round(slow * 1000, 3),
+        "fast_ms": round(fast * 1000, 3),
+        "speedup": round(slow / fast, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Micro-benchmarks de los schemas Pydantic (validadores y serialización).
+
+Uso:
+    pytest benchmarks/test_micro_schemas.py --benchmark-only
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.domain.models.vehicle_model import Vehicle
+from app.domain.schemas.user_schema import UserCreate
+from app.domain.schemas.vehicle_schema import VehicleCreate, VehicleResponse
+from app.presentation.responses import vehicles_response
+
+USER_PAYLOAD = {"username": "  alice  ", "email": "alice@example.com", "password": "securepassword123"}
+VEHICLE_PAYLOAD = {"brand": " Toyota ", "arrival_location": "Bogotá", "applicant": "Juan Pérez"}
+
+
+def make_vehicles(n: int) -> list[Vehicle]:
+    now = datetime.now(timezone.utc)
+    return [
+        Vehicle(id=uuid.uuid4(), brand=f"Brand {i}", arrival_location="Bogotá",
+                applicant=f"Applicant {i}", created_at=now, updated_at=now)
+        for i in range(n)
+    ]
+
+
+def test_user_create_validation(benchmark):
+    benchmark(UserCreate.model_validate, USER_PAYLOAD)
+
+
+def test_vehicle_create_validation(benchmark):
+    benchmark(VehicleCreate.model_validate, VEHICLE_PAYLOAD)
+
+
+@pytest.mark.parametrize("size", [1, 100, 10_000])
+def test_vehicle_response_batch_pydantic(benchmark, size):
+    """Ruta response_model: validar desde atributos y volcar a JSON."""
+    rows = make_vehicles(size)
+    adapter = TypeAdapter(list[VehicleResponse])
+    benchmark.extra_info["rows"] = size
+    benchmark(lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True)))
+
+
+@pytest.mark.parametrize("size", [1, 100, 10_000])
+def test_vehicle_response_batch_fast(benchmark, size):
+    """Ruta rápida (orjson desde las filas, sin re-validar)."""
+    rows = make_vehicles(size)
+    benchmark.extra_info["rows"] = size
+    benchmark(lambda: vehicles_response(rows).body)
@@ -0,0 +1,48 @@
+"""
+Micro-benchmarks de app/core/security.py (pytest-benchmark).
+
+Uso:
+    pytest benchmarks/test_micro_security.py --benchmark-only
+    pytest benchmarks/ --benchmark-only --benchmark-autosave   # guardar para comparar
+"""
+import pytest
+from passlib.context import CryptContext
+
+from app.core.security import create_access_token, decode_token, hash_password, verify_password
+
+PASSWORD = "correct-horse-battery-staple"
+
+
+@pytest.fixture(scope="module")
+def stored_hash() -> str:
+    return hash_password(PASSWORD)
+
+
+@pytest.fixture(scope="module")
+def token() -> str:
+    return create_access_token(subject="550e8400-e29b-41d4-a716-446655440000")
+
+
+def test_hash_password(benchmark):
+    benchmark.pedantic(hash_password, args=(PASSWORD,), rounds=5, iterations=1)
+
+
+def test_verify_password(benchmark, stored_hash):
+    assert benchmark.pedantic(verify_password, args=(PASSWORD, stored_hash), rounds=5, iterations=1)
+
+
+@pytest.mark.parametrize("rounds", [4, 8, 10, 12])
+def test_bcrypt_cost_factor(benchmark, rounds):
+    """Coste de verificación por factor de bcrypt: cada +1 duplica el tiempo de login."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    hashed = context.hash(PASSWORD)
+    benchmark.extra_info["rounds"] = rounds
+    assert benchmark.pedantic(context.verify, args=(PASSWORD, hashed), rounds=3, iterations=1)
+
+
+def test_create_access_token(benchmark):
+    benchmark(create_access_token, subject="550e8400-e29b-41d4-a716-446655440000")
+
+
+def test_decode_token(benchmark, token):
+    assert benchmark(decode_token, token)["sub"]
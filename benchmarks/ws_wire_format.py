@@ -0,0 +1,86 @@
+"""
+Bytes por actualización de posición: JSON vs binario (keyframe) vs binario delta.
+
+Simula una flota moviéndose con random walk y codifica cada actualización
+con los tres formatos que acepta ``/ws``. El cliente binario confirma cada
+frame (ack) como lo haría la app móvil.
+
+Uso:
+    python -m benchmarks.ws_wire_format --vehicles 200 --updates 50
+"""
+import argparse
+import json
+import random
+import time
+from uuid import uuid4
+
+from app.websocket.codec import BinaryDecoder, PositionEncoder, encode_json
+
+
+def simulate(vehicles: int, updates: int, seed: int = 7):
+    rng = random.Random(seed)
+    fleet = [
+        {
+            "vehicle_id": str(uuid4()),
+            "lat": 4.6 + rng.uniform(-0.2, 0.2),
+            "lon": -74.08 + rng.uniform(-0.2, 0.2),
+            "speed": rng.uniform(0, 80),
+            "heading": rng.uniform(0, 360),
+            "timestamp": 1_700_000_000,
+        }
+        for _ in range(vehicles)
+    ]
+    for _ in range(updates):
+        for v in fleet:
+            v["lat"] = round(v["lat"] + rng.uniform(-0.0005, 0.0005), 7)
+            v["lon"] = round(v["lon"] + rng.uniform(-0.0005, 0.0005), 7)
+            v["speed"] = round(max(0.0, v["speed"] + rng.uniform(-5, 5)), 1)
+            v["heading"] = round((v["heading"] + rng.uniform(-15, 15)) % 360, 2)
+            v["timestamp"] += 5
+            yield dict(v)
+
+
+def run(vehicles: int, updates: int, keyframe_interval: int) -> dict:
+    positions = list(simulate(vehicles, updates))
+
+    started = time.perf_counter()
+    json_bytes = sum(len(encode_json(p).encode()) for p in positions)
+    json_time = time.perf_counter() - started
+
+    keyframe_only = PositionEncoder(keyframe_interval=keyframe_interval)
+    key_bytes = sum(len(keyframe_only.encode(p)) for p in positions)  # nunca hay ack
+
+    delta = PositionEncoder(keyframe_interval=keyframe_interval)
+    decoder = BinaryDecoder()
+    started = time.perf_counter()
+    delta_bytes = 0
+    for p in positions:
+        frame = delta.encode(p)
+        delta_bytes += len(frame)
+        decoder.feed(frame)
+        delta.ack(decoder.last_seq)
+    delta_time = time.perf_counter() - started
+
+    n = len(positions)
+    return {
+        "updates": n,
+        "json_bytes_per_update": round(json_bytes / n, 1),
+        "binary_keyframe_bytes_per_update": round(key_bytes / n, 1),
+        "binary_delta_bytes_per_update": round(delta_bytes / n, 1),
+        "delta_vs_json_ratio": round(delta_bytes / json_bytes, 3),
+        "json_encode_us_per_update": round(json_time / n * 1e6, 2),
+        "delta_encode_decode_us_per_update": round(delta_time / n * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=50)
+    parser.add_argument("--keyframe-interval", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.vehicles, args.updates, args.keyframe_interval), indent=2))
+
+
+if __name__ == "__main__":
+    main()